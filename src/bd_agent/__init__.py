@@ -47,7 +47,9 @@ from dotenv import load_dotenv, find_dotenv
 import os
 
 load_dotenv(find_dotenv())
-if not os.getenv("OPENAI_API_KEY"):
+# BD_AGENT_LLM_MODE=replay/stub answer locally and need no key
+_offline = os.getenv("BD_AGENT_LLM_MODE", "").strip().lower() in ("replay", "stub")
+if not os.getenv("OPENAI_API_KEY") and not _offline:
     raise RuntimeError(
         "OPENAI_API_KEY not found in environment variables."
         " Please set it in your .env file or environment."
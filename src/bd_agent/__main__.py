@@ -4,6 +4,14 @@ Main entry point for bd_agent.
 Usage:
   python -m bd_agent ui
   python -m bd_agent cli
+  python -m bd_agent sync [--kpis 2,10,37] [--no-summaries] [--force]
+  python -m bd_agent bench [--repeats 3] [--bd-latency 0.05] [--llm-latency 0.5]
+                     [--llm-token-delay 0.02]
+  python -m bd_agent eval-intents [--classifier llm|local|hybrid]
+                     [--max-workers 8] [--rpm N] [--resume RUN_DIR]
+                     [--no-cache]
+  python -m bd_agent prewarm-kpis [--force]
+  python -m bd_agent importtime [--repeats 5]
 """
 
 # load dotenv to get api keys
@@ -15,8 +23,6 @@ import argparse
 import subprocess
 from pathlib import Path
 
-from bd_agent.eval import run
-
 
 def main():
     """Main entry point with subcommands"""
@@ -25,8 +31,93 @@ def main():
         "mode",
         nargs="?",
         default="ui",
-        choices=["ui", "cli"],
-        help="Run mode: 'ui' for Streamlit interface, 'cli' for command line",
+        choices=[
+            "ui",
+            "cli",
+            "sync",
+            "bench",
+            "eval-intents",
+            "prewarm-kpis",
+            "importtime",
+        ],
+        help=(
+            "Run mode: 'ui' for Streamlit interface, 'cli' for command line, "
+            "'sync' to fill and refresh the local Börsdata mirror, "
+            "'bench' to benchmark the pipelines against local stand-ins, "
+            "'eval-intents' to evaluate the intent classifier on the golden set, "
+            "'prewarm-kpis' to cache the suggested KPIs for every industry, "
+            "'importtime' to measure startup import time"
+        ),
+    )
+    parser.add_argument(
+        "--kpis",
+        default="",
+        help="sync: comma separated KPI ids to mirror history for, e.g. 2,10,37",
+    )
+    parser.add_argument(
+        "--no-summaries",
+        action="store_true",
+        help="sync: skip the per-instrument KPI summaries",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=(
+            "sync: refresh everything, not only stale datasets; "
+            "prewarm-kpis: ask the LLM again even for cached industries"
+        ),
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="bench/importtime: runs per case"
+    )
+    parser.add_argument(
+        "--instruments", type=int, default=500, help="bench: synthetic universe size"
+    )
+    parser.add_argument(
+        "--bd-latency", type=float, default=0.0, help="bench: Börsdata s/request"
+    )
+    parser.add_argument(
+        "--llm-latency", type=float, default=0.0, help="bench: LLM s/request"
+    )
+    parser.add_argument(
+        "--llm-token-delay",
+        type=float,
+        default=0.0,
+        help="bench: LLM s between streamed tokens",
+    )
+    parser.add_argument(
+        "--cold",
+        action="store_true",
+        help="bench: clear in-process caches before every run",
+    )
+    parser.add_argument(
+        "--classifier",
+        default="llm",
+        choices=["llm", "local", "hybrid"],
+        help="eval-intents: classifier to evaluate",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="eval-intents: rows classified concurrently",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=None,
+        help="eval-intents: max LLM calls per minute (default: no extra limit)",
+    )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        metavar="RUN_DIR",
+        help="eval-intents: finish an interrupted run, skipping rows already scored",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="eval-intents: classify every row again instead of reusing predictions",
     )
 
     args = parser.parse_args()
@@ -35,6 +126,58 @@ def main():
         project_root = Path(__file__).parent.parent
         ui_path = Path(__file__).parent / "ui.py"
         subprocess.run(["streamlit", "run", str(ui_path)], cwd=str(project_root))
+    elif args.mode == "sync":
+        from bd_agent.bd import sync_mirror
+        from bd_agent.bd._client import MIRROR_MAX_AGE
+
+        kpi_ids = [int(k) for k in args.kpis.split(",") if k.strip()]
+        counts = sync_mirror(
+            kpi_ids=kpi_ids,
+            summaries=not args.no_summaries,
+            max_age=0 if args.force else MIRROR_MAX_AGE,
+        )
+        for dataset, n in counts.items():
+            print(f"{dataset:>15}: {n}")
+    elif args.mode == "bench":
+        from bd_agent.bench import run as run_bench
+
+        out_dir = run_bench(
+            repeats=args.repeats,
+            n_instruments=args.instruments,
+            bd_latency=args.bd_latency,
+            llm_latency=args.llm_latency,
+            llm_token_delay=args.llm_token_delay,
+            cold=args.cold,
+        )
+        print(f"Report written to {out_dir / 'bench_report.json'}")
+    elif args.mode == "importtime":
+        from bd_agent.bench import run_importtime
+
+        out_dir, report = run_importtime(repeats=args.repeats)
+        print(f"Report written to {out_dir / 'importtime_report.json'}")
+        if any(m["eager_dependencies"] for m in report["modules"].values()):
+            raise SystemExit("Heavy dependencies are imported eagerly, see report")
+    elif args.mode == "eval-intents":
+        from bd_agent.eval import run as run_eval
+
+        out_path = run_eval(
+            classifier=args.classifier,
+            max_workers=args.max_workers,
+            rpm=args.rpm,
+            resume=args.resume,
+            use_cache=not args.no_cache,
+        )
+        print(f"Report written to {out_path}")
+    elif args.mode == "prewarm-kpis":
+        from bd_agent.agents._find_industry_kpis import prewarm_industry_kpis
+
+        results = prewarm_industry_kpis(refresh=args.force)
+        for industry_id, n in results["kpis"].items():
+            print(f"{industry_id:>15}: {n} KPIs")
+        for industry_id, error in results["failed"].items():
+            print(f"{industry_id:>15}: failed ({error})")
+        if results["failed"]:
+            raise SystemExit(f"{len(results['failed'])} industries failed")
     else:
         from bd_agent.cli import run_cli
 
@@ -43,4 +186,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-    # run()
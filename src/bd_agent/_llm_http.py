@@ -0,0 +1,295 @@
+"""HTTP layer shared by all LLM calls.
+
+One pooled httpx transport (sync and async) that every OpenAI request goes
+through. It holds a process-wide concurrency slot for the whole response,
+spreads requests and tokens over the provider's per-minute limits, and
+retries 429/5xx and connection errors with jittered backoff. The inner
+transport can be swapped for record/replay or the stub model (see llm).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+import httpx
+
+from bd_agent.bd._ratelimit import TokenBucket
+
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds, doubled for every attempt
+MAX_BACKOFF = 30.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+POOL_SIZE = 32
+TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+OUTPUT_TOKENS_ESTIMATE = 256  # charged when a request sets no max tokens
+POLL_INTERVAL = 0.01  # seconds between slot checks on the event loop
+
+
+# ---- Limits ----
+class LLMLimiter:
+    """Concurrency slots plus request and token buckets per minute.
+    Tokens are estimated from the request (text length / 4 + max output).
+    rpm/tpm None means no rate limit (offline modes)."""
+
+    def __init__(self, max_concurrency: int, rpm: int | None, tpm: int | None) -> None:
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(rpm, 60.0) if rpm else None
+        self.tokens = TokenBucket(tpm, 60.0) if tpm else None
+        self.stats: Counter[str] = Counter()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._stats_lock = threading.Lock()
+
+    def count(self, key: str, n: float = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _reserve(self, tokens: int) -> float:
+        self.count("requests")
+        delay = max(
+            self.requests.reserve() if self.requests else 0.0,
+            self.tokens.reserve(tokens) if self.tokens else 0.0,
+        )
+        if delay > 0:
+            self.count("throttled_s", delay)
+        return delay
+
+    def acquire(self, tokens: int) -> None:
+        """Blocks for a slot and for the rate limits. The slot is given back
+        if the wait is interrupted."""
+        self._slots.acquire()
+        try:
+            delay = self._reserve(tokens)
+            if delay > 0:
+                time.sleep(delay)
+        except BaseException:
+            self.release()
+            raise
+
+    async def acquire_async(self, tokens: int) -> None:
+        """Like acquire() without blocking the event loop. The slots are
+        shared with sync callers in other threads, so they are polled."""
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(POLL_INTERVAL)
+        try:
+            delay = self._reserve(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        except BaseException:  # cancelled while throttled
+            self.release()
+            raise
+
+    def release(self) -> None:
+        self._slots.release()
+
+
+def _estimate_tokens(request: httpx.Request) -> int:
+    """Input tokens (~4 characters each) plus the output the request may produce"""
+    body = request.content
+    try:
+        payload = json.loads(body) if body else {}
+    except ValueError:
+        return len(body) // 4 + OUTPUT_TOKENS_ESTIMATE
+    if not isinstance(payload, dict):
+        payload = {}
+    output = (
+        payload.get("max_output_tokens")
+        or payload.get("max_completion_tokens")
+        or payload.get("max_tokens")
+        or OUTPUT_TOKENS_ESTIMATE
+    )
+    # decoded text, the body escapes non-ASCII characters (å -> \u00e5)
+    text = json.dumps(payload, ensure_ascii=False)
+    return len(text) // 4 + int(output)
+
+
+def _retry_delay(response: httpx.Response | None, attempt: int) -> float:
+    """Honours retry-after(-ms) when present, else exponential backoff with jitter"""
+    if response is not None:
+        for header, scale in (("retry-after-ms", 1e-3), ("retry-after", 1.0)):
+            value = response.headers.get(header)
+            if value:
+                try:
+                    return min(MAX_BACKOFF, max(0.0, float(value) * scale))
+                except ValueError:
+                    pass
+    return min(MAX_BACKOFF, BACKOFF_BASE * 2**attempt * (1 + random.random() / 2))
+
+
+def _retryable(response: httpx.Response, attempt: int, max_retries: int) -> bool:
+    return response.status_code in RETRY_STATUSES and attempt < max_retries
+
+
+def _log_retry(request: httpx.Request, status: int | None, delay: float, n: int):
+    logger.warning(
+        "LLM %s %s, retrying in %.1fs (attempt %d/%d)",
+        request.url.path,
+        f"HTTP {status}" if status else "failed",
+        delay,
+        n,
+        MAX_RETRIES,
+    )
+
+
+# ---- Response bodies that give the slot back when closed ----
+class _ReleasingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+class _AsyncReleasingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+        self._released = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+def _hold_slot(response: httpx.Response, release: Callable[[], None], cls) -> None:
+    """Keeps the slot until the body is closed. Bodies already in memory
+    (replay, stub) are never closed by httpx, their slot is freed now."""
+    if isinstance(response.stream, httpx.ByteStream):
+        release()
+    else:
+        response.stream = cls(response.stream, release)
+
+
+# ---- Transports ----
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+
+
+def pooled_transport() -> httpx.HTTPTransport:
+    return httpx.HTTPTransport(limits=_pool_limits())
+
+
+def pooled_async_transport() -> httpx.AsyncHTTPTransport:
+    return httpx.AsyncHTTPTransport(limits=_pool_limits())
+
+
+class LimitedTransport(httpx.BaseTransport):
+    """Sync transport applying the limiter and retries around `inner`
+    (default: a pooled HTTP transport)"""
+
+    def __init__(
+        self,
+        limiter: LLMLimiter,
+        inner: httpx.BaseTransport | None = None,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self._inner = inner or pooled_transport()
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = _estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(tokens)
+            response = None
+            try:
+                response = self._inner.handle_request(request)
+                retry = _retryable(response, attempt, self.max_retries)
+                if retry:
+                    response.close()
+            except httpx.TransportError:
+                self.limiter.release()
+                if attempt == self.max_retries:
+                    raise
+            except BaseException:  # the slot must come back on any failure
+                self.limiter.release()
+                raise
+            else:
+                if not retry:
+                    _hold_slot(response, self.limiter.release, _ReleasingStream)
+                    return response
+                self.limiter.release()
+
+            delay = _retry_delay(response, attempt)
+            self.limiter.count("retries")
+            status = response.status_code if response is not None else None
+            _log_retry(request, status, delay, attempt + 1)
+            time.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    def close(self) -> None:
+        self._inner.close()
+
+
+class AsyncLimitedTransport(httpx.AsyncBaseTransport):
+    """Async transport applying the same limiter and retries around `inner`"""
+
+    def __init__(
+        self,
+        limiter: LLMLimiter,
+        inner: httpx.AsyncBaseTransport | None = None,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        self.limiter = limiter
+        self.max_retries = max_retries
+        self._inner = inner or pooled_async_transport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        tokens = _estimate_tokens(request)
+        for attempt in range(self.max_retries + 1):
+            await self.limiter.acquire_async(tokens)
+            response = None
+            try:
+                response = await self._inner.handle_async_request(request)
+                retry = _retryable(response, attempt, self.max_retries)
+                if retry:
+                    await response.aclose()
+            except httpx.TransportError:
+                self.limiter.release()
+                if attempt == self.max_retries:
+                    raise
+            except BaseException:  # also cancellation
+                self.limiter.release()
+                raise
+            else:
+                if not retry:
+                    _hold_slot(response, self.limiter.release, _AsyncReleasingStream)
+                    return response
+                self.limiter.release()
+
+            delay = _retry_delay(response, attempt)
+            self.limiter.count("retries")
+            status = response.status_code if response is not None else None
+            _log_retry(request, status, delay, attempt + 1)
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
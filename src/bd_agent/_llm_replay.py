@@ -0,0 +1,174 @@
+"""Record and replay of the HTTP exchanges behind every LLM call.
+
+RecordReplayTransport sits under the limiter in the shared LLM transport (see
+_llm_http), so it sees all requests the OpenAI SDK and pydantic_ai send.
+Responses are stored in a cassette keyed by a hash of the request content
+(method, path and JSON body). The host is not part of the key, so answers
+recorded against the API replay against any base URL.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+from bd_agent.cache import DiskCache, cache_key
+
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "llm_responses"
+
+
+def request_key(request: httpx.Request) -> str:
+    """Content hash of a request; the JSON body is compared parsed, so key
+    order and whitespace do not matter"""
+    content = request.content
+    try:
+        payload = json.loads(content) if content else None
+    except ValueError:
+        payload = content.decode("utf-8", "replace")
+    return cache_key(request.method, request.url.path, payload)
+
+
+# ---- Cassette ----
+class Cassette:
+    """Recorded responses in a SQLite file, plus hit/miss/record counters"""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.stats: Counter[str] = Counter()
+        self._store = DiskCache(self.path, NAMESPACE)
+        self._stats_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _count(self, key: str) -> None:
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def save(self, request: httpx.Request, response: httpx.Response, body: bytes):
+        self._store.set(
+            request_key(request),
+            {
+                "path": request.url.path,
+                "status": response.status_code,
+                "content_type": response.headers.get("content-type", ""),
+                "body": body.decode("utf-8"),
+                "recorded_at": time.time(),
+            },
+        )
+        self._count("recorded")
+
+    def replay(self, request: httpx.Request) -> httpx.Response:
+        """The recorded response, or a 404 API error naming the missing key"""
+        key = request_key(request)
+        saved = self._store.get(key)
+        if saved is None:
+            self._count("misses")
+            logger.warning("No recorded LLM response for %s", request.url.path)
+            message = (
+                f"No recorded response for {request.url.path} (key {key[:16]}) "
+                f"in {self.path}. Record it with BD_AGENT_LLM_MODE=record."
+            )
+            return httpx.Response(
+                404,
+                json={"error": {"message": message, "type": "replay_miss"}},
+                request=request,
+            )
+        self._count("hits")
+        return httpx.Response(
+            saved["status"],
+            headers={"content-type": saved["content_type"]},
+            content=saved["body"].encode("utf-8"),
+            request=request,
+        )
+
+
+# ---- Response bodies saved once fully read ----
+class _RecordingStream(httpx.SyncByteStream):
+    def __init__(self, stream: httpx.SyncByteStream, save: Callable[[bytes], None]):
+        self._stream = stream
+        self._save = save
+        self._chunks: list[bytes] = []
+        self._complete = False
+
+    def __iter__(self):
+        for chunk in self._stream:
+            self._chunks.append(chunk)
+            yield chunk
+        self._complete = True
+
+    def close(self) -> None:
+        self._stream.close()
+        if self._complete:  # an abandoned stream is not a valid answer
+            self._save(b"".join(self._chunks))
+
+
+class _AsyncRecordingStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, save: Callable[[bytes], None]):
+        self._stream = stream
+        self._save = save
+        self._chunks: list[bytes] = []
+        self._complete = False
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            self._chunks.append(chunk)
+            yield chunk
+        self._complete = True
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+        if self._complete:
+            self._save(b"".join(self._chunks))
+
+
+# ---- Transport ----
+class RecordReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Replays from the cassette when `inner` is None, otherwise sends the
+    request through `inner` and records successful responses. Use a sync or
+    an async `inner` to match the client."""
+
+    def __init__(self, cassette: Cassette, inner=None) -> None:
+        self.cassette = cassette
+        self.inner = inner
+
+    def _saver(self, request: httpx.Request, response: httpx.Response):
+        return lambda body: self.cassette.save(request, response, body)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.inner is None:
+            return self.cassette.replay(request)
+        response = self.inner.handle_request(request)
+        if response.status_code == 200:
+            response.stream = _RecordingStream(
+                response.stream, self._saver(request, response)
+            )
+        return response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.inner is None:
+            return self.cassette.replay(request)
+        response = await self.inner.handle_async_request(request)
+        if response.status_code == 200:
+            response.stream = _AsyncRecordingStream(
+                response.stream, self._saver(request, response)
+            )
+        return response
+
+    def close(self) -> None:
+        if self.inner is not None:
+            self.inner.close()
+
+    async def aclose(self) -> None:
+        if self.inner is not None:
+            await self.inner.aclose()
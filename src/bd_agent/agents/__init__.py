@@ -4,13 +4,34 @@ agents — public API for all the agents within the bd_agent
 Public API:
 - run_analyzer
 - run_screener
-- run_advicer
+- run_advisor
+
+The agents are a lazy registry: an agent's module (and its pandas,
+matplotlib, pydantic_ai ... imports) loads on first attribute access, i.e.
+when the router first sends an intent to it.
 """
 
-from .analyze_agent.analyze_agent import run as run_analyzer
-from .screener_agent.screener_agent import run as run_screener
-from .advisor_agent.general_investment_advice import (
-    run as run_advisor,
-)
+import importlib
+
+# public name -> (module, function)
+_REGISTRY = {
+    "run_analyzer": ("bd_agent.agents.analyze_agent.analyze_agent", "run"),
+    "run_screener": ("bd_agent.agents.screener_agent.screener_agent", "run"),
+    "run_advisor": ("bd_agent.agents.advisor_agent.general_investment_advice", "run"),
+}
 
 __all__ = ["run_analyzer", "run_screener", "run_advisor"]
+
+
+def __getattr__(name: str):
+    try:
+        module, attr = _REGISTRY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    fn = getattr(importlib.import_module(module), attr)
+    globals()[name] = fn  # later lookups skip __getattr__
+    return fn
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_REGISTRY))
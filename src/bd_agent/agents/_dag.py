@@ -0,0 +1,102 @@
+"""Small dependency-graph executor for agent pipelines.
+
+Each Stage names the stages it depends on and receives their results as
+keyword arguments. Stages start as soon as their dependencies are done, so
+independent stages run concurrently in a thread pool. The caller's
+contextvars (tracing spans) are copied into every stage.
+"""
+
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from bd_agent import tracing
+
+
+MAX_WORKERS = 4
+
+
+# ---- Errors ----
+class DagError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One pipeline step: fn(**{dep: result of dep, ...}) -> result"""
+
+    name: str
+    fn: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+
+
+def _check(stages: list[Stage], inputs: dict[str, Any]) -> None:
+    """Raises DagError for duplicate names, unknown dependencies and cycles"""
+    names = [s.name for s in stages]
+    if len(set(names)) != len(names):
+        raise DagError(f"Duplicate stage names in {names}")
+    clash = set(names) & set(inputs)
+    if clash:
+        raise DagError(f"Stage names clash with inputs: {sorted(clash)}")
+
+    known = set(names) | set(inputs)
+    for s in stages:
+        unknown = set(s.deps) - known
+        if unknown:
+            raise DagError(f"Stage {s.name!r} depends on unknown {sorted(unknown)}")
+
+    # Kahn's algorithm: every stage must become runnable
+    done = set(inputs)
+    pending = list(stages)
+    while pending:
+        ready = [s for s in pending if set(s.deps) <= done]
+        if not ready:
+            raise DagError(f"Cycle between stages {[s.name for s in pending]}")
+        done.update(s.name for s in ready)
+        pending = [s for s in pending if s.name not in done]
+
+
+def run_dag(
+    stages: list[Stage],
+    inputs: dict[str, Any] | None = None,
+    max_workers: int = MAX_WORKERS,
+) -> dict[str, Any]:
+    """Runs the stages in dependency order, independent ones concurrently.
+    `inputs` are available to stages like results of finished stages.
+    Returns {name: result} for inputs and stages. The first failing stage
+    cancels everything not yet started and its exception is re-raised
+    without waiting for stages that are already running."""
+
+    results: dict[str, Any] = dict(inputs or {})
+    _check(stages, results)
+
+    pending = list(stages)
+    running: dict[Future, Stage] = {}
+
+    def _run(stage: Stage) -> Any:
+        with tracing.span(f"stage.{stage.name}"):
+            return stage.fn(**{d: results[d] for d in stage.deps})
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while pending or running:
+            ready = [s for s in pending if all(d in results for d in s.deps)]
+            for stage in ready:
+                pending.remove(stage)
+                context = contextvars.copy_context()
+                running[executor.submit(context.run, _run, stage)] = stage
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                stage = running.pop(future)
+                results[stage.name] = future.result()
+    except BaseException:
+        # do not wait for stages still running, their results are not needed
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    executor.shutdown()
+
+    return results
@@ -1,40 +1,34 @@
 """Module returns the top KPI:s for the industy of the instrument based on web research"""
 
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import bd_agent.bd as bd
-from openai import OpenAI
+from bd_agent import tracing
+from bd_agent.cache import cache_key, memo_cache, text_hash
+from bd_agent.llm import call, chat_model, run_agent_sync
 from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIChatModel
 from ._models import KPISuggestion
-from bd_agent.agents._find_industry_kpis._helpers import validate_kpi_suggestions
+from bd_agent.agents._find_industry_kpis._helpers import (
+    is_valid_kpi_suggestions,
+    validate_kpi_suggestions,
+)
 
 
-def _find_industry_kpis(insId: int) -> list[KPISuggestion]:
-    """funktionen är en agent som tar ett company ID som input och returnera
-    en lista med relevanta KPI:er. För varje KPI finns info om:
-    - namn
-    - kpiId (i Börsdata)
-    - rationale
-    - sources
-    """
-    # find sector name
-    sectorId = bd.get_instrument_info_by_id(insId).sectorId
-    sectorName = bd.get_sectors()[sectorId]
+logger = logging.getLogger(__name__)
 
-    # find industry name
-    industryId = bd.get_instrument_info_by_id(insId).industryId
-    industryName = bd.get_industries()[industryId]
+MODEL = "gpt-4o"
+SUGGESTION_TTL = 30 * 24 * 3600.0  # seconds before an industry is asked again
+PREWARM_WORKERS = 4
 
-    # find industry companies and save in a list (can to sector too if you want)
-    industry_companies = bd.get_companies_by_industry(industryId)
-    industry_list = [comp["name"] for comp in industry_companies]
-
-    system_prompt = f"""
+SYSTEM_PROMPT_TEMPLATE = """
                         Du är en investeringsanalytiker. 
                         Ditt mål är att identifiera de 5-10 nyckeltal (KPI:er) som är mest relevanta för analys 
                         av bolag inom sektorn "{sectorName}" och branschen "{industryName}". Fokusera på att ta reda på inte bara
                         generella KPI:er för bolag utan i synnerhet på sektorn "{sectorName}" och branschen "{industryName}".
                         
-                        Bolag som är i denna industry och som går leta relevanta KPI:er för är: {industry_list[:20]}
+                        Bolag som är i denna industry och som går leta relevanta KPI:er för är: {industry_list}
 
                         1. Använd primärt information från välkända, trovärdiga finanskällor:
                         - Investopedia
@@ -47,7 +41,7 @@ def _find_industry_kpis(insId: int) -> list[KPISuggestion]:
                         'energy sector key financial ratios site:investopedia.com' eller 'consumer goods KPIs site:morningstar.com').
 
                         När du har tagit fram förslag på 5-10 nyckeltal, matcha dem mot denna lista och returnera det exakta namnet enligt listan för varje.
-                        {bd.kpi_map}
+                        {kpi_map}
                         
                         Returnera en sammanställning på svenska med:
                         - De 5–10 nyckeltal som är mest använda i denna bransch (id och namn)
@@ -55,17 +49,119 @@ def _find_industry_kpis(insId: int) -> list[KPISuggestion]:
                         - Källa för varje nyckeltal
                         """
 
+_cache = memo_cache("industry_kpis", maxsize=256, ttl=SUGGESTION_TTL)
+
+
+def _find_industry_kpis(insId: int) -> list[KPISuggestion]:
+    """funktionen är en agent som tar ett company ID som input och returnera
+    en lista med relevanta KPI:er. För varje KPI finns info om:
+    - namn
+    - kpiId (i Börsdata)
+    - rationale
+    - sources
+    Förslagen cachas per bransch, se suggest_industry_kpis.
+    """
+    info = bd.get_instrument_info_by_id(insId)
+    return suggest_industry_kpis(info.industryId, sectorId=info.sectorId)
+
+
+def _cache_key(industryId: int) -> str:
+    """Industry, model, prompt version, the KPI list the answer is matched
+    against and the Börsdata instance the industry ids come from"""
+    return cache_key(
+        industryId,
+        MODEL,
+        text_hash(SYSTEM_PROMPT_TEMPLATE),
+        text_hash(json.dumps(bd.kpi_map, sort_keys=True)),
+        bd.BorsdataClient().base_url,
+    )
+
+
+def suggest_industry_kpis(
+    industryId: int, sectorId: int | None = None, refresh: bool = False
+) -> list[KPISuggestion]:
+    """Relevant KPIs for an industry. Validated suggestions are cached on disk
+    per industryId for SUGGESTION_TTL, refresh=True asks the LLM again."""
+
+    key = _cache_key(industryId)
+    if not refresh:
+        cached = _cache.get(key)
+        if cached is not None:
+            tracing.current_span().set(**{"cache.industry_kpis": "hit"})
+            return [KPISuggestion.model_validate(k) for k in cached]
+
+    suggestions = _ask_industry_kpis(industryId, sectorId)
+    if is_valid_kpi_suggestions(suggestions):
+        _cache.set(key, [k.model_dump() for k in suggestions])
+    return suggestions
+
+
+def _ask_industry_kpis(industryId: int, sectorId: int | None) -> list[KPISuggestion]:
+    """Runs the KPI agent for one industry"""
+    # find industry companies and save in a list (can to sector too if you want)
+    industry_companies = bd.get_companies_by_industry(industryId)
+    industry_list = [comp["name"] for comp in industry_companies]
+
+    # find sector and industry name
+    if sectorId is None:
+        sectorId = industry_companies[0]["sectorId"]
+    sectorName = bd.metadata_registry.sectors[sectorId]
+    industryName = bd.metadata_registry.industries[industryId]
+
+    system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
+        sectorName=sectorName,
+        industryName=industryName,
+        industry_list=industry_list[:20],
+        kpi_map=bd.kpi_map,
+    )
+
     kpi_agent = Agent(
-        model=OpenAIChatModel("gpt-4o"),
+        model=chat_model(MODEL),
         output_type=list[KPISuggestion],
         # deps_type=
         system_prompt=system_prompt,
     )
 
     # kör agenten
-    result = kpi_agent.run_sync()
+    with call("llm.kpi_agent", MODEL) as span:
+        result = run_agent_sync(kpi_agent)
+        span.set_usage(result.usage())
 
     # validate the KPI suggestion. if nothing happen its OK, else error raised
     validate_kpi_suggestions(result.output)
 
     return result.output
+
+
+def prewarm_industry_kpis(
+    refresh: bool = False, max_workers: int = PREWARM_WORKERS
+) -> dict[str, dict[int, int | str]]:
+    """Fills the suggestion cache for every industry with listed companies.
+    An industry that fails is logged and skipped, the others still run.
+    Returns {"kpis": {industryId: number of suggested KPIs},
+             "failed": {industryId: error}}."""
+
+    universe = bd.BorsdataClient().get_universe()
+    industry_ids = sorted(
+        i for i in bd.metadata_registry.industries if i in universe.by_industry
+    )
+
+    results: dict[str, dict[int, int | str]] = {"kpis": {}, "failed": {}}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(suggest_industry_kpis, i, refresh=refresh): i
+            for i in industry_ids
+        }
+        for future in as_completed(futures):
+            industryId = futures[future]
+            try:
+                results["kpis"][industryId] = len(future.result())
+            except Exception as e:
+                logger.warning(
+                    "KPI suggestion for industry %s failed: %r", industryId, e
+                )
+                results["failed"][industryId] = f"{type(e).__name__}: {e}"
+
+    results["kpis"] = dict(sorted(results["kpis"].items()))
+    results["failed"] = dict(sorted(results["failed"].items()))
+    return results
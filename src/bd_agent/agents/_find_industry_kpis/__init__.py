@@ -3,8 +3,13 @@ _match_company_to_industy — intern matches name to industry
 
 Publikt API:
 - run
+- suggest_industry_kpis / prewarm_industry_kpis: KPI-förslag cachade per bransch
 """
 
-from .__find_industry_kpis import _find_industry_kpis
+from .__find_industry_kpis import (
+    _find_industry_kpis,
+    prewarm_industry_kpis,
+    suggest_industry_kpis,
+)
 
-__all__ = ["_find_industry_kpis"]
+__all__ = ["_find_industry_kpis", "prewarm_industry_kpis", "suggest_industry_kpis"]
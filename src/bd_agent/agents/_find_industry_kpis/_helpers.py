@@ -15,3 +15,10 @@ def validate_kpi_suggestions(suggestions: list[KPISuggestion]) -> None:
         print(f"Could not match KPI id {kpiId} to kpi name {kpiName}")
 
     return None
+
+
+def is_valid_kpi_suggestions(suggestions: list[KPISuggestion]) -> bool:
+    """True when every suggested id exists in the kpi map with the same name"""
+    return bool(suggestions) and all(
+        bd.kpi_map.get(kpi.id) == kpi.name for kpi in suggestions
+    )
@@ -0,0 +1,149 @@
+"""Name/ticker/ISIN match index over the instrument universe.
+
+Built once per universe version and shared by all lookups. Exact hits and
+clear fuzzy winners are resolved here without any LLM call; only close fuzzy
+scores are left to the name agent as a list of candidates.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+
+from rapidfuzz import fuzz, process
+
+from bd_agent.bd import BorsdataClient
+from bd_agent.bd._universe import InstrumentUniverse
+
+
+TOP_N = 20  # candidates handed to the LLM tie-breaker
+MIN_SCORE = 90.0  # fuzzy winner must score at least this ...
+MIN_MARGIN = 10.0  # ... and beat the runner-up by this much
+MAX_SPAN_WORDS = 6  # longest phrase looked up in the prompt
+_STRIP = ".,!?;:\"'()[]"
+_SENTENCE_END = ".!?"
+# upper-case words in finance prompts that are also tickers or short names
+STOPWORDS = frozenset(
+    "i a ai it ok vd ceo cfo ipo etf esg kpi roic roe roa eps pe ev ebit ebitda"
+    " gdp eu us usa sek usd eur nok dkk".split()
+)
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.casefold().split())
+
+
+@dataclass
+class NameMatch:
+    """Result of a lookup: `instrument` when resolved locally (`method` is
+    "exact" or "fuzzy"), otherwise the `candidates` for the tie-breaker"""
+
+    instrument: dict | None
+    method: str
+    candidates: list[str] = field(default_factory=list)
+
+
+class NameIndex:
+    """Exact lookup tables and pre-normalized fuzzy choices for a universe"""
+
+    def __init__(self, universe: InstrumentUniverse) -> None:
+        self.version = universe.version
+        self.by_name: dict[str, dict] = {}
+        self.by_ticker: dict[str, dict] = {}
+        self.by_isin: dict[str, dict] = {}
+        for ins in universe.instruments:
+            # first listing wins, like the DataFrame lookup did
+            if ins.get("name"):
+                self.by_name.setdefault(_normalize(ins["name"]), ins)
+            if ins.get("ticker"):
+                self.by_ticker.setdefault(_normalize(ins["ticker"]), ins)
+            if ins.get("isin"):
+                self.by_isin.setdefault(ins["isin"].upper(), ins)
+        self._keys = list(self.by_name)
+        self._names = [self.by_name[k]["name"] for k in self._keys]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def exact(self, text: str) -> dict | None:
+        """Instrument whose name, ticker or ISIN equals `text` (case-insensitive)"""
+        key = _normalize(text.strip(_STRIP))
+        return (
+            self.by_name.get(key)
+            or self.by_ticker.get(key)
+            or self.by_isin.get(key.upper())
+        )
+
+    def find_in_prompt(self, user_prompt: str) -> dict | None:
+        """Longest phrase of the prompt that is exactly a name, ticker or ISIN.
+        A single word only matches as an ISIN, an upper-case ticker, or a
+        capitalized name that does not start a sentence, and never when it
+        is a common finance term (STOPWORDS), so "Should I buy ..." or
+        "the ROIC of ..." do not resolve to a company."""
+        raw = user_prompt.split()
+        words = [w.strip(_STRIP) for w in raw]
+        for size in range(min(MAX_SPAN_WORDS, len(words)), 0, -1):
+            for i in range(len(words) - size + 1):
+                phrase = " ".join(words[i : i + size])
+                if not phrase:
+                    continue
+                key = _normalize(phrase)
+                if size > 1:
+                    ins = self.by_name.get(key)
+                    if ins is None and phrase == phrase.upper():
+                        ins = self.by_ticker.get(key)  # "VOLV B"
+                else:
+                    sentence_start = i == 0 or raw[i - 1][-1] in _SENTENCE_END
+                    ins = self._single_word(phrase, key, sentence_start)
+                if ins is not None:
+                    return ins
+        return None
+
+    def _single_word(self, word: str, key: str, sentence_start: bool) -> dict | None:
+        ins = self.by_isin.get(key.upper())
+        if ins is not None or key in STOPWORDS:
+            return ins
+        if word == word.upper():
+            ins = self.by_ticker.get(key)
+        if ins is None and word[0].isupper() and not sentence_start:
+            ins = self.by_name.get(key)
+        return ins
+
+    def match(self, name: str, n: int = TOP_N) -> NameMatch:
+        """Exact hit, else a clear fuzzy winner, else the top-n candidates"""
+        ins = self.exact(name)
+        if ins is not None:
+            return NameMatch(ins, "exact")
+
+        scored = process.extract(
+            _normalize(name),
+            self._keys,
+            scorer=fuzz.token_sort_ratio,
+            processor=None,
+            limit=n,
+        )
+        if not scored:
+            return NameMatch(None, "none")
+        top = scored[0][1]
+        runner_up = scored[1][1] if len(scored) > 1 else 0.0
+        if top >= MIN_SCORE and top - runner_up >= MIN_MARGIN:
+            return NameMatch(self.by_name[scored[0][0]], "fuzzy")
+        return NameMatch(None, "ambiguous", [self._names[i] for _, _, i in scored])
+
+
+# ---- One index per universe version ----
+_indexes: dict[str, NameIndex] = {}
+_index_lock = threading.Lock()
+
+
+def name_index(universe: InstrumentUniverse | None = None) -> NameIndex:
+    """The NameIndex for the (cached) universe, rebuilt only when it changes"""
+    if universe is None:
+        universe = BorsdataClient().get_universe()
+    with _index_lock:
+        index = _indexes.get(universe.version)
+        if index is None:
+            index = NameIndex(universe)
+            _indexes.clear()  # older versions are never asked for again
+            _indexes[universe.version] = index
+        return index
@@ -1,7 +1,6 @@
 """Module extracts the name from user prompt - name is then used for name_interpreter_agent"""
 
-from openai import OpenAI
-from bd_agent.settings import get_openai_key
+from bd_agent.llm import call, openai_client
 
 
 SYSTEM_PROMPT = (
@@ -13,19 +12,19 @@ SYSTEM_PROMPT = (
     "Exempel på bolagsnamn är Investor B, Swedbank A, Generic Sweden AB, SSAB etc."
 )
 
-client = OpenAI(api_key=get_openai_key())
-
 
 def extract_name(user_prompt: str):
     """Returns name part based on their prompt."""
 
-    response = client.responses.create(
-        model="gpt-4o",
-        temperature=0.0,
-        input=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
+    with call("llm.extract_name", "gpt-4o") as span:
+        response = openai_client().responses.create(
+            model="gpt-4o",
+            temperature=0.0,
+            input=[
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+        span.set_usage(response.usage)
 
     return response.output_text
@@ -7,12 +7,11 @@ Pydantic Agent that interprets user input and returns a dict {insId:int, name:st
 
 from __future__ import annotations
 
+import functools
 from typing import TypedDict
 
-import pandas as pd
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext
-from pydantic_ai.models.openai import OpenAIChatModel
 from pydantic_ai.messages import (
     ModelResponse,
     ModelRequest,
@@ -23,15 +22,20 @@ from pydantic_ai.messages import (
 )
 
 from dataclasses import dataclass
-from rapidfuzz import process, fuzz
 
-from bd_agent.bd import BorsdataClient
+from bd_agent import tracing
+from bd_agent.llm import call, chat_model, run_agent_sync
 
+from ._index import name_index
 from .extract_name_from_prompt import extract_name
 
 """ CLASSES """
 
 
+class NameInterpretationError(RuntimeError):
+    pass
+
+
 class CompanyInterpretation(BaseModel):
     insId: int
     name: str
@@ -45,20 +49,25 @@ class Deps:
 
 """ AGENT """
 
-name_agent = Agent(
-    model=OpenAIChatModel("gpt-4o"),
-    output_type=str,
-    deps_type=Deps,
-    system_prompt=(
-        "Utifrån användarens meddelande ska du först tolka vilken del som är ett bolagsnamn."
-        "Du kommer i nästa systemmeddelande få en lista med bolagsnamn."
-        "Du får ENDAST välja ett namn från den lista du får i nästa systemmeddelande."
-        "Returnera ett namn exakt så som det står i listan."
-    ),
-)
+
+@functools.cache
+def name_agent() -> Agent:
+    """The name agent, built on first use (reads OPENAI_* settings then)"""
+    agent = Agent(
+        model=chat_model("gpt-4o"),
+        output_type=str,
+        deps_type=Deps,
+        system_prompt=(
+            "Utifrån användarens meddelande ska du först tolka vilken del som är ett bolagsnamn."
+            "Du kommer i nästa systemmeddelande få en lista med bolagsnamn."
+            "Du får ENDAST välja ett namn från den lista du får i nästa systemmeddelande."
+            "Returnera ett namn exakt så som det står i listan."
+        ),
+    )
+    agent.system_prompt(dynamic=True)(dynamic_system_prompt)
+    return agent
 
 
-@name_agent.system_prompt(dynamic=True)
 def dynamic_system_prompt(ctx: RunContext[Deps]) -> str:
     bm = ctx.deps.best_matches
     lines = "\n".join(f"- {name}" for name in bm)
@@ -72,74 +81,55 @@ def dynamic_system_prompt(ctx: RunContext[Deps]) -> str:
 """ AGENT RUN FUNCTION """
 
 
-def run(user_prompt: str) -> CompanyInterpretation:
+def run(user_prompt: str, companies: list[str] | None = None) -> CompanyInterpretation:
     """
-    1) Agenten tar user prompt
-    2) Agenten hämtar en lista av bolagsnamn från nordic_instruments, dvs BD API.
-
-
-    Låt agenten välja ETT namn från tillåten lista.
-    2) Slå upp insId/ticker deterministiskt i DF.
-    3) Returnera CompanyInterpretation.
+    1) Leta efter ett exakt bolagsnamn/ticker/ISIN i user prompt (ingen LLM).
+    2) Annars ta namnet från routerns parse (`companies`) eller extrahera
+       det med LLM, och matcha det mot indexet:
+       exakt träff eller tydlig fuzzy-vinnare avgör direkt.
+    3) Bara när toppkandidaterna ligger nära varandra får agenten välja
+       ETT namn från listan.
+    4) Returnera CompanyInterpretation.
     """
 
-    # extract name from total user prompt
-    extracted_name = extract_name(user_prompt)
-
-    df = get_nordic_instruments_df()  # skapar en df med insId, name, ticker från BD API
-    names = df["name"].values.tolist()  # skapar en lista med alla bolagsnamn
-    best_matches = find_best_matches(extracted_name, names)  # hitta top-N matchningar
-    deps = Deps(best_matches=best_matches)  # best matches är en lista med str
+    with tracing.span("name_interpretation.match") as span:
+        index = name_index()  # byggs en gång per universe-version
+        instrument = index.find_in_prompt(user_prompt)
+        span.set(**{"name.method": "prompt" if instrument else "none"})
+    if instrument is not None:
+        return _interpretation(instrument)
+
+    # name from the router's parse, else extract it from total user prompt
+    if companies:
+        extracted_name = companies[0]
+    else:
+        extracted_name = extract_name(user_prompt)
+
+    with tracing.span("name_interpretation.fuzzy_match") as span:
+        match = index.match(extracted_name)
+        span.set(**{"name.method": match.method})
+    if match.instrument is not None:
+        return _interpretation(match.instrument)
+    if not match.candidates:
+        raise NameInterpretationError(f"No instrument matches {extracted_name!r}")
 
     """Kör agenten och printa resulatet"""
-    result = name_agent.run_sync(extracted_name, deps=deps)
-    # print("\n==== RAW RESPONSE ====")
-    # print(result)
-    # print("\n=== COST & USAGE ===")
-    # print(result.usage())
-    # print("\n=== ALL MESSAGES ===")
-    # print(log_model_request_response(result.all_messages()))
-    # print("\n=== OUTPUT ===")
-    # print(result.output)
-    comp_dict = find_ticker_and_insId(result.output, df)  # TICK och INSID från df
-    # print("\n=== FINAL RESULT ===")
-    # print(CompanyInterpretation(**comp_dict))  # access del genom .InsId etc
-    return CompanyInterpretation(**comp_dict)
+    deps = Deps(best_matches=match.candidates)  # best matches är en lista med str
+    with call("llm.name_agent", "gpt-4o") as span:
+        result = run_agent_sync(name_agent(), extracted_name, deps=deps)
+        span.set_usage(result.usage())
+    # agenten ska svara med ett namn från listan, annars tas bästa fuzzy-träffen
+    instrument = index.exact(result.output) or index.exact(match.candidates[0])
+    return _interpretation(instrument)
 
 
 """ helper functions below """
 
 
-def find_best_matches(extracted_name: str, companies: list, n=20):
-    """Return top-N matchningar baserat på fuzzy matchning"""
-    matches = process.extract(
-        query=extracted_name,
-        choices=companies,
-        scorer=fuzz.token_sort_ratio,
-        limit=n,
-    )
-    return [match[0] for match in matches]
-
-
-def get_nordic_instruments_df() -> pd.DataFrame:
-    instruments = BorsdataClient().get_nordic_instruments()
-    df_raw = pd.DataFrame(instruments)
-    df_new = df_raw.drop(
-        columns=[
-            "urlName",
-            "instrument",
-            "isin",
-            "yahoo",
-            "sectorId",
-            "countryId",
-            "marketId",
-            "industryId",
-            "listingDate",
-            "stockPriceCurrency",
-            "reportCurrency",
-        ]
+def _interpretation(instrument: dict) -> CompanyInterpretation:
+    return CompanyInterpretation(
+        insId=instrument["insId"], name=instrument["name"], ticker=instrument["ticker"]
     )
-    return df_new.copy()
 
 
 def log_model_request_response(result_all_messages):
@@ -148,10 +138,3 @@ def log_model_request_response(result_all_messages):
     for i in ram:
         count += 1
         print(f"--------------Message {count}--------------\n", i)
-
-
-def find_ticker_and_insId(company_name, df) -> dict:
-    """Takes company name and dataframe. Returns dict with insId, name, ticker for the company."""
-    selected_row = df.loc[df["name"] == company_name]
-    company_dict = selected_row.iloc[0].to_dict()
-    return company_dict
@@ -1,15 +1,15 @@
 """Module is an agent that gives general investment advices or responds to general questions about finance"""
 
+import time
+from typing import Iterator
+
 from openai import OpenAI
-from bd_agent.settings import get_openai_key
+from bd_agent import tracing
+from bd_agent.llm import call, openai_client
 import bd_agent.bd as bd
 
 
-def run(user_prompt: str):
-    """Runs the general investment advice agent"""
-    client = OpenAI(api_key=get_openai_key())
-
-    SYSTEM_PROMPT = """
+SYSTEM_PROMPT = """
                         You are a world-class investment advisor and stock market strategist.
                         Your goal is to deliver **personalized**, **engaging**, and **practically useful** financial insights 
                         that help each user think and act like a confident investor.
@@ -71,13 +71,56 @@ def run(user_prompt: str):
                         and rooted in real investment logic.
                     """
 
-    response = client.responses.create(
-        model="gpt-4o",
-        temperature=0.7,
-        input=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-    )
+
+@tracing.traced("agent.advise")
+def run(user_prompt: str, stream: bool = False) -> str | Iterator[str]:
+    """Runs the general investment advice agent.
+    stream=True returns an iterator of text deltas as they are generated."""
+    client = openai_client()
+    if stream:
+        # the generator runs after this span has ended, keep it as parent
+        return _stream_advice(client, user_prompt, tracing.current_span())
+
+    with call("llm.advisor", "gpt-4o") as span:
+        response = client.responses.create(
+            model="gpt-4o",
+            temperature=0.7,
+            input=_messages(user_prompt),
+        )
+        span.set_usage(response.usage)
 
     return response.output_text
+
+
+def _messages(user_prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _stream_advice(client: OpenAI, user_prompt: str, parent) -> Iterator[str]:
+    """Yields the answer's text deltas. The span covers the whole generation
+    and records the time to the first token. The response stream is closed
+    also when the caller stops reading early."""
+    with (
+        tracing.use_span(parent),
+        call("llm.advisor", "gpt-4o", **{"llm.stream": True}) as span,
+    ):
+        start = time.perf_counter()
+        first = True
+        with client.responses.create(
+            model="gpt-4o",
+            temperature=0.7,
+            input=_messages(user_prompt),
+            stream=True,
+        ) as events:
+            for event in events:
+                if event.type == "response.output_text.delta":
+                    if first:
+                        ttft_ms = (time.perf_counter() - start) * 1e3
+                        span.set(**{"llm.ttft_ms": round(ttft_ms, 3)})
+                        first = False
+                    yield event.delta
+                elif event.type == "response.completed":
+                    span.set_usage(event.response.usage)
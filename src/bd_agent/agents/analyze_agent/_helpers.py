@@ -1,10 +1,10 @@
 """helpers to the analyze_agent"""
 
 import math
-import requests
 import pandas as pd
 import matplotlib.pyplot as plt
 import bd_agent.bd as bd
+from bd_agent import tracing
 from bd_agent.agents._find_industry_kpis.__find_industry_kpis import _find_industry_kpis
 from bd_agent.agents._find_industry_kpis._models import KPISuggestion
 
@@ -19,14 +19,28 @@ def filter_relevant_kpis(df: pd.DataFrame, relKpis: KPISuggestion) -> pd.DataFra
     return df_subset
 
 
-def create_kpis_report(df: pd.DataFrame, insId: int, rel_kpis: list[KPISuggestion]):
-    """ """
+def create_kpis_report(
+    df: pd.DataFrame,
+    insId: int,
+    rel_kpis: list[KPISuggestion],
+    industry_avg_df: pd.DataFrame | None = None,
+):
+    """Plots the company KPIs against the industry. industry_avg_df is fetched
+    with get_industry_average_kpis when not passed in."""
     # sort the input df on KpiId and year
     df = df.sort_values(by=["KpiId", "y"])
 
     # get industry data
-    industryId = bd.get_instrument_info_by_id(insId).industryId
-    industry_avg_df = get_industry_average_kpis(industryId, rel_kpis)
+    if industry_avg_df is None:
+        industryId = bd.get_instrument_info_by_id(insId).industryId
+        industry_avg_df = get_industry_average_kpis(industryId, rel_kpis)
+
+    with tracing.span("analyze.render"):
+        return _plot_kpis(df, industry_avg_df)
+
+
+def _plot_kpis(df: pd.DataFrame, industry_avg_df: pd.DataFrame):
+    """Draws one subplot per KPI: company values, industry avg and p25-p75 band"""
 
     # group by KPI
     kpi_groups = list(df.groupby("KpiId"))
@@ -56,9 +70,17 @@ def create_kpis_report(df: pd.DataFrame, insId: int, rel_kpis: list[KPISuggestio
             label="Company",
         )
 
-        # plot industry average
+        # plot industry average with the 25-75 percentile band
         industry_subset = industry_avg_df[industry_avg_df["KpiId"] == kpi_id]
         if not industry_subset.empty:
+            ax.fill_between(
+                industry_subset["y"],
+                industry_subset["industry_p25"],
+                industry_subset["industry_p75"],
+                color="green",
+                alpha=0.15,
+                label="Industry p25-p75",
+            )
             ax.plot(
                 industry_subset["y"],
                 industry_subset["industry_avg"],
@@ -80,58 +102,57 @@ def create_kpis_report(df: pd.DataFrame, insId: int, rel_kpis: list[KPISuggestio
 
 
 # -------- internal functions --------
+# describe() column -> industry stats column
+INDUSTRY_STAT_COLUMNS = {
+    "mean": "industry_avg",
+    "50%": "industry_median",
+    "25%": "industry_p25",
+    "75%": "industry_p75",
+    "count": "n",
+}
+
+
+@tracing.traced("analyze.industry_history")
 def get_industry_average_kpis(
     industryId, rel_kpis: list[KPISuggestion], report_type="year", price_type="mean"
 ) -> pd.DataFrame:
-    """Takes industryId and kpiList as argument and returns a df: [year,insId, kpiId, value] with averages per year"""
-
-    # get a list of companyId for industry and a list for kpiId for industry
-    compList = [i for i in range(0, 130)]
-    kpiList = [kpi.id for kpi in rel_kpis]
-
-    # create bd client
-    client = bd.BorsdataClient()
-
-    # loop companies in chunks over kpis and return a df
-    rows = []
-    for kpi_id in kpiList:
-        for chunk in chunk_list(compList, 50):
-            # print(f"{kpi_id}:NEW CHUNK------------------")
-            # print(chunk)
-            url = f"{client.base_url}/Instruments/kpis/{kpi_id}/{report_type}/{price_type}/history"
-            params = {"authKey": client.api_key, "instList": ",".join(map(str, chunk))}
-            response = requests.get(url, params=params, timeout=60)
-            data = response.json()
-            # print("DATAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA")
-            # print(data)
-            # print(type(data))
-
-            for item in data.get("kpisList", []):
-                ins = item["instrument"]
-                for v in item.get("values", []):
-                    val = v.get("v")
-                    if val is not None:
-                        rows.append(
-                            {
-                                "y": v["y"],
-                                "insId": ins,
-                                "KpiId": kpi_id,
-                                "value": float(val),
-                            }
-                        )
-    df = pd.DataFrame(rows)
-
-    # use industry data in df to create industry average df
-    industry_avg = (
-        df.groupby(["KpiId", "y"], as_index=False)["value"]
-        .mean()
-        .rename(columns={"value": "industry_avg"})
+    """Takes industryId and kpiList as argument and returns a df with one row per
+    (KpiId, y): industry_avg, industry_median, industry_p25, industry_p75 and n,
+    computed over the instruments in the industry"""
+
+    # the industry constituents from the universe index and the kpi ids
+    compList = [comp["insId"] for comp in bd.get_companies_by_industry(industryId)]
+    kpiList = list(dict.fromkeys(kpi.id for kpi in rel_kpis))
+    if not compList or not kpiList:
+        return industry_stats(pd.DataFrame())
+
+    # fetch history for all kpis concurrently, 50 instruments per request
+    histories = bd.run_sync(
+        _fetch_kpi_histories(kpiList, compList, report_type, price_type)
     )
 
-    return industry_avg
+    df = bd.kpi_history_frame(histories)
 
+    return industry_stats(df)
 
-def chunk_list(lst, size=50):
-    """Chunks a list into several lists"""
-    for i in range(0, len(lst), size):
-        yield lst[i : i + size]
+
+def industry_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """Mean, median and p25/p75 band of `value` per (KpiId, y) in one groupby"""
+    if df.empty:
+        return pd.DataFrame(columns=["KpiId", "y", *INDUSTRY_STAT_COLUMNS.values()])
+    stats = (
+        df.groupby(["KpiId", "y"])["value"]
+        .describe(percentiles=[0.25, 0.5, 0.75])
+        .rename(columns=INDUSTRY_STAT_COLUMNS)
+    )
+    return stats[list(INDUSTRY_STAT_COLUMNS.values())].reset_index()
+
+
+async def _fetch_kpi_histories(
+    kpi_ids: list[int], ins_ids: list[int], report_type: str, price_type: str
+) -> dict[int, list[dict]]:
+    """Fetches {kpiId: kpisList} for all kpi/instrument batches concurrently"""
+    async with bd.AsyncBorsdataClient() as client:
+        return await client.get_kpi_histories(
+            kpi_ids, ins_ids, reportType=report_type, priceType=price_type
+        )
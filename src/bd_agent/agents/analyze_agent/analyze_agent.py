@@ -6,31 +6,82 @@ from __future__ import annotations
 from bd_agent.agents._name_interpretation_agent.name_interpretation_agent import (
     run as run_name_interpretation_agent,
 )
+from bd_agent import tracing
+import bd_agent.bd as bd
 from bd_agent.bd import BorsdataClient, kpis_json_to_df, get_instrument_info_by_id
+from bd_agent.agents._dag import Stage, run_dag
+from bd_agent.intents import PromptParse
 from bd_agent.agents._find_industry_kpis.__find_industry_kpis import (
     _find_industry_kpis,
 )
-from ._helpers import filter_relevant_kpis, create_kpis_report
+from ._helpers import (
+    create_kpis_report,
+    filter_relevant_kpis,
+    get_industry_average_kpis,
+)
+
+
+""" STAGES """
+
+
+def _warm_metadata() -> None:
+    """Loads the universe and sector/industry names while the name is resolved"""
+    BorsdataClient().get_universe()
+    bd.metadata_registry.sectors
+    bd.metadata_registry.industries
+
+
+def _interpret_name(user_prompt: str, parsed: PromptParse | None = None) -> int:
+    """insId of the company in the user prompt, using the router's parse"""
+    companies = parsed.companies if parsed is not None else None
+    return run_name_interpretation_agent(user_prompt, companies=companies).insId
+
+
+def _kpi_summary(insId: int):
+    """KPI summary df of the company"""
+    kpis_json = BorsdataClient().get_instrument_kpi(insId=insId)
+    return kpis_json_to_df(kpis_json)
+
+
+def _industry_kpis(insId: int, metadata=None):
+    """Relevant KPIs for the company's industry (LLM), once metadata is loaded"""
+    return _find_industry_kpis(insId)
+
+
+def _industry_stats(insId: int, industry_kpis):
+    """Industry avg/median/p25/p75 per KPI and year"""
+    industryId = get_instrument_info_by_id(insId).industryId
+    return get_industry_average_kpis(industryId, industry_kpis)
 
 
-def run(user_prompt: str):
-    """Function takes a user prompt and returns diagrams over relevant KPI's for the company"""
-    # interpret company id from user prompt
-    insId = run_name_interpretation_agent(user_prompt).insId
+ANALYZE_STAGES = [
+    Stage("metadata", _warm_metadata),
+    Stage("insId", _interpret_name, deps=("user_prompt", "parsed")),
+    Stage("kpi_summary", _kpi_summary, deps=("insId",)),
+    Stage("industry_kpis", _industry_kpis, deps=("insId", "metadata")),
+    Stage("industry_stats", _industry_stats, deps=("insId", "industry_kpis")),
+]
 
-    # call bd api and create df of kpis
-    bd = BorsdataClient()
-    kpis_json = bd.get_instrument_kpi(insId=insId)
-    ins_df = kpis_json_to_df(kpis_json)
 
-    # find the industry KPI based on instrument ID
-    rel_kpis = _find_industry_kpis(insId)
+@tracing.traced("agent.analyze")
+def run(user_prompt: str, parsed: PromptParse | None = None):
+    """Function takes a user prompt and returns diagrams over relevant KPI's for the company.
+    The data stages run on a DAG: metadata loads during name interpretation,
+    the KPI summary fetch overlaps the industry KPI suggestion.
+    `parsed` is the router's PromptParse, its company names are used instead
+    of extracting the name again."""
+    results = run_dag(
+        ANALYZE_STAGES, inputs={"user_prompt": user_prompt, "parsed": parsed}
+    )
+    insId, rel_kpis = results["insId"], results["industry_kpis"]
 
     # filter df for relevant kpis
-    df_subset = filter_relevant_kpis(ins_df, rel_kpis)
+    df_subset = filter_relevant_kpis(results["kpi_summary"], rel_kpis)
 
-    # create report for the relevant kpis
-    fig = create_kpis_report(df_subset, insId, rel_kpis)
+    # create report for the relevant kpis, in the calling thread (matplotlib)
+    fig = create_kpis_report(
+        df_subset, insId, rel_kpis, industry_avg_df=results["industry_stats"]
+    )
     print(type(fig))
     # fig.show()
     return fig
@@ -1,11 +1,15 @@
 """Module is the screener agent. The agent returns a df of companies based on screening criteria."""
 
+import functools
+
 import bd_agent.bd as bd
 import pandas as pd
 from dataclasses import dataclass
 from pydantic import BaseModel
 from pydantic_ai import Agent, RunContext
-from pydantic_ai.models.openai import OpenAIChatModel
+from bd_agent import tracing
+from bd_agent.intents import PromptParse
+from bd_agent.llm import chat_model
 from bd_agent.settings import get_openai_key
 
 
@@ -19,20 +23,32 @@ class Deps:
 
 """ AGENT """
 
-screener_agent = Agent(
-    model=OpenAIChatModel("gpt-4o"),
-    output_type=str,
-    deps_type=Deps,
-    system_prompt=(
-        """
-            Screen stocks based on the user prompt.
-        """
-    ),
-)
-
 
-def run(user_prompt: str):
-    """Runs the screening agent."""
+@functools.cache
+def screener_agent() -> Agent:
+    """The screener agent, built on first use"""
+    return Agent(
+        model=chat_model("gpt-4o"),
+        output_type=str,
+        deps_type=Deps,
+        system_prompt=(
+            """
+                Screen stocks based on the user prompt.
+            """
+        ),
+    )
+
+
+@tracing.traced("agent.screen")
+def run(user_prompt: str, parsed: PromptParse | None = None):
+    """Runs the screening agent. `parsed` is the router's PromptParse, its
+    sectors, countries and KPI hints are the screening filters."""
+    if parsed is not None:
+        tracing.current_span().set(
+            sectors=parsed.sectors,
+            countries=parsed.countries,
+            kpi_hints=parsed.kpi_hints,
+        )
     bd_client = bd.BorsdataClient()
     df = pd.DataFrame(bd_client.get_nordic_instruments())
 
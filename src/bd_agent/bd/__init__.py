@@ -3,29 +3,59 @@ bd — adapters mot Börsdata API.
 
 Publikt API:
 - BorsdataClient: client to interact with Börsdata API
+- AsyncBorsdataClient: asyncio client with concurrent fan-out
+- run_sync: runs an AsyncBorsdataClient coroutine from sync code
+- BorsdataError: raised when a Börsdata call fails after retries
+- InstrumentUniverse: cached instrument list with insId/industry/sector/ticker indexes
+- BorsdataStore: local SQLite mirror that the client reads before the API
+- sync_mirror: fills and refreshes the local mirror
+- kpis_json_to_df / kpi_history_frame / kpis_pivot: columnar KPI DataFrames
+- metadata_registry / invalidate_metadata: cached sector and industry names
 """
 
-from bd_agent.bd._client import BorsdataClient
+from bd_agent.bd._client import BorsdataClient, BorsdataError
+from bd_agent.bd._async_client import AsyncBorsdataClient, run_sync
 from bd_agent.bd._models import InstrumentInfo
-from bd_agent.bd.repository import get_instrument_info_by_id, kpis_json_to_df
+from bd_agent.bd._store import BorsdataStore
+from bd_agent.bd._universe import InstrumentUniverse
+from bd_agent.bd.repository import (
+    get_instrument_info_by_id,
+    get_instrument_info_by_ticker,
+    kpis_json_to_df,
+)
 from bd_agent.bd.metadata import (
+    metadata_registry,
+    invalidate_metadata,
     get_sectors,
     get_industries,
     get_companies_by_sector,
     get_companies_by_industry,
 )
 from bd_agent.bd._helpers import kpi_map
+from bd_agent.bd._frames import kpi_history_frame, kpis_pivot
+from bd_agent.bd.mirror import sync_mirror
 
 __all__ = [
     "BorsdataClient",
+    "AsyncBorsdataClient",
+    "run_sync",
+    "BorsdataError",
     "InstrumentInfo",
+    "BorsdataStore",
+    "InstrumentUniverse",
     "get_instrument_info_by_id",
+    "get_instrument_info_by_ticker",
     "kpis_json_to_df",
+    "kpi_history_frame",
+    "kpis_pivot",
+    "metadata_registry",
+    "invalidate_metadata",
     "get_sectors",
     "get_industries",
     "get_companies_by_sector",
     "get_companies_by_industry",
     "kpi_map",
+    "sync_mirror",
 ]
 
 
@@ -0,0 +1,346 @@
+"""Creates the AsyncBorsdataClient class, the asyncio variant of BorsdataClient"""
+
+from __future__ import annotations
+import asyncio
+import contextvars
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Coroutine, Optional, TypeVar
+
+import httpx
+
+from bd_agent import tracing
+
+from ._client import (
+    BASE_URL,
+    HISTORY_BATCH_SIZE,
+    MAX_RETRIES,
+    MIRROR_MAX_AGE,
+    POOL_SIZE,
+    RETRY_STATUSES,
+    TIMEOUT,
+    UNIVERSE_TTL,
+    BorsdataClient,
+    BorsdataError,
+    _chunks,
+    _is_fresh,
+    _limiter,
+    _resolve_store,
+    _retry_delay,
+    _save_history,
+    _serve_stale,
+    _stale_history,
+    _universes,
+)
+from ._ratelimit import TokenBucket
+from ._store import BorsdataStore
+from ._universe import InstrumentUniverse
+
+
+MAX_CONCURRENCY = 8  # requests in flight at the same time
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Runs a coroutine from sync code on its own event loop in a worker thread.
+    asyncio.run() in the calling thread would close that thread's event loop,
+    which pydantic_ai's run_sync and its pooled connections keep reusing, and
+    cannot be used at all inside a running loop (notebooks, pydantic_ai tools)."""
+    context = contextvars.copy_context()  # keep the caller's tracing span
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(context.run, asyncio.run, coro).result()
+
+
+class AsyncBorsdataClient:
+    """Async client for Borsdata API v1.
+
+    Shares rate limiter, instrument universe cache and local mirror with
+    BorsdataClient, and runs up to max_concurrency requests at the same time.
+    Mirror reads and writes (SQLite) run in worker threads so they do not
+    block the event loop.
+    Use as `async with AsyncBorsdataClient() as client: ...`.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        limiter: Optional[TokenBucket] = None,
+        timeout: tuple[float, float] = TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        max_concurrency: int = MAX_CONCURRENCY,
+        universe_ttl: float = UNIVERSE_TTL,
+        store: Optional[BorsdataStore] = None,
+        use_store: bool = True,
+        mirror_max_age: float = MIRROR_MAX_AGE,
+    ) -> None:
+        """Initializes the AsyncBorsdataClient with an API key and base URL,
+        with the same defaults as BorsdataClient."""
+
+        self.api_key = api_key or os.getenv("BORSDATA_API_KEY")
+        self.base_url = base_url or os.getenv("BORSDATA_BASE_URL") or BASE_URL
+        self.limiter = limiter or _limiter
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.universe_ttl = universe_ttl
+        self.store = _resolve_store(self.base_url, store, use_store)
+        self.mirror_max_age = mirror_max_age
+        self._http: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+    async def __aenter__(self) -> AsyncBorsdataClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Closes the underlying connection pool"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def _client(self) -> httpx.AsyncClient:
+        """Lazily creates the connection pool inside the running event loop"""
+        if self._http is None:
+            connect, read = self.timeout
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(
+                    max_connections=max(self.max_concurrency, 1),
+                    max_keepalive_connections=POOL_SIZE,
+                ),
+                headers={"Accept": "application/json"},
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    async def get(self, path: str, params: Optional[dict[str, Any]] = None) -> dict:
+        """GETs `path` (e.g. "/sectors") and returns the decoded JSON.
+        Waits for the shared rate limiter, retries 429/5xx and connection errors."""
+
+        http = self._client()
+        url = f"{self.base_url}{path}"
+        query = {"authKey": self.api_key, **(params or {})}
+
+        async with self._semaphore:
+            with tracing.span("borsdata.get", **{"http.path": path}) as span:
+                for attempt in range(self.max_retries + 1):
+                    await self.limiter.acquire_async()
+
+                    response = None
+                    try:
+                        response = await http.get(url, params=query)
+                    except httpx.TransportError as e:
+                        if attempt == self.max_retries:
+                            raise BorsdataError(f"GET {path} failed: {e}") from e
+                    else:
+                        span.set(
+                            **{
+                                "http.status_code": response.status_code,
+                                "http.bytes": len(response.content),
+                                "http.attempts": attempt + 1,
+                            }
+                        )
+                        if response.status_code not in RETRY_STATUSES:
+                            if response.is_error:
+                                raise BorsdataError(
+                                    f"GET {path} failed with HTTP "
+                                    f"{response.status_code}"
+                                )
+                            return response.json()
+                        if attempt == self.max_retries:
+                            raise BorsdataError(
+                                f"GET {path} failed with HTTP {response.status_code} "
+                                f"after {self.max_retries} retries"
+                            )
+
+                    delay = _retry_delay(response, attempt)
+                    status = response.status_code if response is not None else None
+                    logger.warning(
+                        "Börsdata GET %s %s, retrying in %.1fs (attempt %d/%d)",
+                        path,
+                        f"HTTP {status}" if status else "failed",
+                        delay,
+                        attempt + 1,
+                        self.max_retries,
+                    )
+                    await asyncio.sleep(delay)
+
+        raise BorsdataError(f"GET {path} failed")  # unreachable
+
+    async def _read_through(
+        self,
+        fetched_at: float | None,
+        load: Callable[[], T],
+        fetch: Callable[[], Awaitable[T]],
+        save: Callable[[T], None],
+    ) -> T:
+        """Async counterpart of BorsdataClient._read_through, load() and
+        save() run in a worker thread"""
+
+        if _is_fresh(fetched_at, self.mirror_max_age):
+            return await asyncio.to_thread(load)
+        try:
+            data = await fetch()
+        except BorsdataError as e:
+            return await asyncio.to_thread(_serve_stale, fetched_at, load, e)
+        await asyncio.to_thread(save, data)
+        return data
+
+    async def _fetched_at(self, dataset: str) -> float | None:
+        return await asyncio.to_thread(self.store.fetched_at, dataset)
+
+    async def get_universe(self, refresh: bool = False) -> InstrumentUniverse:
+        """Returns the InstrumentUniverse shared with BorsdataClient. A missing
+        or expired universe is loaded by BorsdataClient.get_universe in a
+        worker thread, under the same lock, so concurrent callers on any
+        thread or event loop download the instrument list once."""
+
+        universe = _universes.get(self.base_url)
+        if refresh or universe is None or universe.is_expired(self.universe_ttl):
+            sync_client = self._sync_client()
+            universe = await asyncio.to_thread(sync_client.get_universe, refresh)
+        return universe
+
+    def _sync_client(self) -> BorsdataClient:
+        """BorsdataClient with the same settings, for the universe download"""
+        return BorsdataClient(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            limiter=self.limiter,
+            timeout=self.timeout,
+            max_retries=self.max_retries,
+            universe_ttl=self.universe_ttl,
+            store=self.store,
+            use_store=self.store is not None,
+            mirror_max_age=self.mirror_max_age,
+        )
+
+    async def get_nordic_instruments(self) -> list[dict]:
+        """Returns a list[dict] with info about all nordic instruments"""
+
+        return list((await self.get_universe()).instruments)
+
+    async def get_sectors(self) -> list[dict]:
+        """Returns the raw sector list [{id, name}] from the mirror or BD API"""
+
+        if self.store is None:
+            return await self._download_sectors()
+        return await self._read_through(
+            await self._fetched_at("sectors"),
+            self.store.load_sectors,
+            self._download_sectors,
+            self.store.save_sectors,
+        )
+
+    async def _download_sectors(self) -> list[dict]:
+        return (await self.get("/sectors"))["sectors"]
+
+    async def get_branches(self) -> list[dict]:
+        """Returns the raw branch list [{id, name, sectorId}] from mirror or BD API"""
+
+        if self.store is None:
+            return await self._download_branches()
+        return await self._read_through(
+            await self._fetched_at("branches"),
+            self.store.load_branches,
+            self._download_branches,
+            self.store.save_branches,
+        )
+
+    async def _download_branches(self) -> list[dict]:
+        return (await self.get("/branches"))["branches"]
+
+    async def get_instrument_kpi(self, insId=1, reportType="year") -> dict:
+        """Returns a JSON with KPI info for a specific instrument"""
+
+        path = f"/instruments/{insId}/kpis/{reportType}/summary"
+        if self.store is None:
+            return await self.get(path)
+
+        stored = await asyncio.to_thread(self.store.load_kpi_summary, insId, reportType)
+        return await self._read_through(
+            stored[1] if stored else None,
+            lambda: stored[0],
+            lambda: self.get(path),
+            lambda data: self.store.save_kpi_summary(insId, reportType, data),
+        )
+
+    async def get_instrument_kpis(
+        self, insIds: list[int], reportType="year"
+    ) -> dict[int, dict]:
+        """Returns {insId: KPI summary JSON} for many instruments, concurrently"""
+
+        results = await asyncio.gather(
+            *(self.get_instrument_kpi(i, reportType) for i in insIds)
+        )
+        return dict(zip(insIds, results))
+
+    async def get_kpi_history(
+        self, kpiId: int, insIds: list[int], reportType="year", priceType="mean"
+    ) -> list[dict]:
+        """Returns the kpisList (one item per instrument with data) with KPI
+        history for insIds. Missing batches of 50 are fetched concurrently."""
+
+        items: list[dict] = []
+        missing = list(insIds)
+        if self.store is not None:
+            items, missing = await asyncio.to_thread(
+                self.store.load_kpi_history,
+                kpiId,
+                missing,
+                reportType,
+                priceType,
+                max_age=self.mirror_max_age,
+            )
+
+        batches = await asyncio.gather(
+            *(
+                self._fetch_history_batch(kpiId, chunk, reportType, priceType)
+                for chunk in _chunks(missing, HISTORY_BATCH_SIZE)
+            )
+        )
+        for batch in batches:
+            items.extend(batch)
+
+        return [item for item in items if item.get("values")]
+
+    async def get_kpi_histories(
+        self, kpiIds: list[int], insIds: list[int], reportType="year", priceType="mean"
+    ) -> dict[int, list[dict]]:
+        """Returns {kpiId: kpisList} for several KPIs. All KPI/batch requests
+        run concurrently, bounded by max_concurrency and the rate limiter."""
+
+        results = await asyncio.gather(
+            *(self.get_kpi_history(k, insIds, reportType, priceType) for k in kpiIds)
+        )
+        return dict(zip(kpiIds, results))
+
+    async def _fetch_history_batch(
+        self, kpiId: int, chunk: list[int], reportType: str, priceType: str
+    ) -> list[dict]:
+        """Fetches one batch of up to 50 instruments, stores it in the mirror
+        and falls back to stale mirror rows if the API cannot be reached"""
+
+        try:
+            data = await self.get(
+                f"/Instruments/kpis/{kpiId}/{reportType}/{priceType}/history",
+                params={"instList": ",".join(map(str, chunk))},
+            )
+        except BorsdataError as e:
+            return await asyncio.to_thread(
+                _stale_history, self.store, kpiId, chunk, reportType, priceType, e
+            )
+
+        fetched = data.get("kpisList", [])
+        if self.store is not None:
+            await asyncio.to_thread(
+                _save_history, self.store, kpiId, chunk, reportType, priceType, fetched
+            )
+        return fetched
@@ -1,31 +1,307 @@
 """Creates the BorsdataClient class that is the connection to Börsdata"""
 
 from __future__ import annotations
+import logging
 import os
-from typing import Optional
+import random
+import threading
+import time
+from typing import Any, Callable, Iterator, Optional, TypeVar
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from bd_agent import tracing
+
+from ._ratelimit import TokenBucket
+from ._store import BorsdataStore, default_store
+from ._universe import InstrumentUniverse
 
 
 BASE_URL = "https://apiservice.borsdata.se/v1"
 
+# Börsdata allows 100 calls per 10 seconds per API key
+RATE_LIMIT_CALLS = 100
+RATE_LIMIT_PERIOD = 10.0
+RATE_LIMIT_BURST = 10  # calls sent at once, counted against the quota
+
+TIMEOUT = (5.0, 60.0)  # (connect, read) seconds
+MAX_RETRIES = 4
+BACKOFF_BASE = 0.5  # seconds, doubled for every attempt
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+POOL_SIZE = 16
+UNIVERSE_TTL = 3600.0  # seconds before the instrument list is downloaded again
+MIRROR_MAX_AGE = 24 * 3600.0  # seconds the local mirror is served before refresh
+HISTORY_BATCH_SIZE = 50  # max instruments per KPI history call
+
+T = TypeVar("T")
+
+logger = logging.getLogger(__name__)
+
+
+# ---- Errors ----
+class BorsdataError(RuntimeError):
+    pass
+
+
+# ---- Shared connection pool and limiter ----
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _quota_limiter() -> TokenBucket:
+    """Bucket that never lets more than RATE_LIMIT_CALLS through in any
+    RATE_LIMIT_PERIOD: the burst plus the refill over one period."""
+    return TokenBucket(
+        RATE_LIMIT_CALLS - RATE_LIMIT_BURST, RATE_LIMIT_PERIOD, burst=RATE_LIMIT_BURST
+    )
+
+
+_limiter = _quota_limiter()
+
+# ---- Instrument universe cache, one per base url ----
+_universes: dict[str, InstrumentUniverse] = {}
+_universe_lock = threading.Lock()
+
+
+def _shared_session() -> requests.Session:
+    """Returns the process-wide keep-alive session used by all clients"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept": "application/json"})
+            _session = session
+        return _session
+
+
+def _retry_delay(response: requests.Response | None, attempt: int) -> float:
+    """Honours Retry-After when present, else exponential backoff with jitter"""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+    return BACKOFF_BASE * 2**attempt * (1 + random.random() / 2)
+
+
+def _resolve_store(
+    base_url: str, store: Optional[BorsdataStore], use_store: bool
+) -> Optional[BorsdataStore]:
+    """Explicit store, else the default mirror for the public API only, so a
+    local stand-in server never writes into the real mirror"""
+    if not use_store:
+        return None
+    if store is not None:
+        return store
+    return default_store() if base_url == BASE_URL else None
+
+
+def _chunks(lst: list, size: int) -> Iterator[list]:
+    """Chunks a list into several lists"""
+    for i in range(0, len(lst), size):
+        yield lst[i : i + size]
+
+
+# ---- Mirror logic shared with AsyncBorsdataClient ----
+def _is_fresh(fetched_at: float | None, max_age: float) -> bool:
+    """True if mirrored data stored at `fetched_at` can be served as is"""
+    return fetched_at is not None and time.time() - fetched_at < max_age
+
+
+def _serve_stale(
+    fetched_at: float | None, load: Callable[[], T], error: BorsdataError
+) -> T:
+    """Mirror data after a failed fetch, or `error` when nothing is mirrored"""
+    if fetched_at is None:
+        raise error
+    logger.warning("Börsdata unavailable, serving stale data from mirror")
+    return load()
+
+
+def _stale_history(
+    store: BorsdataStore | None,
+    kpiId: int,
+    chunk: list[int],
+    reportType: str,
+    priceType: str,
+    error: BorsdataError,
+) -> list[dict]:
+    """Mirrored history rows of any age for a batch whose download failed,
+    or `error` when there are none"""
+    stale = []
+    if store is not None:
+        stale, _ = store.load_kpi_history(kpiId, chunk, reportType, priceType)
+    if not stale:
+        raise error
+    logger.warning("Börsdata unavailable, serving stale KPI history")
+    return stale
+
+
+def _save_history(
+    store: BorsdataStore | None,
+    kpiId: int,
+    chunk: list[int],
+    reportType: str,
+    priceType: str,
+    fetched: list[dict],
+) -> None:
+    """Stores a downloaded batch, including instruments without history so
+    they are not refetched"""
+    if store is None:
+        return
+    returned = {item["instrument"] for item in fetched}
+    empty = [{"instrument": i, "values": []} for i in chunk if i not in returned]
+    store.save_kpi_history(kpiId, reportType, priceType, fetched + empty)
+
 
 class BorsdataClient:
     """Client for Borsdata API v1"""
 
-    def __init__(self, api_key: Optional[str] = None, base_url: str = BASE_URL) -> None:
-        """Initializes the BorsdataClient with an API key and base URL."""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_url: Optional[str] = None,
+        session: Optional[requests.Session] = None,
+        limiter: Optional[TokenBucket] = None,
+        timeout: tuple[float, float] = TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        universe_ttl: float = UNIVERSE_TTL,
+        store: Optional[BorsdataStore] = None,
+        use_store: bool = True,
+        mirror_max_age: float = MIRROR_MAX_AGE,
+    ) -> None:
+        """Initializes the BorsdataClient with an API key and base URL.
+        base_url defaults to BORSDATA_BASE_URL or the public API. Session,
+        limiter and local mirror default to the shared, process-wide instances;
+        the default mirror is only used against the public API. Pass
+        use_store=False to always go to the API."""
 
         self.api_key = api_key or os.getenv("BORSDATA_API_KEY")
-        self.base_url = base_url
+        self.base_url = base_url or os.getenv("BORSDATA_BASE_URL") or BASE_URL
+        self.session = session or _shared_session()
+        self.limiter = limiter or _limiter
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.universe_ttl = universe_ttl
+        self.store = _resolve_store(self.base_url, store, use_store)
+        self.mirror_max_age = mirror_max_age
+
+    def get(self, path: str, params: Optional[dict[str, Any]] = None) -> dict:
+        """GETs `path` (e.g. "/sectors") and returns the decoded JSON.
+        Waits for the rate limiter and retries 429/5xx and connection errors."""
+
+        url = f"{self.base_url}{path}"
+        query = {"authKey": self.api_key, **(params or {})}
+
+        with tracing.span("borsdata.get", **{"http.path": path}) as span:
+            for attempt in range(self.max_retries + 1):
+                waited = self.limiter.acquire()
+                if waited > 1:
+                    logger.info(
+                        "Börsdata rate limiter delayed %s by %.1fs", path, waited
+                    )
+
+                response = None
+                try:
+                    response = self.session.get(url, params=query, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    if attempt == self.max_retries:
+                        raise BorsdataError(f"GET {path} failed: {e}") from e
+                else:
+                    span.set(
+                        **{
+                            "http.status_code": response.status_code,
+                            "http.bytes": len(response.content),
+                            "http.attempts": attempt + 1,
+                        }
+                    )
+                    if response.status_code not in RETRY_STATUSES:
+                        if not response.ok:
+                            raise BorsdataError(
+                                f"GET {path} failed with HTTP {response.status_code}"
+                            )
+                        return response.json()
+                    if attempt == self.max_retries:
+                        raise BorsdataError(
+                            f"GET {path} failed with HTTP {response.status_code} "
+                            f"after {self.max_retries} retries"
+                        )
+
+                delay = _retry_delay(response, attempt)
+                status = response.status_code if response is not None else None
+                logger.warning(
+                    "Börsdata GET %s %s, retrying in %.1fs (attempt %d/%d)",
+                    path,
+                    f"HTTP {status}" if status else "failed",
+                    delay,
+                    attempt + 1,
+                    self.max_retries,
+                )
+                time.sleep(delay)
+
+        raise BorsdataError(f"GET {path} failed")  # unreachable
+
+    def _read_through(
+        self,
+        fetched_at: float | None,
+        load: Callable[[], T],
+        fetch: Callable[[], T],
+        save: Callable[[T], None],
+    ) -> T:
+        """Serves load() from the mirror while fresh, otherwise fetch() and save().
+        Falls back to stale mirror data when the API cannot be reached."""
+
+        if _is_fresh(fetched_at, self.mirror_max_age):
+            return load()
+        try:
+            data = fetch()
+        except BorsdataError as e:
+            return _serve_stale(fetched_at, load, e)
+        save(data)
+        return data
+
+    def get_universe(self, refresh: bool = False) -> InstrumentUniverse:
+        """Returns the cached InstrumentUniverse, downloading the instrument list
+        only when the cache is empty, older than universe_ttl or refresh=True"""
+
+        with _universe_lock:
+            universe = _universes.get(self.base_url)
+            if refresh or universe is None or universe.is_expired(self.universe_ttl):
+                instruments = self._fetch_nordic_instruments(refresh=refresh)
+                universe = InstrumentUniverse(instruments)
+                _universes[self.base_url] = universe
+            return universe
 
     def get_nordic_instruments(self) -> list[dict]:
+        """Returns a list[dict] with info about all nordic instruments.
+        Served from the cached universe, see get_universe"""
+
+        return list(self.get_universe().instruments)
+
+    def _fetch_nordic_instruments(self, refresh: bool = False) -> list[dict]:
+        """Returns all nordic instruments from the mirror or the BD API.
+        refresh=True skips the mirror and downloads a new list"""
+
+        if self.store is None:
+            return self._download_nordic_instruments()
+        return self._read_through(
+            None if refresh else self.store.fetched_at("instruments"),
+            self.store.load_instruments,
+            self._download_nordic_instruments,
+            self.store.save_instruments,
+        )
+
+    def _download_nordic_instruments(self) -> list[dict]:
         """Returns a list[dict] with info about all nordic instruments from BD API call
         Also renames branchId -> industryId for internal consistency"""
 
-        url = f"{self.base_url}/instruments?authKey={self.api_key}"
-        response = requests.get(url)
-        data = response.json()
+        data = self.get("/instruments")
 
         # renaming of branchId to industryId
         instruments = data.get("instruments", [])  # [] is security fallback if empty
@@ -35,11 +311,94 @@ class BorsdataClient:
 
         return instruments
 
+    def get_sectors(self) -> list[dict]:
+        """Returns the raw sector list [{id, name}] from the mirror or BD API"""
+
+        if self.store is None:
+            return self._download_sectors()
+        return self._read_through(
+            self.store.fetched_at("sectors"),
+            self.store.load_sectors,
+            self._download_sectors,
+            self.store.save_sectors,
+        )
+
+    def _download_sectors(self) -> list[dict]:
+        """Returns the raw sector list from BD API call"""
+        return self.get("/sectors")["sectors"]
+
+    def get_branches(self) -> list[dict]:
+        """Returns the raw branch (industry) list [{id, name, sectorId}]
+        from the mirror or BD API"""
+
+        if self.store is None:
+            return self._download_branches()
+        return self._read_through(
+            self.store.fetched_at("branches"),
+            self.store.load_branches,
+            self._download_branches,
+            self.store.save_branches,
+        )
+
+    def _download_branches(self) -> list[dict]:
+        """Returns the raw branch list from BD API call"""
+        return self.get("/branches")["branches"]
+
     def get_instrument_kpi(self, insId=1, reportType="year") -> dict:
         """Returns a JSON with KPI info for a specific instrument from BD API call"""
 
-        url = f"{self.base_url}/instruments/{insId}/kpis/{reportType}/summary?authKey={self.api_key}"
-        response = requests.get(url)
-        data = response.json()
+        path = f"/instruments/{insId}/kpis/{reportType}/summary"
+        if self.store is None:
+            return self.get(path)
 
-        return data
+        stored = self.store.load_kpi_summary(insId, reportType)
+        return self._read_through(
+            stored[1] if stored else None,
+            lambda: stored[0],
+            lambda: self.get(path),
+            lambda data: self.store.save_kpi_summary(insId, reportType, data),
+        )
+
+    def get_kpi_history(
+        self, kpiId: int, insIds: list[int], reportType="year", priceType="mean"
+    ) -> list[dict]:
+        """Returns the kpisList (one item per instrument with data) with KPI
+        history for insIds. Fresh rows come from the mirror, the rest is
+        fetched from BD API in batches of 50."""
+
+        items: list[dict] = []
+        missing = list(insIds)
+        if self.store is not None:
+            items, missing = self.store.load_kpi_history(
+                kpiId, missing, reportType, priceType, max_age=self.mirror_max_age
+            )
+
+        for chunk in _chunks(missing, HISTORY_BATCH_SIZE):
+            try:
+                fetched = self._download_kpi_history(
+                    kpiId, chunk, reportType, priceType
+                )
+            except BorsdataError as e:
+                stale = _stale_history(
+                    self.store, kpiId, chunk, reportType, priceType, e
+                )
+                items.extend(stale)
+                continue
+
+            _save_history(self.store, kpiId, chunk, reportType, priceType, fetched)
+            items.extend(fetched)
+
+        return [item for item in items if item.get("values")]
+
+    def _download_kpi_history(
+        self, kpiId: int, insIds: list[int], reportType: str, priceType: str
+    ) -> list[dict]:
+        """Returns the kpisList with KPI history for up to 50 instruments
+        from BD API call"""
+
+        data = self.get(
+            f"/Instruments/kpis/{kpiId}/{reportType}/{priceType}/history",
+            params={"instList": ",".join(map(str, insIds))},
+        )
+
+        return data.get("kpisList", [])
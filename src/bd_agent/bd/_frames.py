@@ -0,0 +1,98 @@
+"""Columnar builders that turn Börsdata KPI JSON into compact DataFrames"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from ._helpers import kpi_map
+
+
+# KpiName as a categorical: one shared category list, KpiId -> code lookup table
+_KPI_NAMES = sorted(set(kpi_map.values()))
+_KPI_CODES = np.full(max(kpi_map) + 1, -1, dtype=np.int16)
+for _kpi_id, _name in kpi_map.items():
+    _KPI_CODES[_kpi_id] = _KPI_NAMES.index(_name)
+
+
+def _kpi_names(kpi_ids: np.ndarray) -> pd.Categorical:
+    """Categorical KpiName for an array of KpiIds, NaN for unknown ids"""
+    known = (kpi_ids >= 0) & (kpi_ids < len(_KPI_CODES))
+    codes = np.full(len(kpi_ids), -1, dtype=np.int16)
+    codes[known] = _KPI_CODES[kpi_ids[known]]
+    return pd.Categorical.from_codes(codes, categories=_KPI_NAMES)
+
+
+def _value_or_nan(v) -> float:
+    return np.nan if v is None else v
+
+
+def kpi_summary_frame(json: dict, wide: bool = False) -> pd.DataFrame:
+    """Builds the KPI summary df [y, p, v, KpiId, KpiName] straight from the
+    summary JSON into preallocated arrays: int16 y/KpiId, int8 p, float32 v and
+    categorical KpiName. wide=True returns the (y x KpiId) pivot of v instead."""
+
+    kpis = json.get("kpis", [])
+    lengths = np.fromiter((len(k["values"]) for k in kpis), dtype=np.int64)
+    n = int(lengths.sum())
+
+    def column(key: str, dtype, default=0) -> np.ndarray:
+        values = (val.get(key, default) for k in kpis for val in k["values"])
+        return np.fromiter(values, dtype=dtype, count=n)
+
+    kpi_ids = np.repeat(
+        np.fromiter((k["KpiId"] for k in kpis), dtype=np.int16, count=len(kpis)),
+        lengths,
+    )
+    v = np.fromiter(
+        (_value_or_nan(val.get("v")) for k in kpis for val in k["values"]),
+        dtype=np.float32,
+        count=n,
+    )
+
+    df = pd.DataFrame(
+        {
+            "y": column("y", np.int16),
+            "p": column("p", np.int8),
+            "v": v,
+            "KpiId": kpi_ids,
+            "KpiName": _kpi_names(kpi_ids),
+        }
+    )
+
+    return kpis_pivot(df, value="v") if wide else df
+
+
+def kpi_history_frame(histories: dict[int, list[dict]]) -> pd.DataFrame:
+    """Builds the long history df [y, insId, KpiId, value] from {kpiId: kpisList}
+    into preallocated int16 y/KpiId, int32 insId and float32 value arrays.
+    Missing values are dropped."""
+
+    n = sum(
+        1
+        for kpis_list in histories.values()
+        for item in kpis_list
+        for val in item.get("values", [])
+        if val.get("v") is not None
+    )
+    y = np.empty(n, dtype=np.int16)
+    ins_ids = np.empty(n, dtype=np.int32)
+    kpi_ids = np.empty(n, dtype=np.int16)
+    value = np.empty(n, dtype=np.float32)
+
+    i = 0
+    for kpi_id, kpis_list in histories.items():
+        for item in kpis_list:
+            ins = item["instrument"]
+            for val in item.get("values", []):
+                v = val.get("v")
+                if v is not None:
+                    y[i], ins_ids[i], kpi_ids[i], value[i] = val["y"], ins, kpi_id, v
+                    i += 1
+
+    return pd.DataFrame({"y": y, "insId": ins_ids, "KpiId": kpi_ids, "value": value})
+
+
+def kpis_pivot(df: pd.DataFrame, value: str = "v") -> pd.DataFrame:
+    """Wide view of a long KPI df: one row per year, one column per KpiId"""
+    return df.pivot_table(index="y", columns="KpiId", values=value, aggfunc="last")
@@ -0,0 +1,63 @@
+"""Token bucket rate limiter shared by the Börsdata client"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled with `calls` tokens per `period`
+    seconds and holding at most `burst` (default `calls`) of them.
+
+    Callers reserve a token and sleep until it becomes available, so requests
+    are spread evenly over the window once the burst is spent. Any window of
+    `period` seconds can see burst + calls requests; to stay within a hard
+    quota, refill with the quota minus the burst.
+    """
+
+    def __init__(self, calls: int, period: float, burst: int | None = None) -> None:
+        self.rate = calls / period  # tokens added per second
+        self.capacity = float(burst if burst is not None else calls)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Adds the tokens earned since the last update (caller holds the lock)"""
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self, n: float = 1) -> float:
+        """Takes `n` tokens and returns the seconds to wait before using them"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= n
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_acquire(self) -> bool:
+        """Takes one token if available right now, without waiting"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self, n: float = 1) -> float:
+        """Blocks until `n` tokens are available and returns the time waited"""
+        delay = self.reserve(n)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, n: float = 1) -> float:
+        """Waits without blocking the event loop and returns the time waited"""
+        delay = self.reserve(n)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
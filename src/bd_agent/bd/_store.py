@@ -0,0 +1,243 @@
+"""Local SQLite mirror of Börsdata data that changes at most daily"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from bd_agent.settings import get_bd_mirror_path
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sync_log (
+    dataset TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS instruments (
+    insId INTEGER PRIMARY KEY,
+    name TEXT,
+    ticker TEXT,
+    isin TEXT,
+    sectorId INTEGER,
+    industryId INTEGER,
+    countryId INTEGER,
+    marketId INTEGER,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_instruments_industry ON instruments (industryId);
+CREATE INDEX IF NOT EXISTS ix_instruments_sector ON instruments (sectorId);
+CREATE TABLE IF NOT EXISTS sectors (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS branches (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    sectorId INTEGER
+);
+CREATE TABLE IF NOT EXISTS kpi_summary (
+    insId INTEGER NOT NULL,
+    reportType TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (insId, reportType)
+);
+CREATE TABLE IF NOT EXISTS kpi_history (
+    kpiId INTEGER NOT NULL,
+    reportType TEXT NOT NULL,
+    priceType TEXT NOT NULL,
+    insId INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kpiId, reportType, priceType, insId)
+);
+"""
+
+INSTRUMENT_COLUMNS = (
+    "insId",
+    "name",
+    "ticker",
+    "isin",
+    "sectorId",
+    "industryId",
+    "countryId",
+    "marketId",
+)
+
+
+class BorsdataStore:
+    """SQLite file holding instruments, sectors, branches, KPI summaries and
+    KPI history. Every dataset records when it was fetched so callers can
+    decide between serving the mirror and refreshing from the API."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as con:
+            con.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection per operation, safe to use from any thread"""
+        con = sqlite3.connect(self.path, timeout=30)
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            with con:
+                yield con
+        finally:
+            con.close()
+
+    # ---- Freshness ----
+    def fetched_at(self, dataset: str) -> float | None:
+        """Returns the unix time `dataset` was last stored, or None"""
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT fetched_at FROM sync_log WHERE dataset = ?", (dataset,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _mark(self, con: sqlite3.Connection, dataset: str, now: float) -> None:
+        con.execute(
+            "INSERT OR REPLACE INTO sync_log (dataset, fetched_at) VALUES (?, ?)",
+            (dataset, now),
+        )
+
+    # ---- Instruments, sectors and branches ----
+    def save_instruments(self, instruments: list[dict]) -> None:
+        """Replaces the stored instrument list"""
+        rows = [
+            tuple(ins.get(c) for c in INSTRUMENT_COLUMNS) + (json.dumps(ins),)
+            for ins in instruments
+        ]
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM instruments")
+            con.executemany(
+                "INSERT INTO instruments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._mark(con, "instruments", time.time())
+
+    def load_instruments(self) -> list[dict]:
+        """Returns the stored instrument list"""
+        with self._connect() as con:
+            rows = con.execute("SELECT payload FROM instruments ORDER BY insId")
+            return [json.loads(r[0]) for r in rows]
+
+    def save_sectors(self, sectors: list[dict]) -> None:
+        """Replaces the stored sectors, list of {id, name}"""
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM sectors")
+            con.executemany(
+                "INSERT INTO sectors VALUES (?, ?)",
+                [(s["id"], s["name"]) for s in sectors],
+            )
+            self._mark(con, "sectors", time.time())
+
+    def load_sectors(self) -> list[dict]:
+        """Returns the stored sectors, list of {id, name}"""
+        with self._connect() as con:
+            rows = con.execute("SELECT id, name FROM sectors ORDER BY id")
+            return [{"id": i, "name": n} for i, n in rows]
+
+    def save_branches(self, branches: list[dict]) -> None:
+        """Replaces the stored branches, list of {id, name, sectorId}"""
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM branches")
+            con.executemany(
+                "INSERT INTO branches VALUES (?, ?, ?)",
+                [(b["id"], b["name"], b.get("sectorId")) for b in branches],
+            )
+            self._mark(con, "branches", time.time())
+
+    def load_branches(self) -> list[dict]:
+        """Returns the stored branches, list of {id, name, sectorId}"""
+        with self._connect() as con:
+            rows = con.execute("SELECT id, name, sectorId FROM branches ORDER BY id")
+            return [{"id": i, "name": n, "sectorId": s} for i, n, s in rows]
+
+    # ---- KPI summaries ----
+    def save_kpi_summary(self, insId: int, reportType: str, data: dict) -> None:
+        """Stores the raw KPI summary JSON for one instrument"""
+        with self._lock, self._connect() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO kpi_summary VALUES (?, ?, ?, ?)",
+                (insId, reportType, json.dumps(data), time.time()),
+            )
+
+    def load_kpi_summary(
+        self, insId: int, reportType: str
+    ) -> tuple[dict, float] | None:
+        """Returns (raw KPI summary JSON, fetched_at) for one instrument, or None"""
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT payload, fetched_at FROM kpi_summary"
+                " WHERE insId = ? AND reportType = ?",
+                (insId, reportType),
+            ).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    # ---- KPI history ----
+    def save_kpi_history(
+        self, kpiId: int, reportType: str, priceType: str, items: list[dict]
+    ) -> None:
+        """Stores kpisList items ({instrument, values}) for one KPI"""
+        now = time.time()
+        rows = [
+            (kpiId, reportType, priceType, item["instrument"], json.dumps(item), now)
+            for item in items
+        ]
+        with self._lock, self._connect() as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO kpi_history VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def load_kpi_history(
+        self,
+        kpiId: int,
+        insIds: list[int],
+        reportType: str,
+        priceType: str,
+        max_age: float | None = None,
+    ) -> tuple[list[dict], list[int]]:
+        """Returns (stored kpisList items, insIds missing or older than max_age)"""
+        cutoff = time.time() - max_age if max_age is not None else float("-inf")
+        found: dict[int, dict] = {}
+        with self._connect() as con:
+            for chunk_start in range(0, len(insIds), 500):
+                chunk = insIds[chunk_start : chunk_start + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = con.execute(
+                    "SELECT insId, payload FROM kpi_history"
+                    " WHERE kpiId = ? AND reportType = ? AND priceType = ?"
+                    f" AND fetched_at >= ? AND insId IN ({marks})",
+                    (kpiId, reportType, priceType, cutoff, *chunk),
+                )
+                found.update((i, json.loads(p)) for i, p in rows)
+        missing = [i for i in insIds if i not in found]
+        return list(found.values()), missing
+
+
+# ---- Default store ----
+_default_store: BorsdataStore | None = None
+_default_lock = threading.Lock()
+
+
+def default_store() -> BorsdataStore | None:
+    """Returns the process-wide store at settings.get_bd_mirror_path(), or None
+    if the mirror is disabled or the file cannot be opened"""
+    global _default_store
+    path = get_bd_mirror_path()
+    if path is None:
+        return None
+    with _default_lock:
+        if _default_store is None or _default_store.path != path:
+            try:
+                _default_store = BorsdataStore(path)
+            except (OSError, sqlite3.Error):
+                return None
+        return _default_store
@@ -0,0 +1,60 @@
+"""In-process cache of the instrument universe with lookup indexes"""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from functools import cached_property
+
+
+class InstrumentUniverse:
+    """Snapshot of all nordic instruments, indexed by insId, industryId,
+    sectorId and ticker so lookups are dict hits instead of list scans."""
+
+    def __init__(self, instruments: list[dict], fetched_at: float | None = None):
+        self.instruments = instruments
+        self.fetched_at = fetched_at if fetched_at is not None else time.time()
+
+        self.by_id: dict[int, dict] = {}
+        self.by_ticker: dict[str, dict] = {}
+        self.by_industry: dict[int, list[dict]] = {}
+        self.by_sector: dict[int, list[dict]] = {}
+
+        for ins in instruments:
+            self.by_id[ins["insId"]] = ins
+            if ins.get("ticker"):
+                # first listing wins if a ticker appears on several markets
+                self.by_ticker.setdefault(ins["ticker"].upper(), ins)
+            self.by_industry.setdefault(ins.get("industryId"), []).append(ins)
+            self.by_sector.setdefault(ins.get("sectorId"), []).append(ins)
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    @cached_property
+    def version(self) -> str:
+        """Content hash of ids, names and tickers. Changes when the universe does."""
+        h = hashlib.sha1()
+        for ins in sorted(self.instruments, key=lambda i: i["insId"]):
+            h.update(f"{ins['insId']}|{ins.get('name')}|{ins.get('ticker')}\n".encode())
+        return h.hexdigest()[:12]
+
+    def is_expired(self, ttl: float) -> bool:
+        """True if the snapshot is older than `ttl` seconds"""
+        return time.time() - self.fetched_at > ttl
+
+    def get(self, ins_id: int) -> dict | None:
+        """Returns the instrument dict for an insId or None"""
+        return self.by_id.get(ins_id)
+
+    def get_by_ticker(self, ticker: str) -> dict | None:
+        """Returns the instrument dict for a ticker (case-insensitive) or None"""
+        return self.by_ticker.get(ticker.upper())
+
+    def companies_in_industry(self, industry_id: int) -> list[dict]:
+        """Returns the instruments in an industry"""
+        return list(self.by_industry.get(industry_id, []))
+
+    def companies_in_sector(self, sector_id: int) -> list[dict]:
+        """Returns the instruments in a sector"""
+        return list(self.by_sector.get(sector_id, []))
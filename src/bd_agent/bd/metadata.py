@@ -1,49 +1,79 @@
 """certain meta data api calls"""
 
-import requests
+import asyncio
+import threading
 
-from bd_agent.bd import BorsdataClient
+from bd_agent.bd import AsyncBorsdataClient, BorsdataClient, run_sync
+
+
+async def _fetch_metadata() -> tuple[list[dict], list[dict]]:
+    """Raw sector and branch lists, fetched at the same time"""
+    async with AsyncBorsdataClient() as client:
+        return await asyncio.gather(client.get_sectors(), client.get_branches())
+
+
+class MetadataRegistry:
+    """Process-wide sector and industry names. Both are loaded together, with
+    concurrent calls, on first access and kept until invalidate() is called."""
+
+    def __init__(self) -> None:
+        self._sectors: dict[int, str] | None = None
+        self._industries: dict[int, str] | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def sectors(self) -> dict[int, str]:
+        """sectorId:sectorName, from the local mirror or BD API on first access"""
+        if self._sectors is None:
+            self._load()
+        return self._sectors
+
+    @property
+    def industries(self) -> dict[int, str]:
+        """industryId:industryName, from the local mirror or BD API on first access"""
+        if self._industries is None:
+            self._load()
+        return self._industries
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._sectors is None or self._industries is None:
+                sectors, branches = run_sync(_fetch_metadata())
+                self._sectors = {s["id"]: s["name"] for s in sectors}
+                self._industries = {b["id"]: b["name"] for b in branches}
+
+    def invalidate(self) -> None:
+        """Drops the cached names, the next access loads them again"""
+        with self._lock:
+            self._sectors = None
+            self._industries = None
+
+
+metadata_registry = MetadataRegistry()
 
 
 def get_sectors() -> dict:
-    """Returns a dict of sectorId:sectorName from BD API"""
-    client = BorsdataClient()
-    url = f"{client.base_url}/sectors?authKey={client.api_key}"
-    response = requests.get(url)
-    sectors_raw_dict = response.json()["sectors"]
-    sectors_dict = {s["id"]: s["name"] for s in sectors_raw_dict}
-    return sectors_dict
+    """Returns a dict of sectorId:sectorName, cached for the process"""
+    return dict(metadata_registry.sectors)
 
 
 def get_industries() -> dict:
-    """Returns a dict of industryId:industryName from BD API"""
-    client = BorsdataClient()
-    url = f"{client.base_url}/branches?authKey={client.api_key}"
-    response = requests.get(url)
-    industries_raw_dict = response.json()["branches"]
-    industries_dict = {b["id"]: b["name"] for b in industries_raw_dict}
-    return industries_dict
+    """Returns a dict of industryId:industryName, cached for the process"""
+    return dict(metadata_registry.industries)
 
 
-def get_companies_by_sector(sectorId: int) -> list[dict]:
-    """Returns a list of dicts with companies for a specific sector"""
-    client = BorsdataClient()
-    instruments = client.get_nordic_instruments()
+def invalidate_metadata() -> None:
+    """Forces sectors and industries to be reloaded on next use"""
+    metadata_registry.invalidate()
 
-    # filter instruments on sectorId
-    companies_in_sector = [ins for ins in instruments if ins["sectorId"] == sectorId]
 
-    return companies_in_sector
+def get_companies_by_sector(sectorId: int) -> list[dict]:
+    """Returns a list of dicts with companies for a specific sector"""
+    universe = BorsdataClient().get_universe()
+    return universe.companies_in_sector(sectorId)
 
 
-def get_companies_by_industry(industryId: int) -> list[str]:
+def get_companies_by_industry(industryId: int) -> list[dict]:
     """Returns a list of dicts with companies for a specific industry"""
-    client = BorsdataClient()
-    instruments = client.get_nordic_instruments()
-
-    # filter instruments on sectorId
-    companies_in_industry = [
-        ins for ins in instruments if ins["industryId"] == industryId
-    ]
-
-    return companies_in_industry
+    universe = BorsdataClient().get_universe()
+    return universe.companies_in_industry(industryId)
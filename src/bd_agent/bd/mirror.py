@@ -0,0 +1,53 @@
+"""Fills and refreshes the local Börsdata mirror, see `python -m bd_agent sync`"""
+
+from bd_agent.bd import BorsdataClient, BorsdataError
+from bd_agent.bd._client import MIRROR_MAX_AGE
+
+
+def sync_mirror(
+    kpi_ids: list[int] | None = None,
+    summaries: bool = True,
+    report_type: str = "year",
+    price_type: str = "mean",
+    max_age: float = MIRROR_MAX_AGE,
+) -> dict[str, int]:
+    """Refreshes every mirrored dataset older than max_age seconds and returns
+    the number of stored items per dataset. Fresh entries are left untouched,
+    so repeated runs only download what has gone stale (max_age=0 forces all).
+
+    kpi_ids: KPI ids to mirror history for, over all instruments
+    summaries: also mirror the KPI summary of every instrument
+    """
+    client = BorsdataClient(mirror_max_age=max_age)
+    if client.store is None:
+        raise BorsdataError("Local mirror is disabled (BORSDATA_MIRROR=off).")
+
+    universe = client.get_universe()
+    counts = {
+        "instruments": len(universe),
+        "sectors": len(client.get_sectors()),
+        "branches": len(client.get_branches()),
+        "kpi_summaries": 0,
+        "kpi_history": 0,
+        "failed": 0,
+    }
+
+    if summaries:
+        for insId in universe.by_id:
+            try:
+                client.get_instrument_kpi(insId=insId, reportType=report_type)
+                counts["kpi_summaries"] += 1
+            except BorsdataError:
+                counts["failed"] += 1
+
+    ins_ids = list(universe.by_id)
+    for kpi_id in kpi_ids or []:
+        try:
+            items = client.get_kpi_history(
+                kpi_id, ins_ids, reportType=report_type, priceType=price_type
+            )
+            counts["kpi_history"] += len(items)
+        except BorsdataError:
+            counts["failed"] += 1
+
+    return counts
@@ -2,35 +2,24 @@
 
 from ._client import BorsdataClient
 from ._models import InstrumentInfo
-from ._helpers import kpi_map
+from ._frames import kpi_summary_frame
 import pandas as pd
 
 
-def get_instrument_info_by_id(ins_id: int) -> InstrumentInfo:
-    """Fetches instrument information by its ID and returns an Instrument object."""
-    instruments = BorsdataClient().get_nordic_instruments()
-    for item in instruments:
-        if item["insId"] == ins_id:
-            return InstrumentInfo(**item)
-    return None
+def get_instrument_info_by_id(ins_id: int) -> InstrumentInfo | None:
+    """Looks up instrument information by its ID and returns an Instrument object."""
+    item = BorsdataClient().get_universe().get(ins_id)
+    return InstrumentInfo(**item) if item is not None else None
 
 
-def kpis_json_to_df(json: dict) -> pd.DataFrame:
-    """converts the raw json from kpi:s api call to a pandas dataframe"""
-    values_list = json["kpis"]
+def get_instrument_info_by_ticker(ticker: str) -> InstrumentInfo | None:
+    """Looks up instrument information by ticker and returns an Instrument object."""
+    item = BorsdataClient().get_universe().get_by_ticker(ticker)
+    return InstrumentInfo(**item) if item is not None else None
 
-    # convert to list of rows
-    rows = []
-    for kpi in values_list:
-        kpi_id = kpi["KpiId"]
-        for val in kpi["values"]:
-            val["KpiId"] = kpi_id
-            rows.append(val)
 
-    # convert to df
-    df = pd.DataFrame(rows)
-
-    # add KpiName as col in df
-    df["KpiName"] = df["KpiId"].map(kpi_map)
-
-    return df
+def kpis_json_to_df(json: dict, wide: bool = False) -> pd.DataFrame:
+    """converts the raw json from kpi:s api call to a pandas dataframe
+    [y, p, v, KpiId, KpiName] with compact dtypes, see kpi_summary_frame.
+    wide=True returns one row per year and one column per KpiId."""
+    return kpi_summary_frame(json, wide=wide)
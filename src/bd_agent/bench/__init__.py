@@ -0,0 +1,13 @@
+"""
+bench — end-to-end benchmarks of the router and agents against local stand-ins
+
+Public API:
+- run: benchmarks the pipelines and writes bench_report.json
+- run_importtime: import time of the entry modules (python -X importtime)
+- BenchError: raised for invalid benchmark setups
+"""
+
+from .importtime import run as run_importtime
+from .pipelines import BenchError, run
+
+__all__ = ["BenchError", "run", "run_importtime"]
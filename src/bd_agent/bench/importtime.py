@@ -0,0 +1,104 @@
+"""Import-time benchmark: `python -X importtime` in fresh interpreters.
+
+Measures how long the entry modules take to import and checks that the heavy
+dependencies (pandas, matplotlib, pydantic_ai, openai, rapidfuzz) are not
+loaded by them; the agents load those on first use.
+"""
+
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+import bd_agent
+
+
+# modules whose import cost CLI startup and Streamlit cold start pay
+MODULES = ("bd_agent", "bd_agent.router", "bd_agent.cli")
+# must stay out of MODULES' imports
+LAZY_DEPENDENCIES = ("pandas", "matplotlib", "pydantic_ai", "openai", "rapidfuzz")
+TOP_N = 15
+
+
+def _parse(stderr: str) -> dict[str, tuple[int, int]]:
+    """{module: (self µs, cumulative µs)} from -X importtime output"""
+    out = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|", 2)
+        out[name.strip()] = (int(self_us), int(cumulative_us))
+    return out
+
+
+def _import_once(module: str) -> dict[str, tuple[int, int]]:
+    """Imports `module` in a fresh interpreter and parses its import times"""
+    env = dict(os.environ)
+    src = str(Path(bd_agent.__file__).resolve().parents[1])
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [src, env.get("PYTHONPATH")]))
+    env.setdefault("OPENAI_API_KEY", "importtime")  # bd_agent requires a key
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if proc.returncode != 0:
+        tail = proc.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"Importing {module} failed: {tail[0]}")
+    return _parse(proc.stderr)
+
+
+def measure(module: str, repeats: int = 5) -> dict:
+    """Median cumulative import time of `module` over `repeats` fresh runs,
+    its slowest imports (self time) and the lazy dependencies it loaded"""
+    runs = [_import_once(module) for _ in range(repeats)]
+    totals = [r[module][1] for r in runs]
+    last = runs[-1]
+    slowest = sorted(last.items(), key=lambda kv: kv[1][0], reverse=True)[:TOP_N]
+    return {
+        "module": module,
+        "total_ms": {
+            "min": round(min(totals) / 1e3, 1),
+            "median": round(statistics.median(totals) / 1e3, 1),
+            "max": round(max(totals) / 1e3, 1),
+        },
+        "n_modules": len(last),
+        "slowest_self_ms": {name: round(t[0] / 1e3, 2) for name, t in slowest},
+        "eager_dependencies": [d for d in LAZY_DEPENDENCIES if d in last],
+    }
+
+
+def run(
+    modules: tuple[str, ...] = MODULES,
+    repeats: int = 5,
+    out_root: Path | None = None,
+) -> tuple[Path, dict]:
+    """Measures every module, writes importtime_report.json into a new run
+    directory and returns (directory, report)"""
+    from bd_agent.bench.pipelines import _artifacts_dir
+    from bd_agent.eval.io import run_dir, write_json
+
+    results = {}
+    for module in modules:
+        results[module] = res = measure(module, repeats=repeats)
+        eager = ", ".join(res["eager_dependencies"]) or "-"
+        print(
+            f"{module:<18} median {res['total_ms']['median']:>7.1f} ms  "
+            f"modules {res['n_modules']:>4}  eager {eager}"
+        )
+
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "repeats": repeats,
+            "lazy_dependencies": list(LAZY_DEPENDENCIES),
+        },
+        "modules": results,
+    }
+    out_dir = run_dir(root=out_root or _artifacts_dir(), label="importtime")
+    write_json(out_dir / "importtime_report.json", report)
+    return out_dir, report
@@ -0,0 +1,284 @@
+"""End-to-end benchmarks of the router and agents against local stand-ins"""
+
+from __future__ import annotations
+
+import functools
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from importlib import resources as ir
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from bd_agent import tracing
+from bd_agent.testing import BorsdataStandIn, FixtureSet, OpenAIStandIn
+
+
+# ---- Errors ----
+class BenchError(RuntimeError):
+    pass
+
+
+# (intent, prompt); {company} is filled with a name from the fixtures
+CASES = {
+    "analyze": ("single_stock_analysis", "Analyze {company}"),
+    "screen": ("screening", "Screen Swedish banks with ROIC above 15%"),
+    "advise": ("investment_advice", "Which strategy should I use as a new investor?"),
+    "advise_stream": (
+        "investment_advice",
+        "Which strategy should I use as a new investor?",
+    ),
+}
+AGENT_FUNCTIONS = {
+    "analyze": "run_analyzer",
+    "screen": "run_screener",
+    "advise": "run_advisor",
+    "advise_stream": "run_advisor",
+}
+STREAM_CASES = {"advise_stream"}  # called with stream=True, deltas consumed
+LLM_ENDPOINTS = ("responses", "chat.completions")
+TOKEN_KEYS = ("input_tokens", "output_tokens")
+
+
+# ---- Paths ----
+def _artifacts_dir() -> Path:
+    """Returns the path to the artifacts directory
+    bd_agent/bench/artifacts/"""
+    base = ir.files("bd_agent.bench")
+    return Path(base.joinpath("artifacts"))
+
+
+# ---- Environment ----
+def _clients_created() -> bool:
+    """True once an OpenAI client exists or an agent module has been loaded"""
+    llm = sys.modules.get("bd_agent.llm")
+    if llm is not None and (llm._openai or llm._async_openai) is not None:
+        return True
+    return any(m.startswith("bd_agent.agents.") for m in sys.modules)
+
+
+def _point_clients_at(bd_server: BorsdataStandIn, llm_server: OpenAIStandIn) -> None:
+    """Routes the Börsdata and OpenAI clients to the stand-ins. Must run before
+    the first LLM call and before any agent module is loaded, since the
+    clients and pydantic_ai models are created once and then reused."""
+    if _clients_created():
+        if os.environ.get("OPENAI_BASE_URL") != llm_server.base_url:
+            raise BenchError(
+                "bd_agent agents already imported, run the benchmark in a "
+                "fresh process (python -m bd_agent bench)"
+            )
+    os.environ["BORSDATA_BASE_URL"] = bd_server.base_url
+    os.environ["BORSDATA_API_KEY"] = "stand-in"
+    os.environ["OPENAI_BASE_URL"] = llm_server.base_url
+    os.environ["OPENAI_API_KEY"] = "stand-in"
+    # stand-in answers must never reach the persistent LLM cache
+    os.environ["BD_AGENT_LLM_CACHE"] = "off"
+    os.environ.setdefault("MPLBACKEND", "Agg")
+
+
+def _clear_caches() -> None:
+    """Drops in-process caches so the next run starts cold"""
+    import bd_agent.bd as bd
+    from bd_agent.bd._client import _universes
+
+    from bd_agent.agents._find_industry_kpis import __find_industry_kpis as kpis
+    from bd_agent.agents._name_interpretation_agent import _index
+    from bd_agent.intents import classifier, parse
+
+    _universes.clear()
+    bd.invalidate_metadata()
+    classifier._cache.clear()
+    parse._cache.clear()
+    kpis._cache.clear()
+    _index._indexes.clear()
+
+
+def _close_figures() -> None:
+    import matplotlib.pyplot as plt
+
+    plt.close("all")
+
+
+# ---- Measuring ----
+def _diff(after: dict[str, int], before: dict[str, int]) -> dict[str, int]:
+    return {k: v - before.get(k, 0) for k, v in after.items() if v != before.get(k, 0)}
+
+
+def _run_once(
+    fn: Callable[[str], Any],
+    prompt: str,
+    bd_server: BorsdataStandIn,
+    llm_server: OpenAIStandIn,
+) -> dict:
+    """Runs fn(prompt) once, returns wall time, stand-in request deltas and the
+    time spent per tracing span. Streamed answers are consumed, with the time
+    to their first delta as ttft_s."""
+    bd_before, llm_before = bd_server.snapshot(), llm_server.snapshot()
+    error = None
+    ttft = None
+    start = time.perf_counter()
+    with tracing.capture() as spans:
+        try:
+            result = fn(prompt)
+            if isinstance(result, Iterator):
+                for _ in result:
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+        except Exception as e:  # a failing pipeline is a result, not a crash
+            error = repr(e)
+    wall = time.perf_counter() - start
+    _close_figures()
+
+    bd_calls = _diff(bd_server.snapshot(), bd_before)
+    llm_stats = _diff(llm_server.snapshot(), llm_before)
+    return {
+        "wall_s": round(wall, 4),
+        "ttft_s": round(ttft, 4) if ttft is not None else None,
+        "http_calls": sum(bd_calls.values()),
+        "http_by_endpoint": bd_calls,
+        "llm_calls": sum(llm_stats.get(k, 0) for k in LLM_ENDPOINTS),
+        "llm_tokens": {k: llm_stats.get(k, 0) for k in TOKEN_KEYS},
+        "spans": tracing.summarize(spans),
+        "error": error,
+    }
+
+
+def _peak_memory(fn: Callable[[str], Any], prompt: str) -> int:
+    """Peak traced Python allocations (bytes) during one extra run"""
+    tracemalloc.start()
+    try:
+        result = fn(prompt)
+        if isinstance(result, Iterator):
+            for _ in result:
+                pass
+    except Exception:
+        pass
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        _close_figures()
+    return peak
+
+
+def _bench_case(
+    fn: Callable[[str], Any],
+    prompt: str,
+    bd_server: BorsdataStandIn,
+    llm_server: OpenAIStandIn,
+    repeats: int,
+    cold: bool,
+) -> dict:
+    """Runs one case `repeats` times and summarises the runs"""
+    runs = []
+    for _ in range(repeats):
+        if cold:
+            _clear_caches()
+        runs.append(_run_once(fn, prompt, bd_server, llm_server))
+
+    walls = [r["wall_s"] for r in runs]
+    ttfts = [r["ttft_s"] for r in runs if r["ttft_s"] is not None]
+    if cold:
+        _clear_caches()
+    return {
+        "prompt": prompt,
+        "wall_s": {
+            "min": min(walls),
+            "median": round(statistics.median(walls), 4),
+            "mean": round(statistics.fmean(walls), 4),
+            "max": max(walls),
+        },
+        "ttft_s_median": round(statistics.median(ttfts), 4) if ttfts else None,
+        "http_calls_first": runs[0]["http_calls"],
+        "http_calls_last": runs[-1]["http_calls"],
+        "llm_calls": runs[-1]["llm_calls"],
+        "spans": runs[-1]["spans"],
+        "peak_mem_bytes": _peak_memory(fn, prompt),
+        "errors": sum(r["error"] is not None for r in runs),
+        "runs": runs,
+    }
+
+
+# ---- Entry point ----
+def run(
+    repeats: int = 3,
+    n_instruments: int = 500,
+    bd_latency: float = 0.0,
+    llm_latency: float = 0.0,
+    llm_token_delay: float = 0.0,
+    cases: list[str] | None = None,
+    cold: bool = False,
+    seed: int = 0,
+    out_root: Path | None = None,
+) -> Path:
+    """Benchmarks router.run_agent and each agent's run function end-to-end
+    against local Börsdata and OpenAI stand-ins.
+
+    Per case: wall time over `repeats` runs (and time to the first streamed
+    delta for streaming cases), Börsdata HTTP calls (first and
+    last run), LLM calls, time per tracing span and peak Python memory.
+    cold=True clears the in-process caches before every run. Writes
+    bench_report.json into a new run directory and returns that directory.
+    """
+    cases = cases or list(CASES)
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        raise BenchError(f"Unknown bench cases: {sorted(unknown)}")
+
+    fixtures = FixtureSet.synthetic(n_instruments, seed=seed)
+    company = fixtures.instruments[0]["name"]
+
+    bd_server = BorsdataStandIn(fixtures, latency=bd_latency, rate_limit=None)
+    llm_server = OpenAIStandIn(latency=llm_latency, token_delay=llm_token_delay)
+    with bd_server, llm_server:
+        _point_clients_at(bd_server, llm_server)
+        import bd_agent.agents as agents
+        from bd_agent import router
+        from bd_agent.eval.io import run_dir, write_json
+
+        results: dict[str, dict] = {}
+        for name in cases:
+            intent, template = CASES[name]
+            prompt = template.format(company=company)
+            targets = {
+                f"router.{name}": router.run_agent,
+                f"agent.{name}": getattr(agents, AGENT_FUNCTIONS[name]),
+            }
+            if name in STREAM_CASES:
+                targets = {
+                    label: functools.partial(fn, stream=True)
+                    for label, fn in targets.items()
+                }
+            for label, fn in targets.items():
+                results[label] = {
+                    "intent": intent,
+                    **_bench_case(fn, prompt, bd_server, llm_server, repeats, cold),
+                }
+                ttft = results[label]["ttft_s_median"]
+                print(
+                    f"{label:<20} median {results[label]['wall_s']['median']:.3f}s  "
+                    f"http {results[label]['http_calls_last']:>3}  "
+                    f"llm {results[label]['llm_calls']:>2}"
+                    + (f"  ttft {ttft:.3f}s" if ttft is not None else "")
+                )
+
+    out_dir = run_dir(root=out_root or _artifacts_dir(), label="bench")
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "python": platform.python_version(),
+            "repeats": repeats,
+            "n_instruments": n_instruments,
+            "bd_latency_s": bd_latency,
+            "llm_latency_s": llm_latency,
+            "llm_token_delay_s": llm_token_delay,
+            "cold": cold,
+            "seed": seed,
+        },
+        "cases": results,
+    }
+    write_json(out_dir / "bench_report.json", report)
+    return out_dir
@@ -0,0 +1,185 @@
+"""Memoization caches for deterministic LLM results.
+
+DiskCache keeps JSON values in SQLite (one table per namespace, optional TTL),
+MemoCache puts an in-process LRU in front of it. Keys are built with
+cache_key() from everything the result depends on (prompt, model, prompt
+version, ...), so changing any of them simply misses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from bd_agent.settings import get_llm_cache_path
+
+
+_NAMESPACE = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def cache_key(*parts: Any) -> str:
+    """Stable sha256 key of JSON-serialisable parts"""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def text_hash(text: str) -> str:
+    """Short content hash, e.g. of a system prompt"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case and whitespace insensitive form of a user prompt"""
+    return " ".join(prompt.casefold().split())
+
+
+# ---- Persistent store ----
+class DiskCache:
+    """key -> JSON value table in a SQLite file. Entries older than `ttl`
+    seconds are treated as missing (None keeps them forever)."""
+
+    def __init__(
+        self, path: Path | str, namespace: str, ttl: float | None = None
+    ) -> None:
+        if not _NAMESPACE.match(namespace):
+            raise ValueError(f"Invalid cache namespace {namespace!r}")
+        self.path = Path(path)
+        self.namespace = namespace
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {namespace} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        """One connection per thread, reused"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any | None:
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> tuple[Any, float] | None:
+        """(value, created_at) of a live entry, else None"""
+        row = (
+            self._connect()
+            .execute(
+                f"SELECT value, created_at FROM {self.namespace} WHERE key = ?",
+                (key,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        if self.ttl is not None and time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.namespace} VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.namespace} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(f"DELETE FROM {self.namespace}")
+
+    def __len__(self) -> int:
+        row = self._connect().execute(f"SELECT COUNT(*) FROM {self.namespace}")
+        return row.fetchone()[0]
+
+
+# ---- In-process LRU in front of the disk ----
+class MemoCache:
+    """LRU of up to `maxsize` entries, backed by an optional DiskCache.
+    Disk hits are promoted into memory. Entries expire `ttl` seconds after
+    they were first stored, in memory as on disk (None keeps them).
+    Counts hits/misses in `stats`."""
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        disk: DiskCache | None = None,
+        ttl: float | None = None,
+    ) -> None:
+        self.maxsize = maxsize
+        self.disk = disk
+        self.ttl = ttl
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        # key -> (value, created_at)
+        self._entries: OrderedDict[str, tuple[Any, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expired(self, created_at: float) -> bool:
+        return self.ttl is not None and time.time() - created_at > self.ttl
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._entries.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[0]
+                del self._entries[key]
+
+        entry = self.disk.get_entry(key) if self.disk is not None else None
+        with self._lock:
+            if entry is None or self._expired(entry[1]):
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, *entry)
+        return entry[0]
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._remember(key, value, time.time())
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self, disk: bool = False) -> None:
+        """Empties memory, and the disk store too with disk=True"""
+        with self._lock:
+            self._entries.clear()
+        if disk and self.disk is not None:
+            self.disk.clear()
+
+    def _remember(self, key: str, value: Any, created_at: float) -> None:
+        self._entries[key] = (value, created_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def memo_cache(
+    namespace: str, maxsize: int = 1024, ttl: float | None = None
+) -> MemoCache:
+    """MemoCache on the shared LLM cache file (BD_AGENT_LLM_CACHE),
+    memory only when the file cache is turned off"""
+    path = get_llm_cache_path()
+    disk = DiskCache(path, namespace, ttl=ttl) if path is not None else None
+    return MemoCache(maxsize=maxsize, disk=disk, ttl=ttl)
@@ -1,13 +1,27 @@
 """CLI interface for bd_agent"""
 
+from collections.abc import Iterator
+
 from bd_agent.router import run_agent
-import matplotlib.pyplot as plt
-from matplotlib.figure import Figure
 
 
 def run_cli() -> None:
     """Run agent in CLI mode"""
-    result = run_agent(input("What can I help you with today?\n>>> "))
-    if isinstance(result, Figure):
-        plt.figure(result)
-        plt.show()
+    result = run_agent(input("What can I help you with today?\n>>> "), stream=True)
+    if isinstance(result, Iterator):
+        # streamed answer, print tokens as they arrive
+        for delta in result:
+            print(delta, end="", flush=True)
+        print()
+    elif isinstance(result, str):
+        print(result)
+    elif result is not None:
+        # matplotlib is already loaded by the agent that drew the figure
+        import matplotlib.pyplot as plt
+        from matplotlib.figure import Figure
+
+        if isinstance(result, Figure):
+            plt.figure(result)
+            plt.show()
+        else:
+            print(result)
@@ -4,7 +4,7 @@ import json
 import uuid
 from pathlib import Path, WindowsPath
 from importlib import resources as ir
-from typing import Any
+from typing import Any, Iterator
 from datetime import datetime
 
 
@@ -58,3 +58,30 @@ def write_json(path: Path, data: dict[str, Any]):
     path.parent.mkdir(parents=True, exist_ok=True)
     with path.open("w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def read_jsonl(path: Path) -> Iterator[dict[str, Any]]:
+    """Yields one dict per non-empty line of a JSONL file"""
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def trim_partial_line(path: Path) -> None:
+    """Cuts a JSONL file after its last newline, dropping a line that was
+    only partly written when the process stopped"""
+    with path.open("rb+") as f:
+        end = pos = f.seek(0, 2)
+        while pos > 0:  # scan backwards, the file can be large
+            step = min(4096, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            if pos + step == end and chunk.endswith(b"\n"):
+                return
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                f.truncate(pos + newline + 1)
+                return
+        f.truncate(0)
@@ -1,8 +1,41 @@
-"""module is for classification metrics"""
+"""module is for classification metrics
+
+Labels are encoded to integer arrays once (encode_labels) and every metric is
+computed from the confusion matrix with NumPy. Metric functions accept a
+single matrix (K, K) or a stack of them (B, K, K), which is how the bootstrap
+evaluates all resamples at once.
+"""
 
-from dataclasses import dataclass
 from typing import Any
-import pandas as pd
+
+import numpy as np
+
+
+BOOTSTRAP_RESAMPLES = 1000
+CI_LEVEL = 0.95
+CURVE_POINTS = 20
+
+
+# ---- Encoding ----
+def encode_labels(
+    ref: list[str], pred: list[str]
+) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """Encodes reference and predicted labels as indices into the sorted
+    label set.
+    Returns:
+        (labels, ref indices, pred indices)
+    """
+    labels, codes = np.unique(
+        np.asarray(list(ref) + list(pred), dtype=str), return_inverse=True
+    )
+    codes = codes.reshape(-1)
+    return labels.tolist(), codes[: len(ref)], codes[len(ref) :]
+
+
+def confusion_counts(y_true: np.ndarray, y_pred: np.ndarray, n_labels: int):
+    """Confusion matrix as a (K, K) int array, references as rows"""
+    flat = np.bincount(y_true * n_labels + y_pred, minlength=n_labels * n_labels)
+    return flat.reshape(n_labels, n_labels)
 
 
 def confusion_matrix(ref: list[str], pred: list[str]) -> dict[str, dict[str, int]]:
@@ -14,14 +47,60 @@ def confusion_matrix(ref: list[str], pred: list[str]) -> dict[str, dict[str, int
     Returns:
         confusion matrix as a nested dict
     """
-    labels = sorted(set(ref) | set(pred))
-    mat: dict[str, dict[str, int]] = {l: {p: 0 for p in labels} for l in labels}
+    labels, y_true, y_pred = encode_labels(ref, pred)
+    return _as_dict(labels, confusion_counts(y_true, y_pred, len(labels)))
+
+
+def _as_dict(labels: list[str], cm: np.ndarray) -> dict[str, dict[str, int]]:
+    return {
+        r: {p: int(cm[i, j]) for j, p in enumerate(labels)}
+        for i, r in enumerate(labels)
+    }
+
+
+# ---- Metrics from confusion matrices ----
+def _divide(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    """num / den, 0 where den is 0 (no support / no predictions)"""
+    num = np.asarray(num, dtype=float)
+    den = np.asarray(den, dtype=float)
+    out = np.zeros(np.broadcast(num, den).shape)
+    return np.divide(num, den, out=out, where=den > 0)
+
+
+def per_label_scores(cm: np.ndarray) -> dict[str, np.ndarray]:
+    """Precision, recall, F1, one-vs-rest accuracy and support per label,
+    shape (..., K)"""
+    tp = np.diagonal(cm, axis1=-2, axis2=-1)
+    support = cm.sum(axis=-1)
+    predicted = cm.sum(axis=-2)
+    total = cm.sum(axis=(-2, -1))[..., None]
+    precision = _divide(tp, predicted)
+    recall = _divide(tp, support)
+    return {
+        "precision": precision,
+        "recall": recall,
+        "f1": _divide(2 * precision * recall, precision + recall),
+        # rows of this label predicted right plus other rows not predicted as it
+        "accuracy": _divide(total - support - predicted + 2 * tp, total),
+        "support": support,
+    }
 
-    # loop over ref and pred pairs
-    for r, p in zip(ref, pred):
-        mat[r][p] += 1
 
-    return mat
+def summary_scores(cm: np.ndarray) -> dict[str, np.ndarray]:
+    """Accuracy plus macro and support-weighted precision/recall/F1, shape (...).
+    Macro averages are over labels with support or predictions."""
+    scores = per_label_scores(cm)
+    total = cm.sum(axis=(-2, -1))
+    present = (scores["support"] + cm.sum(axis=-2)) > 0
+    weights = _divide(scores["support"], total[..., None])
+    out = {"accuracy": _divide(np.trace(cm, axis1=-2, axis2=-1), total)}
+    for name in ("precision", "recall", "f1"):
+        values = scores[name]
+        out[f"macro_{name}"] = _divide(
+            (values * present).sum(axis=-1), present.sum(axis=-1)
+        )
+        out[f"weighted_{name}"] = (values * weights).sum(axis=-1)
+    return out
 
 
 def accuracy(ref: list[str], pred: list[str]) -> float:
@@ -32,5 +111,119 @@ def accuracy(ref: list[str], pred: list[str]) -> float:
     Returns:
         accuracy as float
     """
-    correct = sum(1 for r, p in zip(ref, pred) if r == p)
-    return correct / len(ref) if ref else 0.0
+    if not len(ref):
+        return 0.0
+    return float(np.mean(np.asarray(ref, dtype=str) == np.asarray(pred, dtype=str)))
+
+
+# ---- Confidence ----
+def coverage_accuracy_curve(
+    correct: np.ndarray, confidence: np.ndarray, n_points: int = CURVE_POINTS
+) -> dict[str, list[float]]:
+    """Accuracy on the most confident predictions as coverage grows.
+    Predictions are sorted by confidence (highest first, wrong ones first
+    among ties so the curve does not depend on row order); point k answers
+    only the top k and abstains on the rest.
+    Returns:
+        {"coverage": [...], "accuracy": [...], "threshold": [...]}, with
+        threshold the lowest confidence answered at that coverage
+    """
+    n = len(correct)
+    if n == 0:
+        return {"coverage": [], "accuracy": [], "threshold": []}
+    correct = np.asarray(correct, dtype=float)
+    order = np.lexsort((correct, -np.asarray(confidence, dtype=float)))
+    hits = np.cumsum(correct[order])
+    k = np.unique(np.linspace(1, n, min(n_points, n)).round().astype(int))
+    return {
+        "coverage": (k / n).round(6).tolist(),
+        "accuracy": (hits[k - 1] / k).round(4).tolist(),
+        "threshold": np.asarray(confidence, dtype=float)[order][k - 1]
+        .round(4)
+        .tolist(),
+    }
+
+
+# ---- Bootstrap ----
+def bootstrap_intervals(
+    cm: np.ndarray,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    level: float = CI_LEVEL,
+    seed: int = 0,
+) -> dict[str, list[float]]:
+    """Percentile bootstrap intervals for the summary_scores() metrics.
+    Resampling rows with replacement only changes how many rows fall in each
+    confusion cell, so all resamples are drawn at once as multinomial cell
+    counts (B, K, K) instead of B passes over the rows.
+    Returns:
+        {metric: [low, high]}
+    """
+    total = int(cm.sum())
+    if total == 0:
+        return {}
+    rng = np.random.default_rng(seed)
+    draws = rng.multinomial(total, cm.ravel() / total, size=n_resamples)
+    scores = summary_scores(draws.reshape(n_resamples, *cm.shape))
+    tail = (1 - level) / 2 * 100
+    return {
+        name: np.percentile(values, [tail, 100 - tail]).round(4).tolist()
+        for name, values in scores.items()
+    }
+
+
+# ---- Everything at once ----
+def classification_report(
+    ref: list[str],
+    pred: list[str],
+    confidence: list[float] | None = None,
+    n_resamples: int = BOOTSTRAP_RESAMPLES,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """All metrics for one evaluation run.
+    Returns:
+        {"labels", "confusion_matrix", "overall": {...}, "per_label": {...}}
+        overall holds accuracy, macro/weighted precision/recall/F1, their
+        bootstrap intervals and, with confidences, the coverage-accuracy curve
+    """
+    labels, y_true, y_pred = encode_labels(ref, pred)
+    cm = confusion_counts(y_true, y_pred, len(labels))
+
+    overall: dict[str, Any] = {
+        name: round(float(v), 4) for name, v in summary_scores(cm).items()
+    }
+    if n_resamples:
+        overall["confidence_intervals"] = {
+            "level": CI_LEVEL,
+            "n_resamples": n_resamples,
+            **bootstrap_intervals(cm, n_resamples, seed=seed),
+        }
+
+    scores = per_label_scores(cm)
+    per_label: dict[str, dict[str, Any]] = {
+        label: {
+            "support": int(scores["support"][i]),
+            "accuracy": round(float(scores["accuracy"][i]), 4),
+            "precision": round(float(scores["precision"][i]), 4),
+            "recall": round(float(scores["recall"][i]), 4),
+            "f1": round(float(scores["f1"][i]), 4),
+        }
+        for i, label in enumerate(labels)
+    }
+
+    if confidence is not None:
+        conf = np.asarray(confidence, dtype=float)
+        correct = y_true == y_pred
+        overall["coverage_accuracy"] = coverage_accuracy_curve(correct, conf)
+        # mean confidence of the predictions of each label
+        sums = np.bincount(y_pred, weights=conf, minlength=len(labels))
+        counts = np.bincount(y_pred, minlength=len(labels))
+        means = _divide(sums, counts)
+        for i, label in enumerate(labels):
+            per_label[label]["confidence_mean"] = round(float(means[i]), 4)
+
+    return {
+        "labels": labels,
+        "confusion_matrix": _as_dict(labels, cm),
+        "overall": overall,
+        "per_label": per_label,
+    }
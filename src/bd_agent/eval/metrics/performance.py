@@ -0,0 +1,61 @@
+"""module is for latency, throughput and cost metrics of a classifier run"""
+
+from typing import Any
+
+import numpy as np
+
+from bd_agent.llm import cost_usd
+
+
+PERCENTILES = (50, 95, 99)
+
+
+def latency_summary(latencies: list[float]) -> dict[str, float | None]:
+    """Percentiles (p50/p95/p99), mean and max of per-row latencies.
+    Args:
+        latencies: seconds per prediction
+    Returns:
+        {"p50", "p95", "p99", "mean", "max"} in seconds, None without rows
+    """
+    arr = np.asarray(latencies, dtype=float)
+    keys = [f"p{q}" for q in PERCENTILES] + ["mean", "max"]
+    if arr.size == 0:
+        return dict.fromkeys(keys)
+    values = [*np.percentile(arr, PERCENTILES), arr.mean(), arr.max()]
+    return {k: round(float(v), 6) for k, v in zip(keys, values)}
+
+
+def performance_report(
+    latencies: list[float],
+    input_tokens: list[int],
+    output_tokens: list[int],
+    model: str,
+) -> dict[str, Any]:
+    """Latency, token and cost summary for one evaluation run.
+    Tokens are priced with the list price of `model` (None if unknown).
+    sequential_rows_per_s is 1 / mean latency: the classifier's throughput
+    without concurrency, comparable between runs with different workers.
+    """
+    n = len(latencies)
+    tokens_in = int(np.sum(input_tokens, dtype=np.int64))
+    tokens_out = int(np.sum(output_tokens, dtype=np.int64))
+    cost = cost_usd(model, tokens_in, tokens_out)
+    latency = latency_summary(latencies)
+    return {
+        "latency_s": latency,
+        "sequential_rows_per_s": (
+            round(1 / latency["mean"], 2) if latency["mean"] else None
+        ),
+        "tokens": {
+            "input": tokens_in,
+            "output": tokens_out,
+            "per_row": round((tokens_in + tokens_out) / n, 1) if n else None,
+        },
+        "cost_usd": {
+            "model": model,
+            "total": round(cost, 6) if cost is not None else None,
+            "per_1k_rows": (
+                round(cost / n * 1000, 4) if cost is not None and n else None
+            ),
+        },
+    }
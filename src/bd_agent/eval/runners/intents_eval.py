@@ -1,14 +1,33 @@
 """Module is eval of intents classifier"""
 
+import json
+import threading
+import time
 import pandas as pd
 
-from dataclasses import dataclass
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, Iterator
 
-from bd_agent.eval.io import load_default_intents, run_dir, write_json
+from bd_agent.bd._ratelimit import TokenBucket
+from bd_agent.cache import cache_key, memo_cache, text_hash
+from bd_agent.eval.io import (
+    EvalDataError,
+    load_default_intents,
+    read_jsonl,
+    run_dir,
+    trim_partial_line,
+    write_json,
+)
+from bd_agent.intents import classifier as llm_classifier
 from bd_agent.intents.classifier import IntentClassification, intent_classifier
-from bd_agent.eval.metrics.classification import confusion_matrix, accuracy
+from bd_agent.intents.local import cross_val_models
+from bd_agent.llm import track_usage
+from bd_agent.settings import get_local_intent_threshold
+from bd_agent.eval.metrics.classification import classification_report
+from bd_agent.eval.metrics.performance import performance_report
 
 
 @dataclass
@@ -22,6 +41,10 @@ class IntentEvalRow:
         pred_intent: The predicted intent label from the classifier.
         confidence: Model confidence score for the prediction (0–1).
         meta: Additional metadata (e.g., language, difficulty, source).
+        latency_s: Wall time of the prediction (as measured when first made
+            for predictions served from the cache).
+        input_tokens / output_tokens: LLM tokens the prediction used.
+        cached: Served from the eval prediction cache.
     """
 
     input: str
@@ -29,41 +52,207 @@ class IntentEvalRow:
     predicted: str
     confidence: float
     meta: dict[str, Any]
+    latency_s: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached: bool = False
 
 
-def _predict(prompt: str) -> IntentClassification:
-    """Gets intent prediction from the classifier
-    Returns IntentClassification object with .intent, .confidence, .reasoning"""
-    out = intent_classifier(prompt)
-    return out
+CLASSIFIERS = ("llm", "local", "hybrid")
+MAX_WORKERS = 8  # rows classified concurrently (LLM requests in flight)
+RUN_FILE = "run.json"
+PREDICTIONS_FILE = "predictions.jsonl"
+REPORT_FILE = "intent_report.json"
 
 
-def _build_predictions(rows: list[dict]) -> list[IntentEvalRow]:
-    """Builds predictions for a list of reference rows.
-    Each row is a dict with keys: "input", "expected", "meta"
-    Returns a list of IntentEvalRow objects:
-    - input: user prompt
-    - expected: expected intent
-    - predicted: predicted intent
-    - confidence: model confidence
-    - meta: additional metadata in {}
-    """
-    preds: list[IntentEvalRow] = []
-    for r in rows:
-        out = _predict(r["input"])
-        preds.append(
-            IntentEvalRow(
-                input=r["input"],
-                expected=r["expected"],
-                predicted=out.intent,
-                confidence=out.confidence,
-                meta=r.get("meta", {}),
+# ---- Prediction cache ----
+# LLM predictions by content: re-running the eval only sends rows whose
+# prompt or classifier config changed
+_predictions = memo_cache("eval_intent_predictions")
+
+
+class CacheStats:
+    """Thread-safe hit/miss counters of one eval run"""
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.counts[key] += 1
+
+    def summary(self) -> dict[str, Any]:
+        hits, misses = self.counts["hits"], self.counts["misses"]
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+        }
+
+
+def _prediction_key(prompt: str) -> str:
+    """Hash of the exact input and everything the LLM answer depends on"""
+    return cache_key(
+        prompt,
+        llm_classifier.MODEL,
+        llm_classifier.TEMPERATURE,
+        text_hash(llm_classifier.SYSTEM_PROMPT),
+        text_hash(json.dumps(IntentClassification.model_json_schema())),
+    )
+
+
+Cost = dict[str, Any]  # latency_s, input_tokens, output_tokens, cached
+
+
+def _predict(
+    prompt: str,
+    bucket: TokenBucket | None = None,
+    stats: CacheStats | None = None,
+) -> tuple[IntentClassification, Cost]:
+    """Gets intent prediction from the prediction cache, else from the
+    classifier after waiting for `bucket`. stats=None skips the cache.
+    Returns IntentClassification object with .intent, .confidence, .reasoning
+    and the latency and tokens it took (cached with the prediction)"""
+    key = _prediction_key(prompt)
+    if stats is not None:
+        cached = _predictions.get(key)
+        if cached is not None and "prediction" in cached:
+            stats.count("hits")
+            prediction = IntentClassification.model_validate(cached["prediction"])
+            return prediction, {**cached["cost"], "cached": True}
+        stats.count("misses")
+
+    if bucket is not None:
+        bucket.acquire()
+    start = time.perf_counter()
+    with track_usage() as tokens:
+        out = intent_classifier(prompt, use_cache=False)
+    cost = {
+        "latency_s": round(time.perf_counter() - start, 4),
+        "input_tokens": tokens["input_tokens"],
+        "output_tokens": tokens["output_tokens"],
+    }
+    _predictions.set(key, {"prediction": out.model_dump(), "cost": cost})
+    return out, {**cost, "cached": False}
+
+
+def _timed(predict, prompt: str) -> tuple[IntentClassification, Cost]:
+    start = time.perf_counter()
+    out = predict(prompt)
+    return out, {"latency_s": round(time.perf_counter() - start, 6)}
+
+
+def _predictor(
+    rows: list[dict],
+    classifier: str,
+    bucket: TokenBucket | None = None,
+    stats: CacheStats | None = None,
+):
+    """Returns predict(i, prompt) -> (prediction, cost) for the chosen
+    classifier. The local model is scored out-of-fold (cross_val_models),
+    never on its own training rows."""
+    if classifier == "llm":
+        return lambda i, prompt: _predict(prompt, bucket, stats)
+
+    models = cross_val_models(rows)
+    if classifier == "local":
+        return lambda i, prompt: _timed(models[i].predict, prompt)
+
+    threshold = get_local_intent_threshold()
+
+    def _hybrid(i: int, prompt: str) -> tuple[IntentClassification, Cost]:
+        local, local_cost = _timed(models[i].predict, prompt)
+        if local.confidence >= threshold:
+            return local, local_cost
+        out, cost = _predict(prompt, bucket, stats)
+        # the router runs the local model first, its time counts too
+        return out, {**cost, "latency_s": cost["latency_s"] + local_cost["latency_s"]}
+
+    return _hybrid
+
+
+def _eval_row(r: dict, out: IntentClassification, cost: Cost) -> IntentEvalRow:
+    return IntentEvalRow(
+        input=r["input"],
+        expected=r["expected"],
+        predicted=out.intent,
+        confidence=out.confidence,
+        meta=r.get("meta", {}),
+        **cost,
+    )
+
+
+def _iter_predictions(
+    rows: list[dict],
+    classifier: str = "llm",
+    max_workers: int = MAX_WORKERS,
+    rpm: int | None = None,
+    skip: set[int] | frozenset[int] = frozenset(),
+    stats: CacheStats | None = None,
+) -> Iterator[tuple[int, IntentEvalRow]]:
+    """Yields (row index, IntentEvalRow) for every row not in `skip`, in
+    reference order. Rows are classified by `max_workers` threads
+    (1 = one after another) and LLM calls limited to `rpm` per minute; the
+    shared LLM client's own concurrency and rate limits apply on top. At most
+    2 * max_workers rows are submitted ahead of the next row to yield, so
+    memory stays bounded while a slow row holds back the rest.
+    LLM predictions are looked up in the prediction cache first unless
+    stats is None."""
+    bucket = TokenBucket(rpm, 60.0, burst=1) if rpm else None
+    predict = _predictor(rows, classifier, bucket, stats)
+
+    def _row(i: int) -> tuple[int, IntentEvalRow]:
+        return i, _eval_row(rows[i], *predict(i, rows[i]["input"]))
+
+    todo = (i for i in range(len(rows)) if i not in skip)
+    if max_workers <= 1:
+        yield from map(_row, todo)
+        return
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: deque[Future] = deque()  # in submission = reference order
+        for i in todo:
+            pending.append(executor.submit(_row, i))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+# ---- Checkpoint file ----
+def _scored_rows(path: Path, rows: list[dict]) -> set[int]:
+    """Indices of the rows already in predictions.jsonl. A line cut off by a
+    crash is dropped; rows that no longer match the reference set raise."""
+    if not path.exists():
+        return set()
+    trim_partial_line(path)
+    done = set()
+    for rec in read_jsonl(path):
+        i = rec["index"]
+        if i >= len(rows) or rows[i]["input"] != rec["input"]:
+            raise EvalDataError(
+                f"{path} does not match the reference set (row {i}), "
+                "start a new run instead of resuming"
             )
-        )
-    return preds
+        done.add(i)
+    return done
 
 
-def create_report(preds: list[IntentEvalRow]) -> dict[str, Any]:
+def _read_predictions(path: Path) -> list[IntentEvalRow]:
+    """The scored rows in reference order. A resumed run appends the rows
+    it fills in after those scored before the interruption."""
+    out = []
+    for rec in sorted(read_jsonl(path), key=lambda rec: rec["index"]):
+        rec.pop("index")
+        out.append(IntentEvalRow(**rec))
+    return out
+
+
+def create_report(
+    preds: Iterable[IntentEvalRow], model: str = llm_classifier.MODEL
+) -> dict[str, Any]:
     """Creates a report with below metrics.
 
     Overall metrics:
@@ -83,45 +272,123 @@ def create_report(preds: list[IntentEvalRow]) -> dict[str, Any]:
         F1-score,
         confidence mean
 
-    """
+    Overall metrics get 95% bootstrap confidence intervals.
 
-    # ------ CONFUSION MATRIX ------
-    # extract ref and pred for confusion matrix
-    ref = [r.expected for r in preds]
-    pred = [r.predicted for r in preds]
+    Performance:
+        latency p50/p95/p99, mean and max,
+        sequential throughput,
+        input/output tokens,
+        cost at `model` list prices
+    """
 
-    # create confusion matrix
-    cm = confusion_matrix(ref, pred)
+    # extract ref, pred and confidence as parallel lists, in one pass so
+    # preds can be streamed from predictions.jsonl
+    ref: list[str] = []
+    pred: list[str] = []
+    conf: list[float] = []
+    latency: list[float] = []
+    tokens_in: list[int] = []
+    tokens_out: list[int] = []
+    for r in preds:
+        ref.append(r.expected)
+        pred.append(r.predicted)
+        conf.append(r.confidence)
+        latency.append(r.latency_s)
+        tokens_in.append(r.input_tokens)
+        tokens_out.append(r.output_tokens)
 
-    # calculate other overall metrics here (accuracy, F1, etc.) - TODO
-    acc = accuracy(ref, pred)
+    metrics = classification_report(ref, pred, conf)
 
     # ------ CREATE REPORT DICTIONARY ------
     report: dict[str, Any] = {
-        "meta": {"num_samples": len(preds), "labels": list(cm.keys())},
+        "meta": {"num_samples": len(ref), "labels": metrics["labels"]},
         "overall": {
-            "confusion_matrix": cm,
-            "accuracy": acc,
-            # TODO add other overall metrics
+            "confusion_matrix": metrics["confusion_matrix"],
+            **metrics["overall"],
         },
+        "per_intent": metrics["per_label"],
+        "performance": performance_report(latency, tokens_in, tokens_out, model),
     }
 
     return report
 
 
-def run() -> Path:
-    """Runs intents eval and returns path to results file"""
+def _start_run(classifier: str, rows: list[dict], resume: Path | str | None) -> Path:
+    """New run directory with run.json, or the `resume` directory after
+    checking that it was run with the same classifier and reference set"""
+    if resume is None:
+        outdir = run_dir(label="intents-eval")
+        write_json(outdir / RUN_FILE, {"classifier": classifier, "num_rows": len(rows)})
+        return outdir
+
+    outdir = Path(resume)
+    if not (outdir / RUN_FILE).exists():
+        raise EvalDataError(f"{outdir} is not an intents eval run directory")
+    with (outdir / RUN_FILE).open("r", encoding="utf-8") as f:
+        started = json.load(f)
+    if started["classifier"] != classifier or started["num_rows"] != len(rows):
+        raise EvalDataError(
+            f"{outdir} was run with classifier {started['classifier']!r} on "
+            f"{started['num_rows']} rows, cannot resume with {classifier!r} "
+            f"on {len(rows)} rows"
+        )
+    return outdir
+
+
+def run(
+    classifier: str = "llm",
+    max_workers: int = MAX_WORKERS,
+    rpm: int | None = None,
+    resume: Path | str | None = None,
+    use_cache: bool = True,
+) -> Path:
+    """Runs intents eval and returns path to results file.
+    classifier: "llm" (gpt-4o), "local" (n-gram model, cross-validated) or
+    "hybrid" (local when confident, else llm, as used by the router)
+    max_workers: rows classified concurrently, rpm: max LLM calls per minute
+    Every row is appended to predictions.jsonl in the run directory as soon
+    as it is scored and the report is built from that file. resume: a run
+    directory of an interrupted run; only its missing rows are classified.
+    use_cache: answer unchanged rows from the prediction cache (hit rates are
+    in the report meta)"""
+    if classifier not in CLASSIFIERS:
+        raise ValueError(f"classifier must be one of {CLASSIFIERS}")
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
     rows = load_default_intents()  # TODO limit is for testing
-    preds = _build_predictions(rows)  # returns a list of IntentEvalRow
+    outdir = _start_run(classifier, rows, resume)
+    predictions_path = outdir / PREDICTIONS_FILE
+    done = _scored_rows(predictions_path, rows)
+    stats = CacheStats() if use_cache and classifier != "local" else None
 
-    # create report
-    report = create_report(preds)  # TODO implement
+    # checkpoint every row, a crash loses only the rows in flight
+    scored = _iter_predictions(rows, classifier, max_workers, rpm, done, stats)
+    start = time.perf_counter()
+    n_scored = 0
+    with predictions_path.open("a", encoding="utf-8") as f:
+        for i, row in scored:
+            f.write(json.dumps({"index": i, **asdict(row)}, ensure_ascii=False))
+            f.write("\n")
+            f.flush()
+            n_scored += 1
+    wall_s = time.perf_counter() - start
 
-    # create output directory
-    outdir = run_dir(label="intents-eval")
-    out_path = outdir / "intent_report.json"
+    # create report
+    report = create_report(_read_predictions(predictions_path))
+    report["meta"]["classifier"] = classifier
+    report["meta"]["max_workers"] = max_workers
+    report["meta"]["rpm"] = rpm
+    report["meta"]["resumed_rows"] = len(done)
+    # LLM lookups of this invocation; none for the local classifier
+    report["meta"]["prediction_cache"] = stats.summary() if stats else None
+    # throughput of this invocation, with its workers, limits and cache hits
+    report["performance"]["wall_s"] = round(wall_s, 3)
+    report["performance"]["rows_per_s"] = (
+        round(n_scored / wall_s, 2) if n_scored and wall_s > 0 else None
+    )
 
     # write report to json file
-    write_json(out_path, report)  # TODO implement
+    out_path = outdir / REPORT_FILE
+    write_json(out_path, report)
 
     return out_path
@@ -2,9 +2,29 @@
 intents - classifies intent from user prompt
 
 Publikt API:
-- intent_classifier: classifies intent based on user input
+- local_else_llm: local model's answer when confident, else the LLM's
+- intent_classifier: classifies intent based on user input with the LLM
+- local_intent_classifier: classifies intent with the local model only
+- LocalIntentClassifier: char n-gram TF-IDF + linear model
+- parse_prompt: intent + entities (companies, sectors, countries, KPI
+  hints), local model first and otherwise one LLM call
+- IntentClassification: result model (intent, confidence, reasoning)
+- PromptParse: IntentClassification with the extracted entities
 """
 
+from bd_agent.intents._models import IntentClassification, PromptParse
 from bd_agent.intents.classifier import intent_classifier
+from bd_agent.intents.hybrid import local_else_llm
+from bd_agent.intents.local import LocalIntentClassifier, local_intent_classifier
+from bd_agent.intents.parse import llm_parse_prompt, parse_prompt
 
-__all__ = ["intent_classifier"]
+__all__ = [
+    "IntentClassification",
+    "LocalIntentClassifier",
+    "PromptParse",
+    "intent_classifier",
+    "llm_parse_prompt",
+    "local_else_llm",
+    "local_intent_classifier",
+    "parse_prompt",
+]
@@ -0,0 +1,55 @@
+"""Cached structured LLM call shared by intent_classifier and llm_parse_prompt"""
+
+from typing import TypeVar
+
+from pydantic import BaseModel
+
+from bd_agent import tracing
+from bd_agent.cache import MemoCache, cache_key, normalize_prompt, text_hash
+from bd_agent.llm import call, openai_client
+
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def prompt_key(user_prompt: str, model: str, system_prompt: str) -> str:
+    """Key on the normalized prompt, model and system prompt version"""
+    return cache_key(normalize_prompt(user_prompt), model, text_hash(system_prompt))
+
+
+def cached_parse(
+    name: str,
+    cache: MemoCache,
+    output_type: type[M],
+    user_prompt: str,
+    model: str,
+    system_prompt: str,
+    temperature: float = 0.0,
+    use_cache: bool = True,
+) -> M:
+    """`output_type` parsed from one LLM call, memoized in `cache` unless
+    use_cache=False. The call is traced as llm.<name>, hits as cache.<name>."""
+
+    key = prompt_key(user_prompt, model, system_prompt)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            tracing.current_span().set(**{f"cache.{name}": "hit"})
+            return output_type.model_validate(cached)
+
+    with call(f"llm.{name}", model) as span:
+        response = openai_client().responses.parse(
+            model=model,
+            temperature=temperature,
+            input=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            text_format=output_type,
+        )
+        span.set_usage(response.usage)
+
+    out = response.output[0].content[0].parsed
+    cache.set(key, out.model_dump())
+
+    return out
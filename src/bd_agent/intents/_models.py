@@ -0,0 +1,25 @@
+"""Models to the intents package"""
+
+from typing import Literal
+from pydantic import BaseModel
+
+
+class IntentClassification(BaseModel):
+    intent: Literal[
+        "screening",
+        "single_stock_analysis",
+        "portfolio_analysis",
+        "investment_advice",
+        "none",
+    ]
+    confidence: float
+    reasoning: str
+
+
+class PromptParse(IntentClassification):
+    """Intent plus the entities named in the prompt, from one LLM call"""
+
+    companies: list[str]
+    sectors: list[str]
+    countries: list[str]
+    kpi_hints: list[str]
@@ -1,24 +1,13 @@
 """Consists of IntentClassification basemodel and a function intent_classfier() -> IntentClassification"""
 
-from typing import Literal
-from pydantic import BaseModel
-from openai import OpenAI
-from bd_agent.settings import get_openai_key
+from bd_agent.cache import memo_cache
 
+from ._llm import cached_parse
+from ._models import IntentClassification
 
-class IntentClassification(BaseModel):
-    intent: Literal[
-        "screening",
-        "single_stock_analysis",
-        "portfolio_analysis",
-        "investment_advice",
-        "none",
-    ]
-    confidence: float
-    reasoning: str
 
-
-client = OpenAI(api_key=get_openai_key())
+MODEL = "gpt-4o"
+TEMPERATURE = 0.0
 
 
 SYSTEM_PROMPT = """
@@ -45,19 +34,21 @@ SYSTEM_PROMPT = """
                 """
 
 
-def intent_classifier(user_prompt: str) -> IntentClassification:
-    """Classifies the user's intent based on their prompt."""
+_cache = memo_cache("intent_classifier")
 
-    response = client.responses.parse(
-        model="gpt-4o",
-        temperature=0.0,
-        input=[
-            {"role": "system", "content": SYSTEM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ],
-        text_format=IntentClassification,
-    )
 
-    out = response.output[0].content[0].parsed
+def intent_classifier(user_prompt: str, use_cache: bool = True) -> IntentClassification:
+    """Classifies the user's intent based on their prompt.
+    Identical prompts (ignoring case and whitespace) are answered from the
+    cache unless use_cache=False."""
 
-    return out
+    return cached_parse(
+        "intent_classifier",
+        _cache,
+        IntentClassification,
+        user_prompt,
+        MODEL,
+        SYSTEM_PROMPT,
+        temperature=TEMPERATURE,
+        use_cache=use_cache,
+    )
@@ -0,0 +1,33 @@
+"""Hybrid intent classification: local model first, LLM only when unsure"""
+
+from typing import Callable, TypeVar
+
+from bd_agent import tracing
+from bd_agent.settings import get_local_intent_threshold
+
+from ._models import IntentClassification
+from .local import local_intent_classifier
+
+
+T = TypeVar("T")
+
+
+def local_else_llm(
+    user_prompt: str,
+    from_local: Callable[[IntentClassification], T],
+    llm: Callable[[str], T],
+    threshold: float | None = None,
+) -> T:
+    """from_local(local answer) when the local model's confidence reaches
+    `threshold` (default BD_AGENT_LOCAL_INTENT_THRESHOLD), else llm(prompt)"""
+
+    if threshold is None:
+        threshold = get_local_intent_threshold()
+
+    with tracing.span("intent.local") as span:
+        local = local_intent_classifier(user_prompt)
+        span.set(intent=local.intent, confidence=local.confidence)
+
+    if local.confidence >= threshold:
+        return from_local(local)
+    return llm(user_prompt)
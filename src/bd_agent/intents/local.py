@@ -0,0 +1,178 @@
+"""Local intent classifier: character n-gram TF-IDF and a softmax linear model.
+
+Trained from the packaged golden intents on first use (about 0.2 s), then
+predicts in about 0.1 ms per prompt. Returns the same IntentClassification as
+the LLM classifier, with confidence = the model's probability for the chosen
+intent.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from bd_agent.cache import normalize_prompt
+
+from ._models import IntentClassification
+
+
+NGRAM_RANGE = (2, 4)  # character n-gram lengths, inclusive
+EPOCHS = 300
+LEARNING_RATE = 8.0
+L2 = 1e-4
+
+
+def _ngrams(text: str) -> Iterator[str]:
+    """Character n-grams of the normalized text, padded with spaces"""
+    padded = f" {normalize_prompt(text)} "
+    lo, hi = NGRAM_RANGE
+    for n in range(lo, hi + 1):
+        for i in range(len(padded) - n + 1):
+            yield padded[i : i + n]
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    exp = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class LocalIntentClassifier:
+    """TF-IDF (sublinear tf, smoothed idf, L2 normalized) over character
+    n-grams, followed by multinomial logistic regression"""
+
+    def __init__(
+        self,
+        vocabulary: dict[str, int],
+        idf: np.ndarray,
+        weights: np.ndarray,
+        bias: np.ndarray,
+        labels: list[str],
+    ) -> None:
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.weights = weights  # (n_features, n_labels)
+        self.bias = bias
+        self.labels = labels
+
+    # ---- Training ----
+    @classmethod
+    def fit(
+        cls,
+        texts: list[str],
+        labels: list[str],
+        epochs: int = EPOCHS,
+        learning_rate: float = LEARNING_RATE,
+        l2: float = L2,
+    ) -> LocalIntentClassifier:
+        """Trains on texts/labels with full-batch gradient descent"""
+        counts = [Counter(_ngrams(t)) for t in texts]
+        doc_freq = Counter(g for c in counts for g in c)
+        vocabulary = {g: i for i, g in enumerate(sorted(doc_freq))}
+        n = len(texts)
+        idf = np.array(
+            [math.log((1 + n) / (1 + doc_freq[g])) + 1 for g in vocabulary],
+            dtype=np.float32,
+        )
+
+        X = np.zeros((n, len(vocabulary)), dtype=np.float32)
+        for row, c in enumerate(counts):
+            for gram, k in c.items():
+                X[row, vocabulary[gram]] = 1 + math.log(k)
+        X *= idf
+        X /= np.linalg.norm(X, axis=1, keepdims=True).clip(min=1e-12)
+
+        label_list = sorted(set(labels))
+        y = np.array([label_list.index(label) for label in labels])
+        Y = np.eye(len(label_list), dtype=np.float32)[y]
+
+        W = np.zeros((len(vocabulary), len(label_list)), dtype=np.float32)
+        b = np.zeros(len(label_list), dtype=np.float32)
+        for _ in range(epochs):
+            grad = _softmax(X @ W + b) - Y
+            W -= learning_rate * (X.T @ grad / n + l2 * W)
+            b -= learning_rate * grad.mean(axis=0)
+
+        return cls(vocabulary, idf, W, b, label_list)
+
+    # ---- Prediction ----
+    def _features(self, text: str) -> tuple[np.ndarray, np.ndarray]:
+        """Sparse (indices, values) TF-IDF vector of one text"""
+        vocab = self.vocabulary
+        c = Counter(g for g in _ngrams(text) if g in vocab)
+        if not c:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        idx = np.fromiter((vocab[g] for g in c), dtype=np.intp, count=len(c))
+        tf = np.fromiter((1 + math.log(k) for k in c.values()), np.float32, len(c))
+        values = tf * self.idf[idx]
+        return idx, values / np.linalg.norm(values)
+
+    def predict_proba(self, text: str) -> np.ndarray:
+        """Probability per label (order of self.labels)"""
+        idx, values = self._features(text)
+        return _softmax(values @ self.weights[idx] + self.bias)
+
+    def predict(self, text: str) -> IntentClassification:
+        proba = self.predict_proba(text)
+        best = int(proba.argmax())
+        return IntentClassification(
+            intent=self.labels[best],
+            confidence=round(float(proba[best]), 4),
+            reasoning="local char n-gram model",
+        )
+
+
+def cross_val_models(
+    rows: list[dict], folds: int = 5, seed: int = 0
+) -> list[LocalIntentClassifier]:
+    """For every golden-set style row {input, expected} the model trained on
+    the other folds, so no row is scored by a model that saw it"""
+    order = np.random.default_rng(seed).permutation(len(rows))
+    models: list[LocalIntentClassifier | None] = [None] * len(rows)
+    for k in range(folds):
+        held_out = set(order[k::folds].tolist())
+        train = [r for i, r in enumerate(rows) if i not in held_out]
+        model = LocalIntentClassifier.fit(
+            [r["input"] for r in train], [r["expected"] for r in train]
+        )
+        for i in held_out:
+            models[i] = model
+    return models  # type: ignore[return-value]
+
+
+def cross_val_predict(
+    rows: list[dict], folds: int = 5, seed: int = 0
+) -> list[IntentClassification]:
+    """Out-of-fold predictions for golden-set style rows {input, expected},
+    so the local model is never scored on prompts it was trained on"""
+    models = cross_val_models(rows, folds, seed)
+    return [model.predict(r["input"]) for model, r in zip(models, rows)]
+
+
+# ---- Default model, trained once per process ----
+_model: LocalIntentClassifier | None = None
+_model_lock = threading.Lock()
+
+
+def default_model(rows: Iterable[dict] | None = None) -> LocalIntentClassifier:
+    """The model trained on the packaged golden intents (or `rows`)"""
+    global _model
+    with _model_lock:
+        if _model is None or rows is not None:
+            if rows is None:
+                from bd_agent.eval.io import load_default_intents
+
+                rows = load_default_intents()
+            rows = list(rows)
+            _model = LocalIntentClassifier.fit(
+                [r["input"] for r in rows], [r["expected"] for r in rows]
+            )
+        return _model
+
+
+def local_intent_classifier(user_prompt: str) -> IntentClassification:
+    """Classifies the prompt with the local model, no API call"""
+    return default_model().predict(user_prompt)
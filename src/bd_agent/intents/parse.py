@@ -0,0 +1,69 @@
+"""Front-end prompt parse: intent and entities (companies, sectors, countries,
+KPI hints) in one structured LLM call, so the router and agents do not each
+re-read the prompt with their own calls"""
+
+from bd_agent.cache import memo_cache
+
+from ._llm import cached_parse
+from ._models import PromptParse
+from .hybrid import local_else_llm
+
+
+MODEL = "gpt-4o"
+
+
+SYSTEM_PROMPT = """
+                    You are the front end of an investment assistant for Nordic stocks.
+                    Read the user's prompt once and return both what the user wants and what it mentions.
+
+                    "intent" is one of:
+                    1. "screening" — find companies based on filters such as industry, country, sector or key financial metrics.
+                    2. "single_stock_analysis" — analyze a single company (e.g., asking about a specific stock).
+                    3. "portfolio_analysis" — analyze a portfolio or multiple holdings (e.g., diversification or opinions on multiple stocks).
+                    4. "investment_advice" — investment advice or strategies, or knowledge about finance, stocks or investments.
+                    If you are not at least 50% confident, return "none".
+                    Give "confidence" (a float between 0 and 1) and a brief "reasoning". Be concise.
+
+                    Entities, each a list of strings, empty when the prompt mentions none:
+                    - "companies": company names or tickers exactly as the user wrote them, also when misspelled
+                      (e.g. Investor B, Swedbank A, SSAB).
+                    - "sectors": sectors or industries, e.g. banks, real estate.
+                    - "countries": countries or markets, e.g. Sweden, Norway.
+                    - "kpi_hints": key figures or metrics the user mentions, e.g. ROIC, P/E, dividend yield.
+                """
+
+
+_cache = memo_cache("prompt_parse")
+
+
+def llm_parse_prompt(user_prompt: str, use_cache: bool = True) -> PromptParse:
+    """Intent and entities of the prompt from one LLM call, cached like
+    intent_classifier unless use_cache=False"""
+
+    return cached_parse(
+        "prompt_parse",
+        _cache,
+        PromptParse,
+        user_prompt,
+        MODEL,
+        SYSTEM_PROMPT,
+        use_cache=use_cache,
+    )
+
+
+def parse_prompt(
+    user_prompt: str, threshold: float | None = None, use_cache: bool = True
+) -> PromptParse:
+    """When the local model is confident its intent is used without an LLM
+    call and the entity lists stay empty (agents resolve names locally, then
+    extract them if needed). Otherwise one LLM call returns intent and
+    entities together."""
+
+    return local_else_llm(
+        user_prompt,
+        lambda local: PromptParse(
+            **local.model_dump(), companies=[], sectors=[], countries=[], kpi_hints=[]
+        ),
+        lambda prompt: llm_parse_prompt(prompt, use_cache=use_cache),
+        threshold,
+    )
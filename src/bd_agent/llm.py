@@ -0,0 +1,306 @@
+"""Shared plumbing for the LLM calls made by the agents.
+
+All OpenAI traffic goes through one provider layer:
+- openai_client() / async_openai_client(): process-wide clients on one
+  pooled HTTP transport with a global concurrency and rate limit and
+  retries (see _llm_http), created on first use
+- BD_AGENT_LLM_MODE picks what answers under that transport: the API
+  (live), the API while recording to a cassette (record), the cassette
+  only (replay, see _llm_replay) or the local rule-based model (stub)
+- chat_model(): pydantic_ai model on the shared async client
+- call(): span around one LLM call that also records its token usage in
+  `usage`, summed per call site (and in an active track_usage() block)
+- cost_usd(): list price of a model's tokens
+- run_agent_sync(): runs pydantic_ai agents on one background event loop
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from bd_agent import tracing
+from bd_agent.settings import (
+    get_llm_cassette_path,
+    get_llm_max_concurrency,
+    get_llm_mode,
+    get_llm_rate_limits,
+    get_llm_stub_delays,
+    get_openai_key,
+)
+
+
+_loop: asyncio.AbstractEventLoop | None = None
+_loop_lock = threading.Lock()
+_openai = None
+_async_openai = None
+_limiter = None
+_cassette = None
+_stub = None
+_clients_lock = threading.Lock()
+OFFLINE_MODES = ("replay", "stub")
+
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Event loop running forever in a daemon thread, started on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name="bd-agent-llm-loop", daemon=True
+            )
+            thread.start()
+            _loop = loop
+        return _loop
+
+
+def run_agent_sync(agent, *args: Any, **kwargs: Any):
+    """Runs a pydantic_ai agent from sync code in any thread.
+
+    Agent.run_sync() runs on the calling thread's event loop, but pydantic_ai
+    pools its HTTP connections process-wide and they are bound to the loop
+    that opened them, so runs from different threads (DAG stages) fail. All
+    runs go through one background loop instead."""
+    future = asyncio.run_coroutine_threadsafe(
+        agent.run(*args, **kwargs), _background_loop()
+    )
+    return future.result()
+
+
+# ---- Clients ----
+def limiter():
+    """The process-wide LLMLimiter (BD_AGENT_LLM_CONCURRENCY/_RPM/_TPM)"""
+    global _limiter
+    with _clients_lock:
+        if _limiter is None:
+            from bd_agent._llm_http import LLMLimiter
+
+            rpm, tpm = get_llm_rate_limits()
+            if get_llm_mode() in OFFLINE_MODES:
+                rpm = tpm = None  # no provider quota to respect
+            _limiter = LLMLimiter(get_llm_max_concurrency(), rpm, tpm)
+        return _limiter
+
+
+def _inner_transport(asynchronous: bool):
+    """What the limited transport sends to for the current BD_AGENT_LLM_MODE,
+    None for the pooled HTTP transport (caller holds _clients_lock)"""
+    global _cassette, _stub
+    mode = get_llm_mode()
+    if mode == "stub":
+        if _stub is None:
+            from bd_agent.testing.llm_server import OpenAIStandIn
+
+            latency, token_delay = get_llm_stub_delays()
+            _stub = OpenAIStandIn(
+                latency=latency, token_delay=token_delay, listen=False
+            )
+        return _stub.transport()
+    if mode in ("record", "replay"):
+        from bd_agent import _llm_http
+        from bd_agent._llm_replay import Cassette, RecordReplayTransport
+
+        if _cassette is None:
+            _cassette = Cassette(get_llm_cassette_path())
+        inner = None
+        if mode == "record":
+            inner = (
+                _llm_http.pooled_async_transport()
+                if asynchronous
+                else _llm_http.pooled_transport()
+            )
+        return RecordReplayTransport(_cassette, inner)
+    return None
+
+
+def _api_key() -> str | None:
+    if get_llm_mode() in OFFLINE_MODES:
+        return get_openai_key() or "offline"
+    return get_openai_key()
+
+
+def openai_client():
+    """Process-wide OpenAI client. The SDK is imported and the client created
+    on first use, so importing bd_agent stays fast and OPENAI_BASE_URL set
+    before the first call (stand-ins) is honoured. Retries are done by the
+    transport, not the SDK."""
+    global _openai
+    shared = limiter()
+    with _clients_lock:
+        if _openai is None:
+            import httpx
+            from openai import OpenAI
+
+            from bd_agent._llm_http import TIMEOUT, LimitedTransport
+
+            transport = LimitedTransport(shared, _inner_transport(False))
+            _openai = OpenAI(
+                api_key=_api_key(),
+                max_retries=0,
+                http_client=httpx.Client(transport=transport, timeout=TIMEOUT),
+            )
+        return _openai
+
+
+def async_openai_client():
+    """Process-wide AsyncOpenAI client for pydantic_ai. Its connections belong
+    to the background loop, so use it only through run_agent_sync()."""
+    global _async_openai
+    shared = limiter()
+    with _clients_lock:
+        if _async_openai is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            from bd_agent._llm_http import TIMEOUT, AsyncLimitedTransport
+
+            transport = AsyncLimitedTransport(shared, _inner_transport(True))
+            _async_openai = AsyncOpenAI(
+                api_key=_api_key(),
+                max_retries=0,
+                http_client=httpx.AsyncClient(transport=transport, timeout=TIMEOUT),
+            )
+        return _async_openai
+
+
+def chat_model(model: str = "gpt-4o"):
+    """pydantic_ai OpenAIChatModel on the shared async client"""
+    from pydantic_ai.models.openai import OpenAIChatModel
+    from pydantic_ai.providers.openai import OpenAIProvider
+
+    return OpenAIChatModel(
+        model, provider=OpenAIProvider(openai_client=async_openai_client())
+    )
+
+
+# ---- Usage ----
+class UsageLedger:
+    """Calls, errors, tokens and seconds per LLM call site"""
+
+    def __init__(self) -> None:
+        self._rows: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self, name: str, model: str, tokens: dict[str, int], seconds: float, error: bool
+    ) -> None:
+        with self._lock:
+            row = self._rows.setdefault(
+                name,
+                {
+                    "model": model,
+                    "calls": 0,
+                    "errors": 0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "seconds": 0.0,
+                },
+            )
+            row["calls"] += 1
+            row["errors"] += error
+            row["input_tokens"] += tokens.get("llm.input_tokens", 0)
+            row["output_tokens"] += tokens.get("llm.output_tokens", 0)
+            row["seconds"] = round(row["seconds"] + seconds, 4)
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {name: dict(row) for name, row in self._rows.items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+
+usage = UsageLedger()
+
+
+# USD per million (input, output) tokens, OpenAI list prices
+PRICES_PER_MTOKEN: dict[str, tuple[float, float]] = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+_tracked: contextvars.ContextVar[dict | None] = contextvars.ContextVar(
+    "bd_agent_llm_tracked", default=None
+)
+
+
+def cost_usd(model: str, input_tokens: int, output_tokens: int) -> float | None:
+    """List price of the tokens, None for models without a known price"""
+    price = PRICES_PER_MTOKEN.get(model)
+    if price is None:
+        return None
+    return (input_tokens * price[0] + output_tokens * price[1]) / 1e6
+
+
+@contextmanager
+def track_usage() -> Iterator[dict[str, int]]:
+    """Sums calls and tokens of the LLM calls made inside the block in the
+    current context (thread), e.g. to attribute tokens to one eval row"""
+    totals = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+    token = _tracked.set(totals)
+    try:
+        yield totals
+    finally:
+        _tracked.reset(token)
+
+
+class _Call:
+    """Handle yielded by call(): like a span, and keeps the token counts"""
+
+    __slots__ = ("span", "tokens")
+
+    def __init__(self, span) -> None:
+        self.span = span
+        self.tokens: dict[str, int] = {}
+
+    def set(self, **attributes: Any) -> None:
+        self.span.set(**attributes)
+
+    def set_usage(self, usage: Any) -> None:
+        for attr, value in tracing.usage_counts(usage).items():
+            self.tokens[attr] = self.tokens.get(attr, 0) + value
+        self.span.set(**self.tokens)
+
+
+@contextmanager
+def call(name: str, model: str, **attributes: Any) -> Iterator[_Call]:
+    """Span `name` around one LLM call; set_usage() on the handle records the
+    tokens on the span and in `usage`"""
+    with tracing.span(name, **{"llm.model": model}, **attributes) as span:
+        handle = _Call(span)
+        start = time.perf_counter()
+        error = False
+        try:
+            yield handle
+        except Exception:
+            error = True
+            raise
+        finally:
+            usage.add(name, model, handle.tokens, time.perf_counter() - start, error)
+            tracked = _tracked.get()
+            if tracked is not None:
+                tracked["calls"] += 1
+                tracked["input_tokens"] += handle.tokens.get("llm.input_tokens", 0)
+                tracked["output_tokens"] += handle.tokens.get("llm.output_tokens", 0)
+
+
+def stats() -> dict:
+    """Usage per call site, the limiter's request/retry/throttle counters and
+    the answer source's counters (cassette hits/misses/recorded, stub
+    requests)"""
+    out = {
+        "mode": get_llm_mode(),
+        "usage": usage.summary(),
+        "limiter": dict(_limiter.stats) if _limiter is not None else {},
+    }
+    if _cassette is not None:
+        out["cassette"] = dict(_cassette.stats)
+    if _stub is not None:
+        out["stub"] = _stub.snapshot()
+    return out
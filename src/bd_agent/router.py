@@ -1,30 +1,35 @@
 """Router that is called from __main__.py and routes forward to the correct agent"""
 
-from bd_agent.intents import intent_classifier
+from bd_agent import tracing
+from bd_agent.intents import parse_prompt
 import bd_agent.agents as agents
-import bd_agent.bd as bd
 
 
-def run_agent(user_prompt) -> None:
+def run_agent(user_prompt, stream: bool = False):
     """Runs the agent through intent and direct to the right agent.
     Then prints the output.
+    stream=True makes text answers (the advisor) an iterator of text deltas.
     """
 
-    # Classify user prompt
-    intent = intent_classifier(user_prompt).intent
+    with tracing.span("router.run_agent") as span:
+        # Parse user prompt once: intent (local model first, the LLM only if
+        # unsure) and the entities the agents need
+        parsed = parse_prompt(user_prompt)
+        intent = parsed.intent
+        span.set(intent=intent)
 
-    # route forward to right agent based on intent
-    if intent == "screening":
-        # print("Routing to screening...")
-        return agents.run_screener(user_prompt)
-    elif intent == "single_stock_analysis":
-        # print("Routing to single stock analysis...")
-        return agents.run_analyzer(user_prompt)
-    elif intent == "portfolio_analysis":
-        # print("Routing to portfolio analysis...")
-        pass
-    elif intent == "general_investment_advice":
-        # print("Routing to general investment advice...")
-        return agents.run_advisor(user_prompt)
-    else:
-        return "I am not an expert on this subject. Please ask me about stocks, finance or investments and I am happy to help :)"
+        # route forward to right agent based on intent
+        if intent == "screening":
+            # print("Routing to screening...")
+            return agents.run_screener(user_prompt, parsed=parsed)
+        elif intent == "single_stock_analysis":
+            # print("Routing to single stock analysis...")
+            return agents.run_analyzer(user_prompt, parsed=parsed)
+        elif intent == "portfolio_analysis":
+            # print("Routing to portfolio analysis...")
+            pass
+        elif intent == "investment_advice":
+            # print("Routing to general investment advice...")
+            return agents.run_advisor(user_prompt, stream=stream)
+        else:
+            return "I am not an expert on this subject. Please ask me about stocks, finance or investments and I am happy to help :)"
@@ -1,6 +1,7 @@
 """Configurations for the BD and OPENAI API keys"""
 
 import os
+from pathlib import Path
 
 
 def get_bdapi_key() -> str | None:
@@ -11,3 +12,96 @@ def get_bdapi_key() -> str | None:
 def get_openai_key() -> str | None:
     """Retrieves the OpenAI API key from environment variables or .env file."""
     return os.getenv("OPENAI_API_KEY")
+
+
+def get_cache_dir() -> Path:
+    """Directory for local caches. BD_AGENT_CACHE_DIR or ~/.cache/bd_agent."""
+    path = os.getenv("BD_AGENT_CACHE_DIR")
+    return Path(path) if path else Path.home() / ".cache" / "bd_agent"
+
+
+def get_bd_mirror_path() -> Path | None:
+    """Path to the local Börsdata mirror file from BORSDATA_MIRROR.
+    Defaults to <cache dir>/borsdata.sqlite, returns None if set to "off"."""
+    path = os.getenv("BORSDATA_MIRROR")
+    if path is None:
+        return get_cache_dir() / "borsdata.sqlite"
+    if path.strip().lower() in ("", "0", "off", "false", "none"):
+        return None
+    return Path(path)
+
+
+def get_llm_cache_path() -> Path | None:
+    """Path to the LLM result cache from BD_AGENT_LLM_CACHE.
+    Defaults to <cache dir>/llm_cache.sqlite, returns None if set to "off"
+    or when the stub model answers (BD_AGENT_LLM_MODE=stub)."""
+    if get_llm_mode() == "stub":
+        return None
+    path = os.getenv("BD_AGENT_LLM_CACHE")
+    if path is None:
+        return get_cache_dir() / "llm_cache.sqlite"
+    if path.strip().lower() in ("", "0", "off", "false", "none"):
+        return None
+    return Path(path)
+
+
+def get_trace_path() -> Path | None:
+    """Path of the JSONL span file from BD_AGENT_TRACE, None when tracing is off.
+    BD_AGENT_TRACE=1 writes to <cache dir>/traces.jsonl."""
+    path = os.getenv("BD_AGENT_TRACE")
+    if path is None or path.strip().lower() in ("", "0", "off", "false", "none"):
+        return None
+    if path.strip().lower() in ("1", "on", "true"):
+        return get_cache_dir() / "traces.jsonl"
+    return Path(path)
+
+
+def get_local_intent_threshold() -> float:
+    """Confidence the local intent model needs before the LLM is skipped,
+    from BD_AGENT_LOCAL_INTENT_THRESHOLD (default 0.8, above 1 disables it)."""
+    return float(os.getenv("BD_AGENT_LOCAL_INTENT_THRESHOLD", "0.8"))
+
+
+def get_llm_max_concurrency() -> int:
+    """Max LLM requests in flight across the process (BD_AGENT_LLM_CONCURRENCY)"""
+    return int(os.getenv("BD_AGENT_LLM_CONCURRENCY", "8"))
+
+
+def get_llm_rate_limits() -> tuple[int, int]:
+    """(requests, tokens) per minute allowed by the LLM provider,
+    BD_AGENT_LLM_RPM and BD_AGENT_LLM_TPM (defaults: gpt-4o tier 1)"""
+    return (
+        int(os.getenv("BD_AGENT_LLM_RPM", "500")),
+        int(os.getenv("BD_AGENT_LLM_TPM", "30000")),
+    )
+
+
+LLM_MODES = ("live", "record", "replay", "stub")
+
+
+def get_llm_mode() -> str:
+    """Where LLM answers come from, BD_AGENT_LLM_MODE (default live):
+    live: the OpenAI API, record: the API and saved to the cassette,
+    replay: only the cassette, stub: the local rule-based model."""
+    mode = os.getenv("BD_AGENT_LLM_MODE", "live").strip().lower() or "live"
+    if mode not in LLM_MODES:
+        raise ValueError(
+            f"BD_AGENT_LLM_MODE must be one of {', '.join(LLM_MODES)}, got {mode!r}"
+        )
+    return mode
+
+
+def get_llm_cassette_path() -> Path:
+    """File with recorded LLM responses from BD_AGENT_LLM_CASSETTE.
+    Defaults to <cache dir>/llm_cassette.sqlite."""
+    path = os.getenv("BD_AGENT_LLM_CASSETTE")
+    return Path(path) if path else get_cache_dir() / "llm_cassette.sqlite"
+
+
+def get_llm_stub_delays() -> tuple[float, float]:
+    """(seconds per request, seconds per streamed word) of the stub model,
+    BD_AGENT_LLM_STUB_LATENCY and BD_AGENT_LLM_STUB_TOKEN_DELAY (default 0)"""
+    return (
+        float(os.getenv("BD_AGENT_LLM_STUB_LATENCY", "0")),
+        float(os.getenv("BD_AGENT_LLM_STUB_TOKEN_DELAY", "0")),
+    )
@@ -0,0 +1,18 @@
+"""
+testing — local stand-ins for running bd_agent offline (benchmarks, tests)
+
+Public API:
+- BorsdataStandIn: local HTTP server mimicking the Börsdata v1 endpoints
+- FixtureSet: recorded or synthetic data served by the stand-in
+- record_fixtures: records real Börsdata responses into a fixture file
+- OpenAIStandIn: local HTTP server mimicking the OpenAI Responses/Chat APIs
+"""
+
+from bd_agent.testing.borsdata_server import (
+    BorsdataStandIn,
+    FixtureSet,
+    record_fixtures,
+)
+from bd_agent.testing.llm_server import OpenAIStandIn
+
+__all__ = ["BorsdataStandIn", "FixtureSet", "OpenAIStandIn", "record_fixtures"]
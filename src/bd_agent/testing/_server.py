@@ -0,0 +1,206 @@
+"""Base class for the local JSON-over-HTTP stand-in servers"""
+
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterable, Iterator
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+
+# ---- Bodies ----
+class EventStream:
+    """Server-sent events body: handle() may return (status, EventStream(...)).
+    Each event dict is sent as it is produced, named by its "type"."""
+
+    def __init__(self, events: Iterable[dict]) -> None:
+        self.events = events
+
+
+def _sse_chunks(stream: EventStream) -> Iterator[bytes]:
+    for event in stream.events:
+        yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+def _response_parts(status: int, data: dict | EventStream) -> tuple[dict, object]:
+    """(headers, body) the server sends for a handle() result"""
+    if isinstance(data, EventStream):
+        return {"Content-Type": "text/event-stream"}, data
+    headers = {"Content-Type": "application/json"}
+    if status == 429:
+        headers["Retry-After"] = "1"
+    return headers, json.dumps(data).encode("utf-8")
+
+
+class JsonStandIn(abc.ABC):
+    """Threaded local HTTP server answering JSON requests through handle().
+
+    Subclasses implement handle(method, path, query, body) -> (status, dict)
+    or (status, EventStream) and call _count() to keep per-endpoint request
+    counts in `stats`. listen=False skips binding the port, for stand-ins
+    only called in-process through transport().
+    """
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 0, listen: bool = True
+    ) -> None:
+        self.stats: Counter[str] = Counter()
+        self._stats_lock = threading.Lock()
+        self._server = ThreadingHTTPServer(
+            (host, port), self._handler_class(), bind_and_activate=listen
+        )
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Serves in a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """Serves in the calling thread until stop()"""
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def transport(self) -> InProcessTransport:
+        """httpx transport answering through handle() without any socket"""
+        return InProcessTransport(self)
+
+    # ---- Stats ----
+    def reset_stats(self) -> None:
+        with self._stats_lock:
+            self.stats.clear()
+
+    def snapshot(self) -> dict[str, int]:
+        """Copy of the request counters"""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # ---- Request handling ----
+    @abc.abstractmethod
+    def handle(
+        self, method: str, path: str, query: dict[str, list[str]], body: dict | None
+    ) -> tuple[int, dict | EventStream]:
+        """Returns (status, JSON body or EventStream) for one request"""
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+            def _dispatch(self, method: str) -> None:
+                url = urlparse(self.path)
+                body = None
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    body = json.loads(self.rfile.read(length) or b"null")
+                status, data = standin.handle(
+                    method, url.path, parse_qs(url.query), body
+                )
+                if isinstance(data, EventStream):
+                    self._send_events(status, data)
+                    return
+                headers, payload = _response_parts(status, data)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _send_events(self, status: int, stream: EventStream) -> None:
+                # no Content-Length, the body ends when the connection closes
+                self.send_response(status)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                for chunk in _sse_chunks(stream):
+                    self.wfile.write(chunk)
+                    self.wfile.flush()
+                self.close_connection = True
+
+            def do_GET(self) -> None:
+                self._dispatch("GET")
+
+            def do_POST(self) -> None:
+                self._dispatch("POST")
+
+            def log_message(self, format, *args) -> None:
+                pass  # keep benchmark output clean
+
+        return Handler
+
+
+# ---- In-process transport ----
+class _EventBytes(httpx.SyncByteStream, httpx.AsyncByteStream):
+    """SSE body produced while it is read. Async reads run handle()'s
+    generator in a worker thread, since it may sleep between events."""
+
+    def __init__(self, stream: EventStream) -> None:
+        self._chunks = _sse_chunks(stream)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield from self._chunks
+
+    async def __aiter__(self):
+        while True:
+            chunk = await asyncio.to_thread(next, self._chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+
+class InProcessTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Sync and async httpx transport calling a stand-in's handle() directly"""
+
+    def __init__(self, standin: JsonStandIn) -> None:
+        self.standin = standin
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        content = request.read()
+        body = json.loads(content) if content else None
+        query = parse_qs(request.url.query.decode())
+        status, data = self.standin.handle(
+            request.method, request.url.path, query, body
+        )
+        headers, payload = _response_parts(status, data)
+        if isinstance(payload, EventStream):
+            return httpx.Response(
+                status, headers=headers, stream=_EventBytes(payload), request=request
+            )
+        return httpx.Response(status, headers=headers, content=payload, request=request)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self._respond(request)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        # handle() blocks (latency), keep it off the event loop
+        return await asyncio.to_thread(self._respond, request)
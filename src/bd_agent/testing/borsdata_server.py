@@ -0,0 +1,358 @@
+"""Local stand-in for the Börsdata v1 API, serving recorded or synthetic fixtures.
+
+Start it and point the clients at it with BORSDATA_BASE_URL:
+
+    python -m bd_agent.testing.borsdata_server --synthetic 800 --latency 0.05
+    BORSDATA_BASE_URL=http://127.0.0.1:8765/v1 python -m bd_agent cli
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+
+from bd_agent.bd._client import (
+    HISTORY_BATCH_SIZE,
+    RATE_LIMIT_CALLS,
+    RATE_LIMIT_PERIOD,
+)
+from bd_agent.bd._helpers import kpi_map
+from bd_agent.bd._ratelimit import TokenBucket
+from bd_agent.testing._server import JsonStandIn
+
+
+SECTORS = [
+    "Energy",
+    "Materials",
+    "Industrials",
+    "Consumer Discretionary",
+    "Consumer Staples",
+    "Health Care",
+    "Financials",
+    "Information Technology",
+    "Telecommunication Services",
+    "Utilities",
+    "Real Estate",
+]
+BRANCH_SUFFIXES = ["Products", "Services", "Equipment", "Software", "Holdings"]
+NAME_HEADS = ["Nor", "Sve", "Atl", "Vol", "Eri", "Sand", "Hex", "Alfa", "Bol", "Evo"]
+NAME_TAILS = ["dia", "vik", "ona", "tec", "gon", "ström", "berg", "lux", "sson", "ab"]
+SHARE_CLASSES = ["", "", " A", " B"]
+
+
+# ---- Fixtures ----
+class FixtureSet:
+    """Data served by the stand-in. Recorded summaries and histories are used
+    when present, otherwise values are generated deterministically from `seed`
+    (None disables generation, unknown ids then return 404 / no values)."""
+
+    def __init__(
+        self,
+        instruments: list[dict],
+        sectors: list[dict],
+        branches: list[dict],
+        summaries: dict[int, dict] | None = None,
+        histories: dict[int, dict[int, list[dict]]] | None = None,
+        seed: int | None = None,
+        years: int = 10,
+    ) -> None:
+        self.instruments = instruments
+        self.sectors = sectors
+        self.branches = branches
+        self.summaries = summaries or {}
+        self.histories = histories or {}
+        self.seed = seed
+        self.years = years
+        self.ins_ids = {ins["insId"] for ins in instruments}
+
+    # ---- Lookups ----
+    def summary(self, insId: int) -> dict | None:
+        """KPI summary JSON for one instrument"""
+        if insId in self.summaries:
+            return self.summaries[insId]
+        if self.seed is None or insId not in self.ins_ids:
+            return None
+        return {
+            "kpis": [
+                {"KpiId": kpi_id, "values": self._values(kpi_id, insId)}
+                for kpi_id in kpi_map
+            ]
+        }
+
+    def history(self, kpiId: int, insId: int) -> list[dict] | None:
+        """KPI history values for one instrument"""
+        recorded = self.histories.get(kpiId, {})
+        if insId in recorded:
+            return recorded[insId]
+        if self.seed is None or insId not in self.ins_ids:
+            return None
+        return self._values(kpiId, insId)
+
+    def _values(self, kpiId: int, insId: int) -> list[dict]:
+        """Deterministic random walk around a per-instrument level"""
+        rng = random.Random(f"{self.seed}:{kpiId}:{insId}")
+        level = rng.uniform(-5, 40)
+        last_year = 2024
+        values = []
+        for y in range(last_year - self.years + 1, last_year + 1):
+            level *= 1 + rng.gauss(0, 0.1)
+            values.append({"y": y, "p": 5, "v": round(level, 3)})
+        return values
+
+    # ---- Construction and persistence ----
+    @classmethod
+    def synthetic(cls, n_instruments: int = 500, seed: int = 0) -> FixtureSet:
+        """Generates Börsdata-shaped instruments, sectors and branches"""
+        rng = random.Random(seed)
+        sectors = [{"id": i, "name": name} for i, name in enumerate(SECTORS, 1)]
+        branches = [
+            {
+                "id": len(SECTORS) * k + s["id"],
+                "name": f"{s['name']} {suffix}",
+                "sectorId": s["id"],
+            }
+            for k, suffix in enumerate(BRANCH_SUFFIXES)
+            for s in sectors
+        ]
+
+        instruments = []
+        seen: set[str] = set()
+        for insId in range(1, n_instruments + 1):
+            base = rng.choice(NAME_HEADS) + rng.choice(NAME_TAILS)
+            name = base + rng.choice(SHARE_CLASSES)
+            if name in seen:
+                name = f"{base} {insId}"
+            seen.add(name)
+            ticker = f"{base[:4].upper()}{insId}"
+            branch = rng.choice(branches)
+            instruments.append(
+                {
+                    "insId": insId,
+                    "name": name,
+                    "urlName": name.lower().replace(" ", "-"),
+                    "instrument": 0,
+                    "isin": f"SE{insId:010d}",
+                    "ticker": ticker,
+                    "yahoo": f"{ticker}.ST",
+                    "sectorId": branch["sectorId"],
+                    "marketId": rng.choice([1, 2, 3]),
+                    "branchId": branch["id"],
+                    "countryId": rng.choice([1, 2, 3, 4]),
+                    "listingDate": "2000-01-01T00:00:00",
+                    "stockPriceCurrency": "SEK",
+                    "reportCurrency": "SEK",
+                }
+            )
+
+        return cls(instruments, sectors, branches, seed=seed)
+
+    def save(self, path: Path | str) -> None:
+        """Writes the fixtures to one JSON file"""
+        data = {
+            "instruments": self.instruments,
+            "sectors": self.sectors,
+            "branches": self.branches,
+            "summaries": {str(k): v for k, v in self.summaries.items()},
+            "histories": {
+                str(kpi): {str(ins): vals for ins, vals in per_ins.items()}
+                for kpi, per_ins in self.histories.items()
+            },
+            "seed": self.seed,
+            "years": self.years,
+        }
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path: Path | str) -> FixtureSet:
+        """Reads fixtures written by save() or record_fixtures()"""
+        with Path(path).open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            data["instruments"],
+            data["sectors"],
+            data["branches"],
+            summaries={int(k): v for k, v in data.get("summaries", {}).items()},
+            histories={
+                int(kpi): {int(ins): vals for ins, vals in per_ins.items()}
+                for kpi, per_ins in data.get("histories", {}).items()
+            },
+            seed=data.get("seed"),
+            years=data.get("years", 10),
+        )
+
+
+def record_fixtures(
+    path: Path | str,
+    ins_ids: list[int] | None = None,
+    kpi_ids: list[int] | None = None,
+) -> FixtureSet:
+    """Records real Börsdata responses into a fixture file for replay.
+    ins_ids limits KPI summaries/history to those instruments (default: none),
+    kpi_ids selects the KPI histories to record."""
+    from bd_agent.bd import BorsdataClient
+
+    client = BorsdataClient(use_store=False)
+    instruments = client.get("/instruments")["instruments"]
+    ins_ids = list(ins_ids or [])
+
+    summaries = {i: client.get_instrument_kpi(insId=i) for i in ins_ids}
+    histories = {}
+    for kpi_id in kpi_ids or []:
+        items = client.get_kpi_history(kpi_id, ins_ids)
+        histories[kpi_id] = {item["instrument"]: item["values"] for item in items}
+
+    fixtures = FixtureSet(
+        instruments,
+        client.get_sectors(),
+        client.get_branches(),
+        summaries=summaries,
+        histories=histories,
+    )
+    fixtures.save(path)
+    return fixtures
+
+
+# ---- Server ----
+ROUTES = [
+    ("instruments", re.compile(r"^/v1/instruments$", re.I)),
+    ("sectors", re.compile(r"^/v1/sectors$", re.I)),
+    ("branches", re.compile(r"^/v1/branches$", re.I)),
+    ("summary", re.compile(r"^/v1/instruments/(\d+)/kpis/(\w+)/summary$", re.I)),
+    (
+        "history",
+        re.compile(r"^/v1/instruments/kpis/(\d+)/(\w+)/(\w+)/history$", re.I),
+    ),
+]
+
+
+class BorsdataStandIn(JsonStandIn):
+    """Local HTTP server mimicking the Börsdata v1 endpoints used by bd_agent.
+
+    latency: seconds added to every response
+    rate_limit: (calls, period) quota answered with HTTP 429, None disables it
+    Request counts per endpoint are kept in `stats`.
+    """
+
+    def __init__(
+        self,
+        fixtures: FixtureSet,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        rate_limit: tuple[int, float] | None = (
+            RATE_LIMIT_CALLS,
+            RATE_LIMIT_PERIOD,
+        ),
+    ) -> None:
+        super().__init__(host, port)
+        self.fixtures = fixtures
+        self.latency = latency
+        self.limiter = TokenBucket(*rate_limit) if rate_limit else None
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.address}/v1"
+
+    def handle(
+        self, method: str, path: str, query: dict[str, list[str]], body: dict | None
+    ) -> tuple[int, dict]:
+        """Returns (status, JSON body) for one request"""
+        if method != "GET":
+            return 405, {"message": "Only GET is supported"}
+        if not query.get("authKey", [""])[0]:
+            return 401, {"message": "authKey missing"}
+        if self.limiter is not None and not self.limiter.try_acquire():
+            self._count("throttled")
+            return 429, {"message": "Too many requests"}
+        if self.latency:
+            time.sleep(self.latency)
+
+        for name, pattern in ROUTES:
+            match = pattern.match(path)
+            if match:
+                self._count(name)
+                return getattr(self, f"_{name}")(*match.groups(), query=query)
+
+        self._count("not_found")
+        return 404, {"message": f"Unknown endpoint {path}"}
+
+    def _instruments(self, query) -> tuple[int, dict]:
+        return 200, {"instruments": self.fixtures.instruments}
+
+    def _sectors(self, query) -> tuple[int, dict]:
+        return 200, {"sectors": self.fixtures.sectors}
+
+    def _branches(self, query) -> tuple[int, dict]:
+        return 200, {"branches": self.fixtures.branches}
+
+    def _summary(self, insId, reportType, query) -> tuple[int, dict]:
+        summary = self.fixtures.summary(int(insId))
+        if summary is None:
+            return 404, {"message": f"No KPI summary for instrument {insId}"}
+        return 200, summary
+
+    def _history(self, kpiId, reportType, priceType, query) -> tuple[int, dict]:
+        raw = query.get("instList", [""])[0]
+        ins_ids = [int(i) for i in raw.split(",") if i.strip()]
+        if len(ins_ids) > HISTORY_BATCH_SIZE:
+            return 400, {"message": f"instList max {HISTORY_BATCH_SIZE} instruments"}
+
+        kpis_list = []
+        for insId in ins_ids:
+            values = self.fixtures.history(int(kpiId), insId)
+            if values is not None:
+                kpis_list.append({"instrument": insId, "values": values})
+        return 200, {
+            "kpiId": int(kpiId),
+            "reportTime": reportType,
+            "priceValue": priceType,
+            "kpisList": kpis_list,
+        }
+
+
+def main() -> None:
+    """Runs the stand-in server in the foreground"""
+    parser = argparse.ArgumentParser(description="Local Börsdata v1 stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--fixtures", type=Path, help="fixture file to replay")
+    parser.add_argument(
+        "--synthetic", type=int, default=500, help="synthetic universe size"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds/request")
+    parser.add_argument(
+        "--no-rate-limit", action="store_true", help="disable the 100/10s quota"
+    )
+    args = parser.parse_args()
+
+    fixtures = (
+        FixtureSet.load(args.fixtures)
+        if args.fixtures
+        else FixtureSet.synthetic(args.synthetic, seed=args.seed)
+    )
+    server = BorsdataStandIn(
+        fixtures,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        rate_limit=(
+            None if args.no_rate_limit else (RATE_LIMIT_CALLS, RATE_LIMIT_PERIOD)
+        ),
+    )
+    print(f"Serving {len(fixtures.instruments)} instruments on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
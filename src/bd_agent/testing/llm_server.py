@@ -0,0 +1,260 @@
+"""Local stand-in for the OpenAI Responses and Chat Completions APIs.
+
+Answers are rule based (see _responders) so runs are deterministic and free.
+Point the OpenAI SDK and pydantic_ai at it with OPENAI_BASE_URL:
+
+    python -m bd_agent.testing.llm_server --latency 0.3
+    OPENAI_BASE_URL=http://127.0.0.1:8766/v1 OPENAI_API_KEY=x python -m bd_agent cli
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import re
+import time
+from typing import Iterator
+
+from bd_agent.testing import _responders
+from bd_agent.testing._server import EventStream, JsonStandIn
+
+
+class OpenAIStandIn(JsonStandIn):
+    """Local HTTP server answering /v1/responses and /v1/chat/completions.
+
+    latency: seconds added to every response (before the first token)
+    token_delay: seconds per generated word, between deltas when streaming
+    Request counts per endpoint plus estimated input/output tokens are kept
+    in `stats`. With listen=False it only answers in-process, through
+    transport() (BD_AGENT_LLM_MODE=stub).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        token_delay: float = 0.0,
+        listen: bool = True,
+    ) -> None:
+        super().__init__(host, port, listen=listen)
+        self.latency = latency
+        self.token_delay = token_delay
+        self._ids = itertools.count(1)
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.address}/v1"
+
+    def handle(
+        self, method: str, path: str, query: dict[str, list[str]], body: dict | None
+    ) -> tuple[int, dict | EventStream]:
+        """Returns (status, JSON body or event stream) for one request"""
+        if method != "POST" or body is None:
+            return 405, {"error": {"message": "Only JSON POST is supported"}}
+        if self.latency:
+            time.sleep(self.latency)
+
+        if path.rstrip("/").endswith("/responses"):
+            self._count("responses")
+            response = self._responses(body)
+            if body.get("stream"):
+                return 200, EventStream(self._response_events(response))
+            self._generate(response["output"][0]["content"][0]["text"])
+            return 200, response
+        if path.rstrip("/").endswith("/chat/completions"):
+            self._count("chat.completions")
+            return 200, self._chat_completions(body)
+
+        self._count("not_found")
+        return 404, {"error": {"message": f"Unknown endpoint {path}"}}
+
+    def _usage(self, prompt: str, answer: str) -> tuple[int, int]:
+        tokens_in = _responders.estimate_tokens(prompt)
+        tokens_out = _responders.estimate_tokens(answer)
+        self._count("input_tokens", tokens_in)
+        self._count("output_tokens", tokens_out)
+        return tokens_in, tokens_out
+
+    # ---- Responses API ----
+    def _responses(self, body: dict) -> dict:
+        system, user = _split_messages(body.get("input", []), body.get("instructions"))
+        fmt = (body.get("text") or {}).get("format") or {}
+        if fmt.get("type") == "json_schema":
+            answer = json.dumps(
+                _responders.structured_answer(system, user, fmt.get("schema", {}))
+            )
+        else:
+            answer = _responders.text_answer(system, user)
+
+        tokens_in, tokens_out = self._usage(system + user, answer)
+        n = next(self._ids)
+        return {
+            "id": f"resp_{n}",
+            "object": "response",
+            "created_at": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "status": "completed",
+            "output": [
+                {
+                    "type": "message",
+                    "id": f"msg_{n}",
+                    "role": "assistant",
+                    "status": "completed",
+                    "content": [
+                        {"type": "output_text", "text": answer, "annotations": []}
+                    ],
+                }
+            ],
+            "parallel_tool_calls": False,
+            "tool_choice": "auto",
+            "tools": [],
+            "usage": {
+                "input_tokens": tokens_in,
+                "input_tokens_details": {"cached_tokens": 0},
+                "output_tokens": tokens_out,
+                "output_tokens_details": {"reasoning_tokens": 0},
+                "total_tokens": tokens_in + tokens_out,
+            },
+        }
+
+    def _generate(self, text: str) -> None:
+        """Waits as long as streaming `text` would take"""
+        if self.token_delay:
+            time.sleep(self.token_delay * max(0, len(_words(text)) - 1))
+
+    def _response_events(self, response: dict) -> Iterator[dict]:
+        """Responses API stream: created, one delta per word, completed"""
+        message = response["output"][0]
+        text = message["content"][0]["text"]
+        seq = itertools.count()
+        yield {
+            "type": "response.created",
+            "sequence_number": next(seq),
+            "response": {**response, "status": "in_progress", "output": []},
+        }
+        for i, word in enumerate(_words(text)):
+            if i and self.token_delay:
+                time.sleep(self.token_delay)
+            yield {
+                "type": "response.output_text.delta",
+                "sequence_number": next(seq),
+                "item_id": message["id"],
+                "output_index": 0,
+                "content_index": 0,
+                "delta": word,
+                "logprobs": [],
+            }
+        yield {
+            "type": "response.completed",
+            "sequence_number": next(seq),
+            "response": response,
+        }
+
+    # ---- Chat Completions API ----
+    def _chat_completions(self, body: dict) -> dict:
+        system, user = _split_messages(body.get("messages", []))
+        n = next(self._ids)
+        message: dict = {"role": "assistant", "content": None}
+
+        # pydantic_ai returns structured output through a "final_result" tool
+        output_tool = next(
+            (
+                t["function"]
+                for t in body.get("tools", [])
+                if t.get("function", {}).get("name", "").startswith("final_result")
+            ),
+            None,
+        )
+        if output_tool is not None:
+            args = _responders.structured_answer(
+                system, user, output_tool.get("parameters", {})
+            )
+            answer = json.dumps(args)
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{n}",
+                    "type": "function",
+                    "function": {"name": output_tool["name"], "arguments": answer},
+                }
+            ]
+            finish_reason = "tool_calls"
+        else:
+            answer = _responders.text_answer(system, user)
+            message["content"] = answer
+            finish_reason = "stop"
+
+        tokens_in, tokens_out = self._usage(system + user, answer)
+        return {
+            "id": f"chatcmpl-{n}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stand-in"),
+            "choices": [
+                {"index": 0, "message": message, "finish_reason": finish_reason}
+            ],
+            "usage": {
+                "prompt_tokens": tokens_in,
+                "completion_tokens": tokens_out,
+                "total_tokens": tokens_in + tokens_out,
+            },
+        }
+
+
+def _words(text: str) -> list[str]:
+    """Text split into streamed deltas, one word with its trailing space each"""
+    return re.findall(r"\S+\s*", text)
+
+
+def _split_messages(
+    messages: list[dict] | str, instructions: str | None = None
+) -> tuple[str, str]:
+    """Returns (system text, last user text) from OpenAI-style messages"""
+    if isinstance(messages, str):
+        return instructions or "", messages
+
+    system = [instructions] if instructions else []
+    user = ""
+    for m in messages:
+        text = _content_text(m.get("content"))
+        if m.get("role") in ("system", "developer"):
+            system.append(text)
+        elif m.get("role") == "user":
+            user = text
+    return "\n".join(system), user
+
+
+def _content_text(content) -> str:
+    """Flattens str or [{"type": "...text", "text": ...}] message content"""
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content or [])
+
+
+def main() -> None:
+    """Runs the stand-in server in the foreground"""
+    parser = argparse.ArgumentParser(description="Local OpenAI API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds/request")
+    parser.add_argument(
+        "--token-delay", type=float, default=0.0, help="seconds/streamed delta"
+    )
+    args = parser.parse_args()
+
+    server = OpenAIStandIn(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        token_delay=args.token_delay,
+    )
+    print(f"Serving OpenAI stand-in on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
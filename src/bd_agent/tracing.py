@@ -0,0 +1,283 @@
+"""Lightweight tracing: nested timing spans for the router, agents and clients.
+
+Spans are recorded only while a sink is active, otherwise span() returns a
+shared no-op. Finished spans are plain dicts with OpenTelemetry field names
+(trace_id, span_id, parent_span_id, start/end_time_unix_nano, attributes,
+status) and are written one per line to a JSONL file:
+
+    BD_AGENT_TRACE=traces.jsonl python -m bd_agent cli
+
+or collected in memory with `with tracing.capture() as spans: ...`.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from bd_agent.settings import get_trace_path
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_current: ContextVar[Span | None] = ContextVar("bd_agent_span", default=None)
+_sinks: list[Callable[[dict], None]] = []
+_sinks_lock = threading.Lock()
+
+
+# ---- Spans ----
+class Span:
+    """One timed unit of work. Attributes are set with set()."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_ns",
+        "end_ns",
+        "error",
+        "_t0",
+    )
+
+    def __init__(self, name: str, parent: Span | None, attributes: dict) -> None:
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.error: str | None = None
+        self._t0 = time.perf_counter()
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def set_usage(self, usage: Any) -> None:
+        """Records token usage from an OpenAI or pydantic_ai usage object"""
+        for attr, value in usage_counts(usage).items():
+            self.attributes[attr] = self.attributes.get(attr, 0) + value
+
+    @property
+    def duration_s(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round((self.end_ns - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": (
+                {"code": "ERROR", "message": self.error}
+                if self.error
+                else {"code": "OK"}
+            ),
+        }
+
+
+def usage_counts(usage: Any) -> dict[str, int]:
+    """{"llm.input_tokens": n, "llm.output_tokens": m} from an OpenAI
+    (Responses or Chat Completions) or pydantic_ai usage object"""
+    if usage is None:
+        return {}
+    if callable(usage):  # pydantic_ai: result.usage()
+        usage = usage()
+    counts = {}
+    for attr, names in (
+        ("llm.input_tokens", ("input_tokens", "prompt_tokens", "request_tokens")),
+        (
+            "llm.output_tokens",
+            ("output_tokens", "completion_tokens", "response_tokens"),
+        ),
+    ):
+        for name in names:
+            value = getattr(usage, name, None)
+            if value is not None:
+                counts[attr] = value
+                break
+    return counts
+
+
+class _NoopSpan:
+    """Returned while tracing is disabled, ignores everything"""
+
+    __slots__ = ()
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+    def set_usage(self, usage: Any) -> None:
+        pass
+
+    def __enter__(self) -> _NoopSpan:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _SpanContext:
+    """Starts the span on __enter__, as a child of the span current then, so
+    a context created in one place and entered in another nests correctly"""
+
+    __slots__ = ("_name", "_attributes", "_span", "_token")
+
+    def __init__(self, name: str, attributes: dict) -> None:
+        self._name = name
+        self._attributes = attributes
+        self._span: Span | None = None
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._span = Span(self._name, _current.get(), self._attributes)
+        self._token = _current.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        span = self._span
+        span.end_ns = span.start_ns + int((time.perf_counter() - span._t0) * 1e9)
+        if exc is not None:
+            span.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        _emit(span.to_dict())
+
+
+def span(name: str, **attributes: Any) -> _SpanContext | _NoopSpan:
+    """Context manager timing the enclosed block as a child of the current span:
+
+    with tracing.span("borsdata.get", path=path) as s:
+        ...
+        s.set(http_status=200)
+    """
+    if not _sinks:
+        return NOOP_SPAN
+    return _SpanContext(name, attributes)
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    """Decorator running the function (sync or async) inside a span"""
+
+    def decorate(fn: F) -> F:
+        span_name = name or f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+        if inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name):
+                    return await fn(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def current_span() -> Span | _NoopSpan:
+    """The innermost active span, or the no-op span"""
+    return _current.get() or NOOP_SPAN
+
+
+@contextmanager
+def use_span(parent: Span | _NoopSpan) -> Iterator[None]:
+    """Makes `parent` (from current_span()) the current span in the block, for
+    work that runs later elsewhere, e.g. a generator consumed by the caller"""
+    if not isinstance(parent, Span):
+        yield
+        return
+    token = _current.set(parent)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+# ---- Sinks ----
+def _emit(record: dict) -> None:
+    for sink in list(_sinks):
+        sink(record)
+
+
+def add_sink(sink: Callable[[dict], None]) -> None:
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def remove_sink(sink: Callable[[dict], None]) -> None:
+    with _sinks_lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+class JsonlExporter:
+    """Appends finished spans as JSON lines to `path`"""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict) -> None:
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock, self.path.open("a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def enable(path: Path | str) -> JsonlExporter:
+    """Starts writing spans to a JSONL file, returns the exporter"""
+    exporter = JsonlExporter(path)
+    add_sink(exporter)
+    return exporter
+
+
+@contextmanager
+def capture() -> Iterator[list[dict]]:
+    """Collects the spans finished inside the block into a list"""
+    spans: list[dict] = []
+    add_sink(spans.append)
+    try:
+        yield spans
+    finally:
+        remove_sink(spans.append)
+
+
+def summarize(spans: list[dict]) -> dict[str, dict]:
+    """Total duration, count and token usage per span name"""
+    out: dict[str, dict] = {}
+    for s in spans:
+        row = out.setdefault(s["name"], {"count": 0, "total_ms": 0.0})
+        row["count"] += 1
+        row["total_ms"] = round(row["total_ms"] + s["duration_ms"], 3)
+        for key in ("llm.input_tokens", "llm.output_tokens", "http.bytes"):
+            if key in s["attributes"]:
+                row[key] = row.get(key, 0) + s["attributes"][key]
+    return out
+
+
+_trace_path = get_trace_path()
+if _trace_path is not None:
+    enable(_trace_path)
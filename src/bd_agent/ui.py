@@ -2,7 +2,7 @@
 
 import sys, json
 from pathlib import Path
-from typing import Any, Iterable, List
+from typing import Any, Iterable, Iterator, List
 
 # Add parent directory to sys before any bd_agent imports
 project_root = Path(__file__).parent.parent
@@ -15,7 +15,7 @@ from matplotlib.figure import Figure
 from matplotlib.axes import Axes
 
 from bd_agent.router import run_agent
-from bd_agent.intents import intent_classifier
+from bd_agent.intents import parse_prompt
 
 
 # Page setup
@@ -52,12 +52,14 @@ history_slot = st.expander("History", expanded=False)
 # update the intent when writing and exit the input window
 if prompt and prompt.strip():
     try:
-        intent_res = intent_classifier(prompt)
+        intent_res = parse_prompt(prompt)  # cached, the router reuses it
         with intent_slot:
-            st.info(f"""
+            st.info(
+                f"""
                     **Detected intent:** {intent_res.intent}     
                     **Confidence:** {intent_res.confidence}
-                    """)
+                    """
+            )
     except Exception as e:
         with intent_slot:
             st.error(f"Could not classify intent: {e}.")
@@ -98,6 +100,72 @@ with eval_container:
         st.markdown("### Accuracy")
         st.write(f"{report['overall']['accuracy']:.2%} accuracy")
 
+        # reports written before the full metrics suite only have the above
+        overall = report["overall"]
+        intervals = overall.get("confidence_intervals", {})
+        scores = [
+            name
+            for name in (
+                "macro_f1",
+                "weighted_f1",
+                "macro_precision",
+                "macro_recall",
+                "weighted_precision",
+                "weighted_recall",
+            )
+            if name in overall
+        ]
+        if scores:
+            st.markdown("### Overall metrics")
+            st.dataframe(
+                pd.DataFrame(
+                    {
+                        "value": [overall[n] for n in ["accuracy", *scores]],
+                        "95% CI": [
+                            " – ".join(f"{v:.3f}" for v in intervals.get(n, []))
+                            for n in ["accuracy", *scores]
+                        ],
+                    },
+                    index=["accuracy", *scores],
+                ),
+                use_container_width=True,
+            )
+        if "per_intent" in report:
+            st.markdown("### Per intent")
+            st.dataframe(pd.DataFrame(report["per_intent"]).T, use_container_width=True)
+        perf = report.get("performance")
+        if perf:
+            st.markdown("### Latency and cost")
+            latency = perf["latency_s"]
+            cost = perf["cost_usd"]
+            cols = st.columns(5)
+            for col, q in zip(cols, ("p50", "p95", "p99")):
+                value = latency.get(q)
+                shown = f"{value * 1000:.1f} ms" if value is not None else "–"
+                col.metric(f"Latency {q}", shown)
+            rows_per_s = perf.get("rows_per_s")
+            cols[3].metric(
+                "Throughput",
+                f"{rows_per_s:.1f} rows/s" if rows_per_s is not None else "–",
+                help=f"{report['meta'].get('max_workers', 1)} workers; one at a time: "
+                f"{perf.get('sequential_rows_per_s') or '–'} rows/s",
+            )
+            cols[4].metric(
+                "Total cost",
+                f"${cost['total']:.4f}" if cost.get("total") is not None else "–",
+                help=f"{cost['model']} list prices, {perf['tokens']['input']} input / "
+                f"{perf['tokens']['output']} output tokens",
+            )
+
+        curve = overall.get("coverage_accuracy")
+        if curve and curve["coverage"]:
+            st.markdown("### Coverage vs accuracy")
+            st.line_chart(
+                pd.DataFrame(
+                    {"accuracy": curve["accuracy"]}, index=curve["coverage"]
+                ).rename_axis("coverage")
+            )
+
 
 # --- Render helpers ---
 def _is_matplotlib_figure(obj: Any) -> bool:
@@ -154,12 +222,20 @@ if run_btn:
     else:
         with st.spinner("Running agent"):
             try:
-                result = run_agent(prompt)
+                result = run_agent(prompt, stream=True)
             except Exception as e:
                 result = None
                 result_slot.error(f"Agent error: {e}.")
 
-        if result is not None:
+        if isinstance(result, Iterator):
+            # streamed text answer, rendered token by token
+            try:
+                with result_slot:
+                    result = st.write_stream(result)
+            except Exception as e:
+                result = None
+                result_slot.error(f"Agent error: {e}.")
+        elif result is not None:
             with result_slot:
                 _render_result(result)
 
@@ -0,0 +1,4 @@
+import os
+
+# bd_agent checks for OPENAI_API_KEY on import unless the LLM runs offline
+os.environ.setdefault("BD_AGENT_LLM_MODE", "stub")
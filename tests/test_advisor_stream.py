@@ -0,0 +1,30 @@
+from bd_agent import llm, tracing
+from bd_agent.agents.advisor_agent import general_investment_advice as advisor
+
+
+def _free_slots(limiter) -> int:
+    free = 0
+    while limiter._slots.acquire(blocking=False):
+        free += 1
+    for _ in range(free):
+        limiter.release()
+    return free
+
+
+def test_streamed_call_is_child_of_agent_span():
+    with tracing.capture() as spans:
+        text = "".join(advisor.run("How should I invest?", stream=True))
+    assert text
+    by_name = {s["name"]: s for s in spans}
+    agent, call = by_name["agent.advise"], by_name["llm.advisor"]
+    assert call["parent_span_id"] == agent["span_id"]
+    assert call["trace_id"] == agent["trace_id"]
+    assert call["attributes"]["llm.stream"] is True
+
+
+def test_abandoned_stream_is_closed():
+    limiter = llm.limiter()
+    deltas = advisor.run("How should I invest?", stream=True)
+    next(deltas)
+    deltas.close()
+    assert _free_slots(limiter) == limiter.max_concurrency
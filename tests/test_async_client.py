@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import pytest
+
+from bd_agent.bd._async_client import AsyncBorsdataClient
+from bd_agent.bd._client import _universes
+from bd_agent.bd._store import BorsdataStore
+from bd_agent.bd.metadata import MetadataRegistry
+from bd_agent.testing import BorsdataStandIn, FixtureSet
+
+
+UNREACHABLE = "http://127.0.0.1:9/v1"
+
+
+@pytest.fixture(scope="module")
+def server():
+    fixtures = FixtureSet.synthetic(60)
+    with BorsdataStandIn(fixtures, latency=0.05, rate_limit=None) as standin:
+        yield standin
+
+
+@pytest.fixture(autouse=True)
+def cold(server):
+    _universes.pop(server.base_url, None)
+    server.reset_stats()
+
+
+def _run(coro_fn, **kwargs):
+    async def main():
+        async with AsyncBorsdataClient(api_key="test", **kwargs) as client:
+            return await coro_fn(client)
+
+    return asyncio.run(main())
+
+
+def test_universe_downloaded_once_across_threads_and_loops(server):
+    async def many(client):
+        return await asyncio.gather(*(client.get_universe() for _ in range(5)))
+
+    found = []
+
+    def worker():
+        found.extend(_run(many, base_url=server.base_url, use_store=False))
+
+    threads = [threading.Thread(target=worker) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(found) == 15
+    assert len({id(u) for u in found}) == 1
+    assert server.snapshot().get("instruments") == 1
+
+
+def test_history_served_stale_from_mirror(server, tmp_path):
+    store = BorsdataStore(tmp_path / "mirror.sqlite")
+    ins_ids = [ins["insId"] for ins in server.fixtures.instruments[:10]]
+
+    def history(client):
+        return client.get_kpi_history(2, ins_ids)
+
+    fresh = _run(history, base_url=server.base_url, store=store)
+    assert fresh
+    stale = _run(
+        history, base_url=UNREACHABLE, store=store, mirror_max_age=0, max_retries=0
+    )
+    assert sorted(stale, key=lambda i: i["instrument"]) == sorted(
+        fresh, key=lambda i: i["instrument"]
+    )
+
+
+def test_sectors_served_stale_from_mirror(server, tmp_path):
+    store = BorsdataStore(tmp_path / "mirror.sqlite")
+
+    def sectors(client):
+        return client.get_sectors()
+
+    fresh = _run(sectors, base_url=server.base_url, store=store)
+    stale = _run(
+        sectors, base_url=UNREACHABLE, store=store, mirror_max_age=0, max_retries=0
+    )
+    assert stale == fresh
+
+
+def test_metadata_registry_loads_sectors_and_industries_together(server, monkeypatch):
+    monkeypatch.setenv("BORSDATA_BASE_URL", server.base_url)
+    monkeypatch.setenv("BORSDATA_API_KEY", "test")
+    registry = MetadataRegistry()
+
+    sectors = registry.sectors
+    industries = registry.industries
+
+    assert sectors and industries
+    stats = server.snapshot()
+    assert stats.get("sectors") == 1 and stats.get("branches") == 1
@@ -0,0 +1,44 @@
+from bd_agent import cache
+from bd_agent.cache import DiskCache, MemoCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_memory_entries_expire(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    memo = MemoCache(ttl=60)
+    memo.set("k", {"v": 1})
+    clock.now += 59
+    assert memo.get("k") == {"v": 1}
+    clock.now += 2
+    assert memo.get("k") is None
+    assert memo.stats == {"memory_hits": 1, "disk_hits": 0, "misses": 1}
+
+
+def test_disk_hit_keeps_its_age(monkeypatch, tmp_path):
+    clock = _Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    disk = DiskCache(tmp_path / "c.sqlite", "ns", ttl=60)
+    disk.set("k", 1)
+    clock.now += 50
+    memo = MemoCache(disk=disk, ttl=60)
+    assert memo.get("k") == 1  # promoted from disk, 50 s old
+    clock.now += 20
+    assert memo.get("k") is None
+    assert memo.stats["disk_hits"] == 1
+
+
+def test_no_ttl_keeps_entries(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    memo = MemoCache()
+    memo.set("k", 1)
+    clock.now += 10**9
+    assert memo.get("k") == 1
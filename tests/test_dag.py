@@ -0,0 +1,45 @@
+import threading
+import time
+
+import pytest
+
+from bd_agent.agents._dag import DagError, Stage, run_dag
+
+
+def test_results_flow_to_dependents():
+    stages = [
+        Stage("a", lambda x: x + 1, ("x",)),
+        Stage("b", lambda a: a * 2, ("a",)),
+        Stage("c", lambda a, b: a + b, ("a", "b")),
+    ]
+    assert run_dag(stages, {"x": 1}) == {"x": 1, "a": 2, "b": 4, "c": 6}
+
+
+def test_cycle_is_rejected():
+    with pytest.raises(DagError):
+        run_dag([Stage("a", lambda b: b, ("b",)), Stage("b", lambda a: a, ("a",))])
+
+
+def test_failure_does_not_wait_for_running_stages():
+    release = threading.Event()
+    started = []
+
+    def slow():
+        release.wait(5)
+
+    def fail():
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    stages = [
+        Stage("slow", slow),
+        Stage("fail", fail),
+        Stage("after", lambda fail: started.append("after"), ("fail",)),
+    ]
+    start = time.perf_counter()
+    with pytest.raises(ValueError):
+        run_dag(stages)
+    elapsed = time.perf_counter() - start
+    release.set()
+    assert elapsed < 1
+    assert started == []
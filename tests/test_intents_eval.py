@@ -0,0 +1,47 @@
+import json
+import time
+from dataclasses import asdict
+
+from bd_agent.eval.runners import intents_eval
+from bd_agent.intents.classifier import IntentClassification
+
+
+def _rows(n: int) -> list[dict]:
+    return [{"input": f"prompt {i}", "expected": "none"} for i in range(n)]
+
+
+def _slow_first(rows, classifier, bucket=None, stats=None):
+    """Earlier rows take longer, so they finish last"""
+
+    def predict(i, prompt):
+        time.sleep(0.01 * (len(rows) - i))
+        out = IntentClassification(intent="none", confidence=1.0, reasoning="")
+        return out, {"latency_s": 0.0}
+
+    return predict
+
+
+def test_predictions_keep_reference_order(monkeypatch):
+    monkeypatch.setattr(intents_eval, "_predictor", _slow_first)
+    rows = _rows(10)
+    scored = intents_eval._iter_predictions(rows, "local", 4, skip={3, 7})
+    order = [i for i, _ in scored]
+    assert order == [0, 1, 2, 4, 5, 6, 8, 9]
+
+
+def test_resumed_predictions_are_read_in_reference_order(tmp_path):
+    path = tmp_path / intents_eval.PREDICTIONS_FILE
+    # rows 0 and 2 scored before the interruption, 1 and 3 on resume
+    with path.open("w", encoding="utf-8") as f:
+        for i in (0, 2, 1, 3):
+            row = intents_eval.IntentEvalRow(
+                input=f"prompt {i}",
+                expected="none",
+                predicted="none",
+                confidence=1.0,
+                meta={},
+                latency_s=0.0,
+            )
+            f.write(json.dumps({"index": i, **asdict(row)}) + "\n")
+    inputs = [r.input for r in intents_eval._read_predictions(path)]
+    assert inputs == ["prompt 0", "prompt 1", "prompt 2", "prompt 3"]
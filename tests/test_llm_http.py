@@ -0,0 +1,93 @@
+import asyncio
+
+import httpx
+import pytest
+
+from bd_agent._llm_http import AsyncLimitedTransport, LimitedTransport, LLMLimiter
+
+
+SLOTS = 2
+
+
+def _free_slots(limiter: LLMLimiter) -> int:
+    free = 0
+    while limiter._slots.acquire(blocking=False):
+        free += 1
+    for _ in range(free):
+        limiter.release()
+    return free
+
+
+def _request() -> httpx.Request:
+    return httpx.Request("POST", "http://llm.test/v1/chat/completions", json={})
+
+
+class _Failing(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    def handle_request(self, request):
+        raise RuntimeError("boom")
+
+    async def handle_async_request(self, request):
+        raise RuntimeError("boom")
+
+
+class _Hanging(httpx.AsyncBaseTransport):
+    def __init__(self) -> None:
+        self.entered = asyncio.Event()
+
+    async def handle_async_request(self, request):
+        self.entered.set()
+        await asyncio.Event().wait()
+
+
+def test_sync_inner_error_frees_slot():
+    limiter = LLMLimiter(SLOTS, None, None)
+    transport = LimitedTransport(limiter, inner=_Failing())
+    for _ in range(SLOTS):
+        with pytest.raises(RuntimeError):
+            transport.handle_request(_request())
+    assert _free_slots(limiter) == SLOTS
+
+
+def test_async_inner_error_frees_slot():
+    limiter = LLMLimiter(SLOTS, None, None)
+    transport = AsyncLimitedTransport(limiter, inner=_Failing())
+
+    async def main():
+        for _ in range(SLOTS):
+            with pytest.raises(RuntimeError):
+                await transport.handle_async_request(_request())
+
+    asyncio.run(main())
+    assert _free_slots(limiter) == SLOTS
+
+
+def test_cancelled_request_frees_slot():
+    limiter = LLMLimiter(SLOTS, None, None)
+    inner = _Hanging()
+    transport = AsyncLimitedTransport(limiter, inner=inner)
+
+    async def main():
+        task = asyncio.create_task(transport.handle_async_request(_request()))
+        await inner.entered.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert _free_slots(limiter) == SLOTS
+
+
+def test_cancelled_while_throttled_frees_slot():
+    limiter = LLMLimiter(SLOTS, rpm=1, tpm=None)
+    limiter.requests.reserve()  # the next request waits a minute
+
+    async def main():
+        task = asyncio.create_task(limiter.acquire_async(1))
+        await asyncio.sleep(0.05)
+        assert _free_slots(limiter) == SLOTS - 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert _free_slots(limiter) == SLOTS
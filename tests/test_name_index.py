@@ -0,0 +1,49 @@
+import pytest
+
+from bd_agent.agents._name_interpretation_agent._index import NameIndex
+from bd_agent.bd._universe import InstrumentUniverse
+
+
+def _ins(ins_id, name, ticker, isin):
+    return {"insId": ins_id, "name": name, "ticker": ticker, "isin": isin}
+
+
+@pytest.fixture
+def index():
+    return NameIndex(
+        InstrumentUniverse(
+            [
+                _ins(1, "Volvo", "VOLV B", "SE0000115446"),
+                _ins(2, "SSAB", "SSAB B", "SE0000120669"),
+                _ins(3, "I", "I", "US0000000001"),
+                _ins(4, "Roic Holding", "ROIC", "SE0000000002"),
+                _ins(5, "Should", "SHLD", "SE0000000003"),
+                _ins(6, "Swedbank", "SWED A", "SE0000242455"),
+            ]
+        )
+    )
+
+
+def _found(index, prompt):
+    ins = index.find_in_prompt(prompt)
+    return ins and ins["insId"]
+
+
+def test_pronoun_is_not_a_company(index):
+    assert _found(index, "Should I buy Volvo?") == 1
+
+
+def test_finance_term_is_not_a_ticker(index):
+    assert _found(index, "What is the ROIC of SSAB?") == 2
+
+
+def test_sentence_initial_word_is_not_a_name(index):
+    assert _found(index, "Should we worry?") is None
+    assert _found(index, "Buy it. Should we?") is None
+
+
+def test_tickers_and_isins(index):
+    assert _found(index, "Analyze VOLV B") == 1
+    assert _found(index, "SHLD looks cheap") == 5
+    assert _found(index, "Info on SE0000242455 please") == 6
+    assert _found(index, "is swedbank cheap") is None
@@ -0,0 +1,37 @@
+from bd_agent.bd import _client, _ratelimit
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _calls_in_first_period(monkeypatch, bucket_factory, attempts: int) -> int:
+    clock = FakeClock()
+    monkeypatch.setattr(_ratelimit.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(_ratelimit.time, "sleep", clock.sleep)
+    bucket = bucket_factory()
+    sent = 0
+    for _ in range(attempts):
+        bucket.acquire()
+        if clock.now < _client.RATE_LIMIT_PERIOD:
+            sent += 1
+    return sent
+
+
+def test_borsdata_limiter_stays_within_quota(monkeypatch):
+    sent = _calls_in_first_period(monkeypatch, _client._quota_limiter, 300)
+    assert _client.RATE_LIMIT_CALLS - 1 <= sent <= _client.RATE_LIMIT_CALLS
+
+
+def test_full_bucket_bursts_past_calls(monkeypatch):
+    def full():
+        return _ratelimit.TokenBucket(100, _client.RATE_LIMIT_PERIOD)
+
+    assert _calls_in_first_period(monkeypatch, full, 300) > 100
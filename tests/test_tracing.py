@@ -0,0 +1,16 @@
+from bd_agent import tracing
+
+
+def test_parent_is_resolved_on_enter():
+    with tracing.capture() as spans:
+        child = tracing.span("child")  # created outside any span
+        with tracing.span("parent"):
+            with child:
+                pass
+    by_name = {s["name"]: s for s in spans}
+    assert by_name["child"]["parent_span_id"] == by_name["parent"]["span_id"]
+    assert by_name["child"]["trace_id"] == by_name["parent"]["trace_id"]
+
+
+def test_no_spans_without_sink():
+    assert tracing.span("x") is tracing.NOOP_SPAN